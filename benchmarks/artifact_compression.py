@@ -0,0 +1,169 @@
+"""
+Benchmark of artifact uploads with and without compressed transport.
+
+A corpus of generated preflight logs and JSON artifacts is uploaded to a local
+HTTPS stand-in server using upload-artifacts, first as plain JSON and then
+compressed with every supported Content-Encoding. The stand-in holds every
+request for the time the body would take to transfer over a link with given
+bandwidth. The report shows the bytes on the wire and the mean upload latency.
+
+Usage:
+    python benchmarks/artifact_compression.py [--bandwidth 100] [--files 10]
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import pathlib
+import random
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+import zstandard
+
+from operatorcert import pyxis, streaming
+from operatorcert.entrypoints import upload_artifacts
+from tests.stand_in import Request, StandInServer
+
+CHECKS = [
+    "ScorecardBasicSpecCheck",
+    "ScorecardOlmSuiteCheck",
+    "DeployableByOLM",
+    "ValidateOperatorBundle",
+    "HasLicense",
+    "HasUniqueTag",
+    "LayerCountAcceptable",
+    "HasNoProhibitedPackages",
+    "HasRequiredLabel",
+    "RunAsNonRoot",
+]
+
+
+def preflight_log(rand: random.Random, lines: int) -> str:
+    """
+    Log in the format of the preflight tool with a little random noise
+    """
+    start = 1632304800
+    output = []
+    for i in range(lines):
+        check = rand.choice(CHECKS)
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start + i // 20))
+        message = rand.choice(
+            [
+                f"running check: {check}",
+                f"check completed: {check} result=passed",
+                f"pulling image sha256:{rand.getrandbits(256):064x}",
+                f"executing command: operator-sdk scorecard --selector=test={check}",
+                f"container exited with code {rand.choice([0, 0, 0, 1])}",
+            ]
+        )
+        level = rand.choice(["info", "info", "info", "debug", "trace"])
+        output.append(f'time="{timestamp}" level={level} msg="{message}"')
+    return "\n".join(output) + "\n"
+
+
+def preflight_results(rand: random.Random) -> str:
+    """
+    Test results in the format of the preflight tool
+    """
+    checks = [
+        {
+            "name": check,
+            "elapsed_time": rand.randint(1, 5000),
+            "description": f"Checking {check} of the operator bundle. " * 3,
+            "help": f"Check {check} failed, see the documentation for details.",
+        }
+        for check in CHECKS
+    ]
+    return json.dumps(
+        {"image": "quay.io/foo/bundle:v1.0", "passed": True, "results": checks},
+        indent=4,
+    )
+
+
+def corpus(directory: pathlib.Path, files: int) -> List[pathlib.Path]:
+    rand = random.Random(42)
+    paths = []
+    for i in range(files):
+        path = directory / f"artifact-{i}.log"
+        if i % 4 == 3:
+            path = path.with_suffix(".json")
+            path.write_text(preflight_results(rand))
+        else:
+            path.write_text(preflight_log(rand, rand.randint(2000, 20000)))
+        paths.append(path)
+    return paths
+
+
+def decode(body: bytes) -> Any:
+    if body.startswith(b"\x1f\x8b"):
+        body = gzip.decompress(body)
+    elif body.startswith(b"\x28\xb5\x2f\xfd"):
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return json.loads(body)
+
+
+def run(
+    server: StandInServer, paths: List[pathlib.Path], compression: Optional[str]
+) -> None:
+    wire = []
+
+    def handler(request: Request) -> Any:
+        body = request[3]
+        wire.append(len(body))
+        # hold the request for the time the body takes to transfer
+        time.sleep(len(body) * 8 / server.bandwidth)
+        artifact = decode(body)
+        content = base64.b64decode(artifact.pop("content"))
+        assert len(content) == artifact["file_size"]
+        return 201, {}, artifact
+
+    server.handler = handler
+    args = SimpleNamespace(
+        pyxis_url=server.url,
+        cert_project_id="project-id",
+        certification_hash="hash",
+        operator_package_name="foo-operator",
+        operator_version="1.0",
+        compression=compression,
+    )
+
+    latencies = []
+    for path in paths:
+        start = time.perf_counter()
+        upload_artifacts.upload_artifact(args, str(path))
+        latencies.append(time.perf_counter() - start)
+
+    raw = sum(path.stat().st_size for path in paths)
+    print(
+        f"{compression or 'none':<6} raw: {raw / 1024:9.1f} KiB  "
+        f"wire: {sum(wire) / 1024:9.1f} KiB ({sum(wire) / raw:5.2f}x)  "
+        f"mean latency: {statistics.mean(latencies) * 1000:8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--bandwidth", type=float, default=100, help="Link bandwidth in Mbit/s"
+    )
+    parser.add_argument("--files", type=int, default=10, help="Number of artifacts")
+    args = parser.parse_args()
+
+    os.environ.setdefault("PYXIS_API_KEY", "benchmark")
+    with tempfile.TemporaryDirectory() as tmp_dir, StandInServer(tls=True) as server:
+        os.environ["REQUESTS_CA_BUNDLE"] = server.ca_bundle
+        server.bandwidth = args.bandwidth * 1000 * 1000
+        paths = corpus(pathlib.Path(tmp_dir), args.files)
+        for compression in [None, *streaming.COMPRESSIONS]:
+            run(server, paths, compression)
+        pyxis.close_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmark of parsing operator bundle CSV files.
+
+A corpus of generated cluster service versions of various sizes (with large
+alm-examples, CRD descriptions and base64 icons) is parsed with the pure
+Python YAML loader and with the loader used by the bundle loading layer. The
+fields most of the steps need are then extracted without building the whole
+document. The report shows the mean time and the peak memory of every CSV size
+and checks all the ways produce the same values.
+
+Usage:
+    python benchmarks/bundle_yaml_parsing.py [--repeat 3]
+"""
+
+import argparse
+import base64
+import json
+import pathlib
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+
+from operatorcert import OperatorBundle, utils
+
+# Number of owned CRDs and size of the icon in bytes of every corpus CSV
+SIZES = {
+    "small": (2, 2 * 1024),
+    "medium": (40, 64 * 1024),
+    "large": (400, 1024 * 1024),
+}
+
+
+def crd(rand: random.Random, index: int) -> Dict[str, Any]:
+    kind = f"Foo{index}"
+    return {
+        "name": f"foo{index}s.foo.example.com",
+        "version": "v1",
+        "kind": kind,
+        "displayName": f"Foo {index}",
+        "description": f"{kind} is a resource managed by the Foo operator. " * 10,
+        "specDescriptors": [
+            {
+                "path": f"field{i}",
+                "displayName": f"Field {i}",
+                "description": f"Field {i} of {kind} " * rand.randint(1, 20),
+                "x-descriptors": [
+                    "urn:alm:descriptor:com.tectonic.ui:text",
+                    "urn:alm:descriptor:com.tectonic.ui:fieldGroup:advanced",
+                ],
+            }
+            for i in range(rand.randint(5, 30))
+        ],
+    }
+
+
+def example(rand: random.Random, index: int) -> Dict[str, Any]:
+    return {
+        "apiVersion": "foo.example.com/v1",
+        "kind": f"Foo{index}",
+        "metadata": {"name": f"example-{index}"},
+        "spec": {
+            f"field{i}": rand.choice([True, 1.5, f"value-{i}", {"nested": [1, 2]}])
+            for i in range(rand.randint(5, 30))
+        },
+    }
+
+
+def csv(rand: random.Random, crds: int, icon_size: int) -> Dict[str, Any]:
+    icon = base64.b64encode(rand.randbytes(icon_size)).decode()
+    examples = [example(rand, i) for i in range(crds)]
+    return {
+        "apiVersion": "operators.coreos.com/v1alpha1",
+        "kind": "ClusterServiceVersion",
+        "metadata": {
+            "name": "foo-operator.v1.0.0",
+            "annotations": {
+                "alm-examples": json.dumps(examples, indent=2),
+                "capabilities": "Full Lifecycle",
+                "createdAt": "2021-10-10T10:10:10Z",
+                "olm.properties": '[{"type": "olm.maxOpenShiftVersion", "value": 4.8}]',
+            },
+        },
+        "spec": {
+            "displayName": "Foo operator",
+            "description": "Foo operator manages Foo.\n\n" * 50,
+            "icon": [{"base64data": icon, "mediatype": "image/png"}],
+            "version": "1.0.0",
+            "customresourcedefinitions": {"owned": [crd(rand, i) for i in range(crds)]},
+            "install": {
+                "strategy": "deployment",
+                "spec": {
+                    "deployments": [
+                        {
+                            "name": "foo-operator",
+                            "spec": {
+                                "replicas": 1,
+                                "template": {
+                                    "spec": {
+                                        "containers": [
+                                            {
+                                                "name": "manager",
+                                                "image": "quay.io/foo/operator@sha256:"
+                                                + "0" * 64,
+                                                "env": [
+                                                    {"name": f"ENV_{i}", "value": "x"}
+                                                    for i in range(20)
+                                                ],
+                                            }
+                                        ]
+                                    }
+                                },
+                            },
+                        }
+                    ]
+                },
+            },
+            "relatedImages": [
+                {
+                    "name": f"image-{i}",
+                    "image": f"quay.io/foo/image-{i}@sha256:" + "1" * 64,
+                }
+                for i in range(10)
+            ],
+        },
+    }
+
+
+def corpus(directory: pathlib.Path) -> Dict[str, pathlib.Path]:
+    rand = random.Random(42)
+    paths = {}
+    for name, (crds, icon_size) in SIZES.items():
+        path = directory / f"{name}.clusterserviceversion.yaml"
+        with path.open("w") as fh:
+            yaml.safe_dump(csv(rand, crds, icon_size), fh)
+        paths[name] = path
+    return paths
+
+
+def measure(
+    parse: Callable[[pathlib.Path], Any], path: pathlib.Path, repeat: int
+) -> Tuple[float, float]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(path)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.mean(timings), peak
+
+
+def pure_python(path: pathlib.Path) -> Any:
+    with open(path, "rb") as fh:
+        return yaml.load(fh, Loader=yaml.SafeLoader)
+
+
+def extract(path: pathlib.Path) -> Dict[str, Any]:
+    return utils.extract_paths(path, OperatorBundle.CSV_FIELDS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Parses of every CSV")
+    args = parser.parse_args()
+
+    methods = {"SafeLoader": pure_python, "bundle": utils.load_yaml, "extract": extract}
+    print(f"bundle loader: {utils.YAML_LOADER.__name__}")
+    print(f"{'csv':<8}{'size':>12}" + "".join(f"{name:>24}" for name in methods))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, path in corpus(pathlib.Path(tmp_dir)).items():
+            document = pure_python(path)
+            assert document == utils.load_yaml(path)
+            assert extract(path) == {
+                "metadata.annotations": document["metadata"]["annotations"],
+                "spec.relatedImages": document["spec"]["relatedImages"],
+            }
+            row = f"{name:<8}{path.stat().st_size / 1024:>8.0f} KiB"
+            for method in methods.values():
+                duration, peak = measure(method, path, args.repeat)
+                row += f"{duration * 1000:>11.1f} ms{peak / 1024 / 1024:>7.1f} MiB"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark of classifying the paths changed by a pull request.
+
+Diffs of generated bundle paths of growing sizes are classified with the
+path policy of the submitted bundle, and with the prefix check it replaced
+for reference. The report shows the time per path of every diff size, a
+constant time per path means the diff is classified in linear time.
+
+Usage:
+    python benchmarks/path_policy.py [--max-paths 1000000]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from operatorcert import path_policy
+
+DIRECTORIES = ["manifests", "metadata", "tests/scorecard", "manifests/crds/v1"]
+
+
+def diff(size: int) -> List[str]:
+    rand = random.Random(42)
+    return [
+        f"operators/foo/1.0.{rand.randint(0, 1)}/{rand.choice(DIRECTORIES)}/file-{i}"
+        ".yaml"
+        for i in range(size)
+    ]
+
+
+def prefix_check(path: str) -> bool:
+    return path.startswith("operators/foo/1.0.0") or path == "operators/foo/ci.yaml"
+
+
+def measure(classify: Callable[[str], object], paths: List[str]) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        classify(path)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-paths", type=int, default=1000000, help="Diff size")
+    args = parser.parse_args()
+
+    policy = path_policy.bundle_policy("foo", "1.0.0")
+    print(f"{'paths':>10}{'policy':>24}{'prefix':>24}")
+    size = 1000
+    while size <= args.max_paths:
+        paths = diff(size)
+        row = f"{size:>10}"
+        for classify in (policy.classify, prefix_check):
+            duration = measure(classify, paths)
+            row += f"{duration * 1000:>10.0f} ms{duration / size * 1e9:>8.0f} ns/p"
+        print(row)
+        size *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark of the duplicate pull request check backends.
+
+A local HTTPS stand-in server plays Github with a number of open pull requests
+in every repository, in the shape the pulls and search APIs return them. Every
+request is held for a fixed round trip time. The check is run with the "list"
+backend (all the open pull requests are listed) and the "search" backend
+(a single search for the bundle name) and the report shows the number of
+requests, the bytes downloaded and the latency of the check.
+
+Usage:
+    python benchmarks/pr_uniqueness.py [--prs 500] [--repos 2] [--rtt 50]
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import operatorcert
+from tests.stand_in import Request, StandInServer
+
+
+def user(login: str) -> Dict[str, Any]:
+    return {
+        "login": login,
+        "id": abs(hash(login)) % 10**8,
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{login}?v=4",
+        "url": f"https://api.github.com/users/{login}",
+        "html_url": f"https://github.com/{login}",
+        "type": "User",
+    }
+
+
+def repository(repo: str) -> Dict[str, Any]:
+    return {
+        "full_name": repo,
+        "private": False,
+        "owner": user(repo.split("/")[0]),
+        "html_url": f"https://github.com/{repo}",
+        "description": "Certified operators published in the Red Hat catalog",
+        "url": f"https://api.github.com/repos/{repo}",
+        **{
+            f"{name}_url": f"https://api.github.com/repos/{repo}/{name}"
+            for name in ["forks", "keys", "teams", "hooks", "events", "tags"]
+        },
+    }
+
+
+def pull(repo: str, number: int) -> Dict[str, Any]:
+    title = f"operator operator-{number} (1.{number % 10}.0)"
+    return {
+        "url": f"https://api.github.com/repos/{repo}/pulls/{number}",
+        "html_url": f"https://github.com/{repo}/pull/{number}",
+        "number": number,
+        "state": "open",
+        "title": title,
+        "user": user(f"contributor-{number}"),
+        "body": "Thanks submitting your Operator. Please check below list. " * 10,
+        "created_at": "2021-10-12T08:41:03Z",
+        "labels": [{"name": "operator-bundle", "color": "ededed"}],
+        "head": {
+            "label": f"contributor-{number}:operator-{number}",
+            "ref": f"operator-{number}",
+            "sha": "0" * 40,
+            "repo": repository(f"contributor-{number}/certified-operators"),
+        },
+        "base": {
+            "label": "main",
+            "ref": "main",
+            "sha": "1" * 40,
+            "repo": repository(repo),
+        },
+    }
+
+
+def handler(server: StandInServer, prs: Dict[str, List[Dict[str, Any]]]) -> Any:
+    def handle(request: Request) -> Any:
+        path = request[1]
+        time.sleep(server.rtt)
+        url = urlparse(path)
+        query = parse_qs(url.query)
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query["per_page"][0])
+
+        if url.path == "/search/issues":
+            name = query["q"][0].split('"')[1]
+            items = [
+                pr
+                for repo_prs in prs.values()
+                for pr in repo_prs
+                if name in pr["title"]
+            ]
+        else:
+            items = prs[url.path.removeprefix("/repos/").removesuffix("/pulls")]
+
+        headers = {}
+        if page * per_page < len(items):
+            next_url = f"{server.url}{path[1:].split('&page=')[0]}&page={page + 1}"
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        items = items[(page - 1) * per_page : page * per_page]
+        if url.path == "/search/issues":
+            items = {
+                "total_count": len(items),
+                "incomplete_results": False,
+                "items": items,
+            }
+        content = json.dumps(items).encode("utf-8")
+        server.bytes += len(content)
+        return 200, headers, content
+
+    return handle
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prs", type=int, default=500, help="Open PRs per repo")
+    parser.add_argument("--repos", type=int, default=2, help="Number of repos")
+    parser.add_argument("--rtt", type=float, default=50, help="Round trip time (ms)")
+    args = parser.parse_args()
+
+    repos = [f"redhat-openshift-ecosystem/repo-{i}" for i in range(args.repos)]
+    prs = {
+        repo: [pull(repo, i * args.repos + j) for i in range(args.prs)]
+        for j, repo in enumerate(repos)
+    }
+    # the checked bundle is the oldest open PR of the last repository
+    base_pr = prs[repos[-1]][-1]
+    bundle_name = operatorcert.naming.parse_pr_title(base_pr["title"]).bundle_name
+
+    with StandInServer(tls=True) as server:
+        os.environ["REQUESTS_CA_BUNDLE"] = server.ca_bundle
+        server.rtt = args.rtt / 1000
+        server.handler = handler(server, prs)
+        for backend in operatorcert.UNIQUENESS_BACKENDS:
+            server.requests.clear()
+            server.bytes = 0
+            start = time.perf_counter()
+            operatorcert.verify_pr_uniqueness(
+                repos, base_pr["html_url"], bundle_name, server.url, backend=backend
+            )
+            duration = time.perf_counter() - start
+            print(
+                f"{backend:<8} requests: {len(server.requests):>4}  "
+                f"downloaded: {server.bytes / 1024:9.1f} KiB  "
+                f"latency: {duration * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Report of Pyxis response payload sizes per entrypoint.
+
+Every entrypoint that reads from Pyxis is run twice against a local stand-in
+server with realistic documents - first ignoring the `include` projection
+(full documents, the previous behavior) and then honoring it. The report shows
+the bytes of GET responses downloaded by each entrypoint and the bytes saved by the projection.
+
+Usage:
+    python benchmarks/pyxis_payload_size.py
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from operatorcert import download_test_results, pyxis
+from operatorcert.entrypoints import (
+    create_container_image,
+    publish,
+    reserve_operator_name,
+    upload_artifacts,
+)
+from tests.stand_in import Request, StandInServer
+
+DATA_DIR = pathlib.Path(__file__).resolve().parent.parent / "tests" / "data"
+
+
+def _digest(seed: Any) -> str:
+    return "sha256:" + hashlib.sha256(str(seed).encode()).hexdigest()
+
+
+def _image() -> Dict[str, Any]:
+    return {
+        "_id": "image-id",
+        "isv_pid": "ospid-123",
+        "docker_image_digest": _digest("image"),
+        "architecture": "amd64",
+        "certified": True,
+        "brew": {"build": "foo-operator-bundle-container-1.0-1", "nvra": "x" * 64},
+        "parsed_data": {
+            "layers": [_digest(i) for i in range(40)],
+            "env_variables": [f"ENV_{i}=value-{i}" for i in range(30)],
+            "labels": [{"name": f"label-{i}", "value": "v" * 40} for i in range(40)],
+            "files": [
+                {"filename": f"/root/f{i}", "content": "c" * 200} for i in range(10)
+            ],
+        },
+        "repositories": [
+            {
+                "registry": "registry.connect.redhat.com",
+                "repository": f"vendor/repo-{i}",
+                "published": True,
+                "push_date": "2021-10-10T10:10:10+00:00",
+                "tags": [{"name": f"1.{j}-1", "added_date": "2021"} for j in range(5)],
+            }
+            for i in range(10)
+        ],
+        "content_sets": [f"content-set-{i}" for i in range(20)],
+        "cpe_ids": [f"cpe:/a:redhat:product:{i}" for i in range(20)],
+        "top_layer_id": _digest("top"),
+        "uncompressed_top_layer_id": _digest("uncompressed"),
+    }
+
+
+def _project() -> Dict[str, Any]:
+    return {
+        "_id": "project-id",
+        "name": "Foo operator",
+        "org_id": 123,
+        "project_status": "active",
+        "certification_status": "In Progress",
+        "contacts": [{"email_address": f"u{i}@foo.com", "type": "x"} for i in range(5)],
+        "container": {
+            "isv_pid": "ospid-123",
+            "repository_name": "foo-operator",
+            "repository_description": "<p>" + "Operator description. " * 80 + "</p>",
+            "distribution_method": "rhcc",
+            "release_category": "Generally Available",
+            "application_categories": ["Monitoring"],
+            "privileged": False,
+            "registry_override_instruct": "Instructions " * 50,
+            "docker_config_json": "x" * 300,
+        },
+        "marketplace": {"listing_id": "1", "published": True},
+    }
+
+
+def _vendor() -> Dict[str, Any]:
+    return {
+        "_id": "vendor-id",
+        "label": "foo-vendor",
+        "org_id": 123,
+        "published": True,
+        "name": "Foo vendor",
+        "description": "Vendor description. " * 40,
+        "contact": {"email": "foo@foo.com", "phone": "123"},
+        "logo_url": "https://foo.com/logo.png",
+        "industries": ["Software"] * 5,
+    }
+
+
+def _test_results() -> Dict[str, Any]:
+    checks = [
+        {"name": f"Check{i}", "elapsed_time": 10, "description": "d" * 120}
+        for i in range(20)
+    ]
+    return {
+        "_id": "test-results-id",
+        "passed": True,
+        "results": {"passed": checks, "failed": [], "errors": []},
+        "test_library": {"name": "preflight", "version": "0.0.1", "commit": "a" * 40},
+        "certification_hash": "hash",
+        "image": "quay.io/foo/bundle:1.0",
+        "operator_package_name": "foo-operator",
+        "version": "1.0",
+        "logs": "log line\n" * 100,
+    }
+
+
+DOCUMENTS = {
+    "/v1/images": lambda: {"data": [_image()], "total": 1},
+    "/v1/projects/certification/id/project-id/test-results": lambda: {
+        "data": [_test_results()],
+        "total": 1,
+    },
+    "/v1/projects/certification/id/project-id": _project,
+    "/v1/vendors/org-id/123": _vendor,
+    "/v1/repositories": lambda: {
+        "data": [{**_image()["repositories"][0], "_id": "repo-id"}],
+        "total": 1,
+    },
+    "/v1/operators/packages": lambda: {
+        "data": [
+            {"_id": "package-id", "association": "ospid-123", "package_name": "foo"}
+        ],
+        "total": 1,
+    },
+}
+
+
+def _select(document: Any, path: List[str]) -> Any:
+    if not path:
+        return document
+    if isinstance(document, list):
+        return [_select(item, path) for item in document]
+    if not isinstance(document, dict) or path[0] not in document:
+        return None
+    return {path[0]: _select(document[path[0]], path[1:])}
+
+
+def _merge(target: Dict[str, Any], source: Any) -> None:
+    for key, value in (source or {}).items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        elif isinstance(value, list) and isinstance(target.get(key), list):
+            for target_item, item in zip(target[key], value):
+                _merge(target_item, item)
+        else:
+            target[key] = value
+
+
+def project(document: Dict[str, Any], include: List[str]) -> Dict[str, Any]:
+    """
+    Sparse fieldset projection of a document (subset of Pyxis `include`)
+    """
+    projected: Dict[str, Any] = {}
+    for field in include:
+        _merge(projected, _select(document, field.split(".")))
+    return projected
+
+
+def run(server: StandInServer, entrypoint: Callable[[], None]) -> int:
+    received = []
+
+    def handler(request: Request) -> Any:
+        method, path = request[:2]
+        url = urlparse(path)
+        document = DOCUMENTS.get(url.path, dict)()
+        include = parse_qs(url.query).get("include")
+        if include and server.projection:
+            document = project(document, include[0].split(","))
+        if method == "GET":
+            received.append(len(json.dumps(document).encode("utf-8")))
+        return 200, {"Content-Type": "application/json"}, document
+
+    server.handler = handler
+    with contextlib.suppress(SystemExit):
+        entrypoint()
+    return sum(received)
+
+
+def main() -> None:
+    os.environ.setdefault("PYXIS_CERT_PATH", "/dev/null")
+    os.environ.setdefault("PYXIS_KEY_PATH", "/dev/null")
+
+    with StandInServer() as server, tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        args = SimpleNamespace(
+            pyxis_url=server.url,
+            cert_project_id="project-id",
+            certification_hash="hash",
+            operator_name="foo",
+            operator_package_name="foo",
+            operator_package_version="1.0",
+            operator_version="1.0",
+            org_id="123",
+            isv_pid="ospid-123",
+            docker_image_digest=_digest("image"),
+            association="ospid-123",
+            environment="dev",
+            path=str(DATA_DIR / "results.json"),
+            type="preflight-results",
+            parallelism=1,
+            upload_cache=None,
+            compression=None,
+        )
+        entrypoints = {
+            "upload-artifacts": lambda: upload_artifacts.upload_results_and_artifacts(
+                args
+            ),
+            "download-test-results": lambda: download_test_results(args),
+            "reserve-operator-name": lambda: reserve_operator_name.check_operator_name(
+                args
+            ),
+            "publish vendor": lambda: publish.publish_vendor(args),
+            "publish repository": lambda: publish.publish_repository(args),
+            "create-container-image": lambda: (
+                create_container_image.check_if_image_already_exists(args),
+                create_container_image.remove_latest_from_previous_image(
+                    args.pyxis_url, args.isv_pid
+                ),
+            ),
+        }
+
+        print(f"{'entrypoint':<24}{'full':>10}{'projected':>12}{'saved':>10}")
+        for name, entrypoint in entrypoints.items():
+            server.projection = False
+            full = run(server, entrypoint)
+            server.projection = True
+            projected = run(server, entrypoint)
+            saved = 100 * (full - projected) / full
+            print(f"{name:<24}{full:>10}{projected:>12}{saved:>9.1f}%")
+        pyxis.close_clients()
+
+
+if __name__ == "__main__":
+    main()
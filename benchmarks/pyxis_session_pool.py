@@ -0,0 +1,68 @@
+"""
+Benchmark of Pyxis calls with a pooled client vs. a new session per call.
+
+The benchmark runs a sequence of Pyxis calls (similar to what a single
+pipeline task does) against a local HTTPS stand-in server and reports
+the number of TLS handshakes and the mean latency per call.
+
+Usage:
+    python benchmarks/pyxis_session_pool.py [--calls 20]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Callable, List
+
+import requests
+
+from operatorcert import pyxis
+from tests.stand_in import StandInServer
+
+
+def per_call_session(url: str) -> None:
+    """
+    Previous behavior - a new session (and connection) for every call
+    """
+    session = requests.Session()
+    session.headers.update({"X-API-KEY": os.environ["PYXIS_API_KEY"]})
+    session.get(url).raise_for_status()
+    session.close()
+
+
+def pooled_client(url: str) -> None:
+    """
+    Current behavior - a process-wide pooled client
+    """
+    pyxis.get(url).raise_for_status()
+
+
+def run(name: str, call: Callable[[str], None], calls: int) -> None:
+    with StandInServer(tls=True) as server:
+        os.environ["REQUESTS_CA_BUNDLE"] = server.ca_bundle
+        latencies: List[float] = []
+        for i in range(calls):
+            start = time.perf_counter()
+            call(f"{server.url}v1/projects/certification/id/{i}")
+            latencies.append(time.perf_counter() - start)
+        pyxis.close_clients()
+
+        print(
+            f"{name:<18} calls: {calls:>4}  handshakes: {server.connections:>4}  "
+            f"mean latency: {statistics.mean(latencies) * 1000:7.2f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20, help="Number of calls")
+    args = parser.parse_args()
+
+    os.environ.setdefault("PYXIS_API_KEY", "benchmark")
+    run("per-call session", per_call_session, args.calls)
+    run("pooled client", pooled_client, args.calls)
+
+
+if __name__ == "__main__":
+    main()
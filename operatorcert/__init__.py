@@ -1,15 +1,18 @@
 import json
 import logging
 import pathlib
-import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from urllib.parse import urljoin
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
-import requests
-import yaml
+from operatorcert import github, naming, ocp_versions, path_policy, pyxis
+from operatorcert.cache import DiskCache
+from operatorcert.utils import extract_paths, find_file, load_yaml, store_results
 
-from operatorcert import pyxis
-from operatorcert.utils import find_file, store_results
+LOGGER = logging.getLogger("operator-cert")
 
 # Bundle annotations
 OCP_VERSIONS_ANNOTATION = "com.redhat.openshift.versions"
@@ -19,6 +22,182 @@ PACKAGE_ANNOTATION = "operators.operatorframework.io.bundle.package.v1"
 OLM_PROPS_ANNOTATION = "olm.properties"
 MAX_OCP_VERSION_PROPERTY = "olm.maxOpenShiftVersion"
 
+# Maximum page size of Pyxis, all the indices fit in a single page
+INDICES_PAGE_SIZE = 500
+
+GITHUB_API_URL = "https://api.github.com/"
+# Maximum page size of Github list endpoints
+GITHUB_PAGE_SIZE = 100
+
+# Github names of the git diff statuses
+GIT_STATUSES = {
+    "A": "added",
+    "C": "copied",
+    "D": "removed",
+    "M": "modified",
+    "R": "renamed",
+    "T": "changed",
+}
+
+
+class OperatorBundle:
+    """
+    Operator bundle with its metadata and manifests.
+
+    The bundle files are located and parsed lazily, each of them at most once,
+    so the bundle can be shared by all the steps reading it.
+    """
+
+    ANNOTATIONS_PATHS = [
+        ("metadata", "annotations.yaml"),
+        ("metadata", "annotations.yml"),
+    ]
+    CSV_FIELDS = ["metadata.annotations", "spec.relatedImages"]
+
+    def __init__(self, bundle_path: pathlib.Path, package: Optional[str] = None):
+        """
+        Args:
+            bundle_path (Path): A path to the bundle version
+            package (Optional[str]): Operator package name, taken from the bundle
+                annotations when not set
+        """
+        self.path = pathlib.Path(bundle_path)
+        self._package = package
+
+    @staticmethod
+    def _load_yaml(path: pathlib.Path) -> Any:
+        """
+        Parse a bundle YAML file
+
+        Args:
+            path (Path): A path to the file
+
+        Returns:
+            Any: Parsed content of the file
+        """
+        LOGGER.debug(f"Parsing {path}")
+        return load_yaml(path)
+
+    @cached_property
+    def annotations(self) -> Dict:
+        """
+        All the annotations from the bundle metadata
+
+        Returns:
+            A dict of all the annotation keys and values
+        """
+        annotations_path = find_file(self.path, self.ANNOTATIONS_PATHS)
+        if not annotations_path:
+            raise RuntimeError("Annotations file not found")
+        content = self._load_yaml(annotations_path)
+        return content.get("annotations", {})
+
+    @property
+    def package(self) -> str:
+        """
+        Operator package name
+
+        Returns:
+            str: Package name given to the bundle or the one in its annotations
+        """
+        if self._package:
+            return self._package
+        package = self.annotations.get(PACKAGE_ANNOTATION)
+        if not package:
+            raise ValueError(f"'{PACKAGE_ANNOTATION}' annotation not defined")
+        return package
+
+    @cached_property
+    def csv_path(self) -> pathlib.Path:
+        """
+        Location of the bundle CSV
+
+        Returns:
+            Path: A path to the CSV file
+        """
+        paths = [
+            ("manifests", f"{self.package}.clusterserviceversion.yaml"),
+            ("manifests", f"{self.package}.clusterserviceversion.yml"),
+        ]
+        csv_path = find_file(self.path, paths)
+        if not csv_path:
+            raise RuntimeError("Cluster service version (CSV) file not found")
+        return csv_path
+
+    @cached_property
+    def csv(self) -> Dict:
+        """
+        All the content of the bundle CSV
+
+        Returns:
+            A dict of all the fields in the bundle CSV
+        """
+        return self._load_yaml(self.csv_path)
+
+    @cached_property
+    def _csv_fields(self) -> Dict[str, Any]:
+        """
+        The CSV fields most of the steps need. Unless the whole CSV is already
+        parsed, only these fields are extracted from the file, skipping large
+        values like the icon or alm-examples.
+
+        Returns:
+            Dict[str, Any]: Values of CSV_FIELDS found in the CSV
+        """
+        if "csv" in self.__dict__:
+            fields = {}
+            for field in self.CSV_FIELDS:
+                value = self.csv
+                for key in field.split("."):
+                    value = value.get(key, {}) if isinstance(value, dict) else {}
+                fields[field] = value
+            return fields
+        LOGGER.debug(f"Extracting {', '.join(self.CSV_FIELDS)} from {self.csv_path}")
+        return extract_paths(self.csv_path, self.CSV_FIELDS)
+
+    @property
+    def csv_annotations(self) -> Dict:
+        """
+        All the annotations from the bundle CSV
+
+        Returns:
+            A dict of all the annotation keys and values
+        """
+        return self._csv_fields.get("metadata.annotations") or {}
+
+    @property
+    def related_images(self) -> List[Dict]:
+        """
+        Images related to the operator listed in the bundle CSV
+
+        Returns:
+            A list of related images, empty when the CSV lists none
+        """
+        return self._csv_fields.get("spec.relatedImages") or []
+
+    @cached_property
+    def olm_properties(self) -> List[Dict]:
+        """
+        OLM properties defined in the bundle CSV annotation
+
+        Returns:
+            A list of the OLM properties
+        """
+        return json.loads(self.csv_annotations.get(OLM_PROPS_ANNOTATION, "[]"))
+
+    @property
+    def max_ocp_version(self) -> Optional[str]:
+        """
+        Maximum OpenShift version the bundle supports
+
+        Returns:
+            Optional[str]: Version from the OLM properties, None if not defined
+        """
+        for prop in self.olm_properties:
+            if prop.get("type") == MAX_OCP_VERSION_PROPERTY:
+                return str(prop["value"])
+        return None
+
 
 def get_bundle_annotations(bundle_path: pathlib.Path) -> Dict:
     """
@@ -30,17 +209,7 @@ def get_bundle_annotations(bundle_path: pathlib.Path) -> Dict:
     Returns:
         A dict of all the annotation keys and values
     """
-    paths = [
-        ("metadata", "annotations.yaml"),
-        ("metadata", "annotations.yml"),
-    ]
-    annotations_path = find_file(bundle_path, paths)
-    if not annotations_path:
-        raise RuntimeError("Annotations file not found")
-
-    with annotations_path.open() as fh:
-        content = yaml.safe_load(fh)
-        return content.get("annotations", {})
+    return OperatorBundle(bundle_path).annotations
 
 
 def get_csv_content(bundle_path: pathlib.Path, package: str) -> Dict:
@@ -54,16 +223,7 @@ def get_csv_content(bundle_path: pathlib.Path, package: str) -> Dict:
     Returns:
         A dict of all the fields in the bundle CSV
     """
-    paths = [
-        ("manifests", f"{package}.clusterserviceversion.yaml"),
-        ("manifests", f"{package}.clusterserviceversion.yml"),
-    ]
-    csv_path = find_file(bundle_path, paths)
-    if not csv_path:
-        raise RuntimeError("Cluster service version (CSV) file not found")
-
-    with csv_path.open() as fh:
-        return yaml.safe_load(fh)
+    return OperatorBundle(bundle_path, package).csv
 
 
 def get_csv_annotations(bundle_path: pathlib.Path, package: str) -> Dict:
@@ -77,8 +237,7 @@ def get_csv_annotations(bundle_path: pathlib.Path, package: str) -> Dict:
     Returns:
         A dict of all the annotation keys and values
     """
-    content = get_csv_content(bundle_path, package)
-    return content.get("metadata", {}).get("annotations", {})
+    return OperatorBundle(bundle_path, package).csv_annotations
 
 
 def get_supported_indices(
@@ -86,6 +245,7 @@ def get_supported_indices(
     ocp_versions_range: str,
     organization: str,
     max_ocp_version: str = None,
+    cache: Optional[DiskCache] = None,
 ) -> List[str]:
     """
     Gets all the known supported OCP indices for this bundle.
@@ -95,6 +255,8 @@ def get_supported_indices(
         ocp_versions_range (str): OpenShift version annotation
         organization (str): Organization of the index (e.g. "certified-operators")
         max_ocp_version (str): OLM property in the bundle CSV
+        cache (Optional[DiskCache]): Cache of the indices, fresh cached indices
+            are used without querying Pyxis
 
     Returns:
         A list of supported OCP versions in descending order
@@ -105,60 +267,108 @@ def get_supported_indices(
     if max_ocp_version:
         filter_ += f";ocp_version=le={max_ocp_version}"
 
-    # Ignoring pagination. 500 OCP versions would be a lot for a single
-    # version of an operator to support.
     params = {
-        "filter": filter_,
         "ocp_versions_range": ocp_versions_range,
-        "page_size": 500,
         "sort_by": "ocp_version[desc]",
-        "include": "data.ocp_version,data.path",
     }
 
-    rsp = requests.get(url, params=params)
-    rsp.raise_for_status()
-    return rsp.json()["data"]
+    def fetch() -> List[str]:
+        indices = pyxis.iter_pages(
+            url,
+            filter=filter_,
+            include=["data.ocp_version", "data.path"],
+            params=params,
+            auth_required=False,
+        )
+        return list(indices)
+
+    if cache is None:
+        return fetch()
+
+    key = {
+        "url": url,
+        "organization": organization,
+        "ocp_versions_range": ocp_versions_range,
+        "max_ocp_version": max_ocp_version,
+    }
+    entry = cache.get(key)
+    if entry and cache.is_fresh(entry):
+        LOGGER.debug(f"Using cached indices for {ocp_versions_range}")
+        return entry["value"]
+
+    # All the indices fit in a single page, so the whole list is revalidated
+    # with a single conditional request
+    headers = {"If-None-Match": entry["etag"]} if entry and entry["etag"] else {}
+    query = {
+        **params,
+        "filter": filter_,
+        "include": "total,data.ocp_version,data.path",
+        "page": 0,
+        "page_size": INDICES_PAGE_SIZE,
+    }
+    client = pyxis.get_client(url, auth_required=False)
+    resp = client.get(url, params=query, headers=headers)
+    if resp.status_code == 304 and entry:
+        LOGGER.debug(f"Cached indices for {ocp_versions_range} are still valid")
+        cache.put(key, entry["value"], entry["etag"])
+        return entry["value"]
+    resp.raise_for_status()
+
+    page = resp.json()
+    indices = page.get("data", [])
+    etag = resp.headers.get("ETag")
+    if page.get("total", len(indices)) > len(indices):
+        indices, etag = fetch(), None
+    cache.put(key, indices, etag)
+    return indices
 
 
 def ocp_version_info(
-    bundle_path: pathlib.Path, pyxis_url: str, organization: str
+    bundle_path: Union[pathlib.Path, OperatorBundle],
+    pyxis_url: str,
+    organization: str,
+    cache: Optional[DiskCache] = None,
+    local: bool = False,
 ) -> Dict:
     """
     Gathers some information pertaining to the OpenShift versions defined in the
     Operator bundle.
 
     Args:
-        bundle_path (Path): A path to the root of the bundle
+        bundle_path (Union[Path, OperatorBundle]): A path to the root of the bundle
+            or an already loaded bundle
         pyxis_url (str): Base URL to Pyxis
         organization (str): Organization of the index (e.g. "certified-operators")
+        cache (Optional[DiskCache]): Cache of the supported indices
+        local (bool): Resolve the OCP versions range locally against the index
+            catalogue instead of letting Pyxis resolve it
 
     Returns:
         A dict of pertinent OCP version information
     """
-    bundle_annotations = get_bundle_annotations(bundle_path)
+    bundle = bundle_path
+    if not isinstance(bundle, OperatorBundle):
+        bundle = OperatorBundle(bundle_path)
 
-    ocp_versions_range = bundle_annotations.get(OCP_VERSIONS_ANNOTATION)
+    ocp_versions_range = bundle.annotations.get(OCP_VERSIONS_ANNOTATION)
     if not ocp_versions_range:
         raise ValueError(f"'{OCP_VERSIONS_ANNOTATION}' annotation not defined")
 
-    package = bundle_annotations.get(PACKAGE_ANNOTATION)
-    if not package:
-        raise ValueError(f"'{PACKAGE_ANNOTATION}' annotation not defined")
-
-    csv_annotations = get_csv_annotations(bundle_path, package)
+    max_ocp_version = bundle.max_ocp_version
 
-    olm_props_content = csv_annotations.get(OLM_PROPS_ANNOTATION, "[]")
-    olm_props = json.loads(olm_props_content)
-
-    max_ocp_version = None
-    for prop in olm_props:
-        if prop.get("type") == MAX_OCP_VERSION_PROPERTY:
-            max_ocp_version = str(prop["value"])
-            break
-
-    indices = get_supported_indices(
-        pyxis_url, ocp_versions_range, organization, max_ocp_version=max_ocp_version
-    )
+    if local:
+        catalogue = ocp_versions.get_index_catalogue(pyxis_url, organization, cache)
+        indices = ocp_versions.resolve_indices(
+            ocp_versions_range, catalogue, max_ocp_version
+        )
+    else:
+        indices = get_supported_indices(
+            pyxis_url,
+            ocp_versions_range,
+            organization,
+            max_ocp_version=max_ocp_version,
+            cache=cache,
+        )
 
     if not indices:
         raise ValueError("No supported indices found")
@@ -204,91 +414,178 @@ def get_repo_and_org_from_github_url(git_repo_url: str) -> (str, str):
     return organization, repository
 
 
+def get_pr_number(
+    organization: str,
+    repository: str,
+    base_branch: str,
+    pr_head_label: str,
+    github_api_url: str = GITHUB_API_URL,
+) -> int:
+    """
+    Find the number of the open PR from the given branch
+    """
+    url = urljoin(github_api_url, f"repos/{organization}/{repository}/pulls")
+    params = {"state": "open", "base": base_branch, "head": pr_head_label}
+    for prs in github.iter_pages(url, params):
+        for pr in prs:
+            return pr["number"]
+    raise RuntimeError(f"No open pull request found for {pr_head_label}")
+
+
 def get_files_added_in_pr(
-    organization: str, repository: str, base_branch: str, pr_head_label: str
-) -> List[str]:
+    organization: str,
+    repository: str,
+    base_branch: str,
+    pr_head_label: str,
+    pr_number: Optional[int] = None,
+    github_api_url: str = GITHUB_API_URL,
+) -> Iterator[str]:
     """
-    Get the list of files added in the PR.
+    Get the files added in the PR.
     Raise error if any existing files are changed
+
+    The changed files of the PR are paged through and yielded as they come,
+    the next pages are requested only when the previous files are consumed.
+    The error is raised at the first changed existing file, so the remaining
+    pages aren't requested.
     """
-    compare_changes_url = (
-        f"https://api.github.com/repos/{organization}/{repository}"
-        f"/compare/{base_branch}...{pr_head_label}"
+    if pr_number is None:
+        pr_number = get_pr_number(
+            organization, repository, base_branch, pr_head_label, github_api_url
+        )
+    url = urljoin(
+        github_api_url, f"repos/{organization}/{repository}/pulls/{pr_number}/files"
     )
-    rsp = requests.get(compare_changes_url)
-    rsp.raise_for_status()
+    for files in github.iter_pages(url, {"per_page": GITHUB_PAGE_SIZE}):
+        yield from _get_added_files(files)
+
+
+def _git(repo_path: pathlib.Path, *args: str) -> str:
+    """
+    Run a git command in the repository and get its output
+    """
+    rsp = subprocess.run(["git", *args], cwd=repo_path, capture_output=True, text=True)
+    if rsp.returncode:
+        LOGGER.debug(f"git {' '.join(args)} failed: {rsp.stderr.strip()}")
+        raise RuntimeError(f"git {args[0]} failed in {repo_path}")
+    return rsp.stdout
+
+
+def resolve_git_ref(repo_path: pathlib.Path, ref: str) -> str:
+    """
+    Find a branch in a local clone, pipeline clones often have only the
+    remote tracking branch (e.g. origin/main) and not the local one.
+    """
+    for candidate in [ref, f"origin/{ref}"]:
+        try:
+            _git(repo_path, "rev-parse", "--verify", "--quiet", candidate)
+            return candidate
+        except RuntimeError:
+            continue
+    raise RuntimeError(
+        f"Branch {ref} isn't available in {repo_path}, "
+        f"fetch it first (e.g. git fetch origin {ref})"
+    )
+
+
+def get_files_added_in_local_repo(
+    repo_path: pathlib.Path, base_ref: str, head_ref: str = "HEAD"
+) -> Iterator[str]:
+    """
+    Get the files added in the PR from a local clone of the repository,
+    the changes are the same as shown by `git diff base_ref...head_ref`.
+    The base branch is taken from origin when it's not available locally.
+    Raise error if any existing files are changed
+    """
+    base_ref = resolve_git_ref(repo_path, base_ref)
+    try:
+        _git(repo_path, "merge-base", base_ref, head_ref)
+    except RuntimeError:
+        raise RuntimeError(
+            f"No common ancestor of {base_ref} and {head_ref} in {repo_path}, "
+            f"the clone is probably shallow. Fetch the history of both "
+            f"(e.g. git fetch --unshallow origin)"
+        ) from None
+
+    output = _git(
+        repo_path,
+        "diff",
+        "--name-status",
+        "--no-renames",
+        "-z",
+        f"{base_ref}...{head_ref}",
+    )
+    # the output is a sequence of NUL terminated statuses and file names
+    fields = output.split("\0")[:-1]
+    files = (
+        {"filename": filename, "status": GIT_STATUSES.get(status, status)}
+        for status, filename in zip(fields[::2], fields[1::2])
+    )
+    yield from _get_added_files(files)
 
-    added_files_names = []
-    modified_files = []
-    for file in rsp.json().get("files", []):
-        if file["status"] == "added":
-            added_files_names.append(file["filename"])
-        else:
+
+def _get_added_files(files: Iterable[Dict[str, str]]) -> Iterator[str]:
+    """
+    Select the names of the added files, raise error at the first other change
+    """
+    for file in files:
+        if file["status"] != "added":
             # To prevent the modifications to previously merged bundles,
             # we allow only changed with status "added"
-            modified_files.append(file)
-
-    if modified_files:
-        for modified_file in modified_files:
             logging.error(
-                f"Change not permitted: file: {modified_file['filename']}, status: {modified_file['status']}"
+                f"Change not permitted: file: {file['filename']}, status: {file['status']}"
             )
-        raise RuntimeError("There are changes done to previously merged files")
-
-    return added_files_names
+            raise RuntimeError("There are changes done to previously merged files")
+        yield file["filename"]
 
 
 def verify_changed_files_location(
-    changed_files: List[str], operator_name: str, bundle_version: str
+    changed_files: Iterable[str],
+    operator_name: str,
+    bundle_version: str,
+    summary_only: bool = False,
 ) -> None:
     """
     Find the allowed locations in directory tree for changes
     (basing on the operator name and version).
     Test if all of the changes are in allowed locations.
-    """
-    parent_path = f"operators/{operator_name}"
-    path = parent_path + "/" + bundle_version
-    config_path = parent_path + "/ci.yaml"
 
+    The changes are consumed one by one and the check stops at the first
+    change in a wrong location. With summary_only the allowed changes aren't
+    logged one by one, only their number is.
+    """
+    policy = path_policy.bundle_policy(operator_name, bundle_version)
     logging.info(
         f"Changes for operator {operator_name} in version {bundle_version}"
-        f" are expected to be in paths: \n"
-        f" {path}/* \n"
-        f" {config_path}"
+        f" are expected to be in paths: \n " + " \n ".join(policy.allowed)
     )
 
-    wrong_changes = False
+    allowed = 0
     for file_path in changed_files:
-        if file_path.startswith(path) or file_path == config_path:
+        verdict = policy.classify(file_path)
+        if verdict != path_policy.ALLOWED:
+            logging.error(f"Wrong change path: {file_path} ({verdict})")
+            raise RuntimeError("There are changes in the invalid path")
+        if not summary_only:
             logging.info(f"Change path ok: {file_path}")
-        else:
-            logging.error(f"Wrong change path: {file_path}")
-            wrong_changes = True
+        allowed += 1
+    logging.info(f"All {allowed} changes are in the expected paths")
 
-    if wrong_changes:
-        raise RuntimeError("There are changes in the invalid path")
 
-
-def parse_pr_title(pr_title: str) -> (str, str):
+def parse_pr_title(pr_title: str) -> naming.BundleTitle:
     """
     Test, if PR title complies to regex.
     If yes, extract the Bundle name and version.
     """
     # Verify if PR title follows convention- it should contain the bundle name and version.
     # Any non- empty string without whitespaces makes a valid version.
-    regex = rf"^operator ([a-zA-Z0-9-]+) \(([^\s]+)\)$"
-    regex_pattern = re.compile(regex)
-
-    if not regex_pattern.match(pr_title):
+    parsed = naming.parse_pr_title(pr_title)
+    if parsed is None:
         raise ValueError(
             f"Pull request title {pr_title} does not follow the regex 'operator <operator_name> (<version>)"
         )
 
-    matching = regex_pattern.search(pr_title)
-    bundle_name = matching.group(1)
-    bundle_version = matching.group(2)
-
-    return bundle_name, bundle_version
+    return parsed
 
 
 def validate_user(git_username: str, contacts: List[str]):
@@ -300,49 +597,127 @@ def validate_user(git_username: str, contacts: List[str]):
         logging.info(f"User {git_username} has permission to submit the bundle.")
 
 
-def verify_pr_uniqueness(
-    available_repositories: List[str], base_pr_url: str, base_pr_bundle_name: str
-) -> None:
+def _list_duplicate_prs(
+    available_repositories: List[str],
+    base_pr_url: str,
+    base_pr_bundle_name: str,
+    github_api_url: str,
+) -> List[str]:
     """
-    List the active Pull Requests in given GitHub repositories.
-    Find Pull Requests for the same Operator Bundle, and error if they exists.
+    Find Pull Requests for the same Operator Bundle by listing all the open
+    Pull Requests of the repositories.
+
+    The repositories are listed concurrently and the listing stops as soon as
+    a duplicate is found. All the repositories are listed in one session.
     """
+    session = github.get_session()
+    found = threading.Event()
 
-    base_url = "https://api.github.com/repos/"
+    def find_duplicates(repo: str) -> List[str]:
+        duplicate_prs = []
+        url = urljoin(github_api_url, f"repos/{repo}/pulls")
+        params = {"state": "open", "per_page": GITHUB_PAGE_SIZE}
+        for prs in github.iter_pages(url, params, session):
+            duplicate_prs.extend(
+                _get_duplicate_prs(prs, base_pr_url, base_pr_bundle_name)
+            )
+            if duplicate_prs:
+                found.set()
+            if found.is_set():
+                break
+        return duplicate_prs
+
+    with ThreadPoolExecutor(max_workers=len(available_repositories) or 1) as executor:
+        results = executor.map(find_duplicates, available_repositories)
+        return [duplicate for result in results for duplicate in result]
+
+
+def _search_duplicate_prs(
+    available_repositories: List[str],
+    base_pr_url: str,
+    base_pr_bundle_name: str,
+    github_api_url: str,
+) -> List[str]:
+    """
+    Find Pull Requests for the same Operator Bundle with a single Github search
+    across all the repositories. Only the Pull Requests with a matching title
+    are returned by Github.
 
-    regex = r"^operator ([a-zA-Z0-9-]+) [^\s]+$"
-    regex_pattern = re.compile(regex)
+    Newly opened Pull Requests appear in the search results with a delay.
+    """
+    query = " ".join(
+        [
+            f'"operator {base_pr_bundle_name}" in:title is:pr is:open',
+            *[f"repo:{repo}" for repo in available_repositories],
+        ]
+    )
+    url = urljoin(github_api_url, "search/issues")
+    params = {"q": query, "per_page": GITHUB_PAGE_SIZE}
+
+    duplicate_prs = []
+    for page in github.iter_pages(url, params):
+        if page.get("incomplete_results"):
+            logging.warning("Github search results are incomplete")
+        # the search matches words, the titles still have to be checked
+        items = page.get("items", [])
+        duplicate_prs.extend(
+            _get_duplicate_prs(items, base_pr_url, base_pr_bundle_name)
+        )
+    return duplicate_prs
 
-    for repo in available_repositories:
-        # List the open PRs in the given repositories,
-        rsp = requests.get(base_url + repo + "/pulls")
-        rsp.raise_for_status()
-        prs = rsp.json()
 
-        # find duplicates
-        duplicate_prs = []
-        for pr in prs:
-            pr_title = pr["title"]
-            pr_url = pr["html_url"]
-            if base_pr_url == pr_url:
-                # We found the base PR
-                continue
-            matching = regex_pattern.search(pr_title)
-            # there is a PR with name that doesn't conform to regex
-            if matching is None:
-                continue
-            bundle_name = matching.group(1)
-            if bundle_name == base_pr_bundle_name:
-                duplicate_prs.append(f"{pr_title}: {pr_url}")
-
-        # Log duplicates and exit with error
-        if duplicate_prs:
-            logging.error(
-                f"There is more than one pull request for the Operator Bundle {base_pr_bundle_name}"
-            )
-            for duplicate in duplicate_prs:
-                logging.error(f"DUPLICATE: {duplicate}")
-            raise RuntimeError("Multiple pull requests for one Operator Bundle")
+def _get_duplicate_prs(
+    prs: List[Dict[str, Any]], base_pr_url: str, base_pr_bundle_name: str
+) -> List[str]:
+    """
+    Select Pull Requests for the same Operator Bundle other than the base one
+    """
+    duplicate_prs = []
+    bundle_names = naming.classify_titles(pr["title"] for pr in prs)
+    for pr, bundle_name in zip(prs, bundle_names):
+        pr_title = pr["title"]
+        pr_url = pr["html_url"]
+        if base_pr_url == pr_url:
+            # We found the base PR
+            continue
+        # PRs with names that don't conform to regex are ignored
+        if bundle_name == base_pr_bundle_name:
+            duplicate_prs.append(f"{pr_title}: {pr_url}")
+    return duplicate_prs
+
+
+UNIQUENESS_BACKENDS = {
+    "list": _list_duplicate_prs,
+    "search": _search_duplicate_prs,
+}
+
+
+def verify_pr_uniqueness(
+    available_repositories: List[str],
+    base_pr_url: str,
+    base_pr_bundle_name: str,
+    github_api_url: str = GITHUB_API_URL,
+    backend: str = "list",
+) -> None:
+    """
+    Find Pull Requests for the same Operator Bundle in given GitHub
+    repositories, and error if they exists.
+
+    The open Pull Requests are either all listed ("list" backend) or searched
+    for by their title ("search" backend).
+    """
+    duplicate_prs = UNIQUENESS_BACKENDS[backend](
+        available_repositories, base_pr_url, base_pr_bundle_name, github_api_url
+    )
+
+    # Log duplicates and exit with error
+    if duplicate_prs:
+        logging.error(
+            f"There is more than one pull request for the Operator Bundle {base_pr_bundle_name}"
+        )
+        for duplicate in duplicate_prs:
+            logging.error(f"DUPLICATE: {duplicate}")
+        raise RuntimeError("Multiple pull requests for one Operator Bundle")
 
 
 def download_test_results(args) -> Optional[str]:
@@ -362,7 +737,10 @@ def download_test_results(args) -> Optional[str]:
         f"&sort_by=creation_date[desc]&page_size=1",
     )
 
-    rsp = pyxis.get(test_results_url)
+    rsp = pyxis.get(
+        test_results_url,
+        include=["data._id", "data.passed", "data.results", "data.test_library"],
+    )
 
     rsp.raise_for_status()
     query_results = rsp.json()["data"]
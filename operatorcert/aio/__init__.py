@@ -0,0 +1,3 @@
+"""
+Asyncio variants of the http clients for fan-out workloads
+"""
@@ -0,0 +1,562 @@
+"""
+Asyncio variant of the Pyxis client.
+
+The module mirrors the public API of operatorcert.pyxis with coroutines. All
+requests of a client share one connection pool and the number of requests in
+flight is limited by a semaphore, so many independent lookups can be gathered
+and finish in about a single round trip.
+"""
+
+import asyncio
+import logging
+import os
+import ssl
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from operatorcert import retry
+from operatorcert.pyxis import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_POOL_MAXSIZE,
+    _get_auth_from_env,
+    _include_params,
+    is_internal,
+)
+
+LOGGER = logging.getLogger("operator-cert")
+
+# Default maximum number of Pyxis requests in flight per client
+DEFAULT_CONCURRENCY = 10
+
+# Shared Pyxis clients by event loop and (scheme, host, api key, cert, key)
+_CLIENTS: (
+    "weakref.WeakKeyDictionary[Any, Dict[Tuple[Optional[str], ...], PyxisClient]]"
+) = weakref.WeakKeyDictionary()
+
+__all__ = [
+    "PyxisClient",
+    "close_clients",
+    "get",
+    "get_client",
+    "get_project",
+    "get_repository_by_isv_pid",
+    "get_vendor_by_org_id",
+    "is_internal",
+    "iter_pages",
+    "patch",
+    "post",
+    "put",
+]
+
+
+class PyxisClient:
+    """
+    Async Pyxis http client with a pooled connection and concurrency limit.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cert: Optional[str] = None,
+        key: Optional[str] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        keep_alive: bool = True,
+        auth_required: bool = True,
+        policy: Optional[retry.RetryPolicy] = None,
+    ):
+        """
+        Args:
+            api_key (Optional[str]): Pyxis API key
+            cert (Optional[str]): Path to a client certificate
+            key (Optional[str]): Path to a client certificate key
+            pool_maxsize (int): Maximum number of connections kept in the pool
+            concurrency (int): Maximum number of requests in flight
+            keep_alive (bool): Keep connections open between requests
+            auth_required (bool): Whether authentication should be required
+                for the client
+            policy (Optional[retry.RetryPolicy]): Retry policy of the client
+
+        Raises:
+            Exception: Exception is raised when auth details are missing.
+        """
+        # API key or cert + key need to be provided
+        if auth_required and not api_key and (not cert or not key):
+            raise Exception(
+                "No auth details provided for Pyxis. "
+                "Either define PYXIS_API_KEY or PYXIS_CERT_PATH + PYXIS_KEY_PATH"
+            )
+        self.api_key = api_key
+        self.cert = cert
+        self.key = key
+        self.pool_maxsize = pool_maxsize
+        self.concurrency = concurrency
+        self.keep_alive = keep_alive
+        self.policy = policy or retry.RetryPolicy()
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def is_authenticated(self) -> bool:
+        """
+        Check if the client sends auth details with requests
+
+        Returns:
+            bool: Client uses API key or cert + key
+        """
+        return bool(self.api_key or (self.cert and self.key))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Pooled httpx client with auth based on the client configuration.
+
+        Returns:
+            httpx.AsyncClient: Pyxis http client
+        """
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """
+        Create a new pooled httpx client
+
+        Returns:
+            httpx.AsyncClient: Pyxis http client
+        """
+        # Use the same CA bundle as the requests based clients
+        context = ssl.create_default_context(
+            cafile=os.environ.get("REQUESTS_CA_BUNDLE")
+        )
+        headers = {}
+        if self.api_key:
+            LOGGER.debug("Async Pyxis client using API key is created")
+            headers["X-API-KEY"] = self.api_key
+        elif self.cert and self.key:
+            LOGGER.debug("Async Pyxis client using cert + key is created")
+            context.load_cert_chain(self.cert, self.key)
+        else:
+            LOGGER.debug("Async Pyxis client without auth is created")
+
+        limits = httpx.Limits(
+            max_connections=self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+        )
+        return httpx.AsyncClient(headers=headers, verify=context, limits=limits)
+
+    async def aclose(self) -> None:
+        """
+        Close the client and all pooled connections
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a Pyxis request and retry transient failures
+
+        Args:
+            method (str): HTTP method
+            url (str): Pyxis URL
+            kwargs (Any): Additional arguments passed to the request
+
+        Returns:
+            httpx.Response: Response of the last attempt
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        headers = kwargs.get("headers") or {}
+
+        retry_number = 0
+        while True:
+            async with self._semaphore:
+                LOGGER.debug(f"{method} Pyxis request: {url}")
+                try:
+                    resp = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError as exc:
+                    # Connection that failed to be established never reached the server
+                    sent = not isinstance(
+                        exc, (httpx.ConnectError, httpx.ConnectTimeout)
+                    )
+                    delay = self.policy.get_delay(
+                        method, headers, retry_number, sent=sent
+                    )
+                    if delay is None or not self.policy.acquire(url):
+                        raise
+                    reason = str(exc) or type(exc).__name__
+                else:
+                    delay = self.policy.get_delay(
+                        method, headers, retry_number, response=resp
+                    )
+                    if delay is None or not self.policy.acquire(url):
+                        return resp
+                    reason = resp.status_code
+
+            LOGGER.warning(
+                f"{method} {url} failed ({reason}), retrying in {delay:.1f}s "
+                f"({retry_number + 1}/{self.policy.retries})"
+            )
+            await asyncio.sleep(delay)
+            retry_number += 1
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Pyxis GET request
+
+        Args:
+            url (str): Pyxis URL
+            kwargs (Any): Additional arguments passed to the request
+
+        Returns:
+            httpx.Response: Pyxis GET request response
+        """
+        return await self.request("GET", url, **kwargs)
+
+    async def _send(
+        self, method: str, url: str, body: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Send a Pyxis API request with given payload and check the response status
+
+        Args:
+            method (str): HTTP method
+            url (str): Pyxis API URL
+            body (Dict[str, Any]): Request payload
+
+        Returns:
+            Dict[str, Any]: Pyxis response
+        """
+        resp = await self.request(method, url, json=body)
+
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError:
+            LOGGER.exception(
+                f"Pyxis {method} query failed with {url} - {resp.status_code} - {resp.text}"
+            )
+            raise
+        return resp.json()
+
+    async def post(self, url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST pyxis API request to given URL with given payload
+
+        Args:
+            url (str): Pyxis API URL
+            body (Dict[str, Any]): Request payload
+
+        Returns:
+            Dict[str, Any]: Pyxis response
+        """
+        return await self._send("POST", url, body)
+
+    async def put(self, url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        PUT pyxis API request to given URL with given payload
+
+        Args:
+            url (str): Pyxis API URL
+            body (Dict[str, Any]): Request payload
+
+        Returns:
+            Dict[str, Any]: Pyxis response
+        """
+        return await self._send("PUT", url, body)
+
+    async def patch(self, url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        PATCH pyxis API request to given URL with given payload
+
+        Args:
+            url (str): Pyxis API URL
+            body (Dict[str, Any]): Request payload
+
+        Returns:
+            Dict[str, Any]: Pyxis response
+        """
+        return await self._send("PATCH", url, body)
+
+
+def get_client(url: str, auth_required: bool = True) -> PyxisClient:
+    """
+    Get a shared async Pyxis client for the given URL and current event loop.
+
+    One client is kept per event loop, Pyxis base URL and auth identity (based
+    on env variables). The client can be tuned using PYXIS_POOL_MAXSIZE,
+    PYXIS_CONCURRENCY and PYXIS_KEEP_ALIVE env variables.
+
+    Args:
+        url (str): Pyxis URL (any URL of the Pyxis instance)
+        auth_required (bool): Whether authentication should be required
+            for the client
+
+    Returns:
+        PyxisClient: Shared async Pyxis client
+    """
+    parsed_url = urlsplit(url)
+    auth = _get_auth_from_env()
+    identity = (parsed_url.scheme, parsed_url.netloc, *auth)
+
+    clients = _CLIENTS.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(identity)
+    if client is None or (auth_required and not client.is_authenticated):
+        client = PyxisClient(
+            *auth,
+            auth_required=auth_required,
+            pool_maxsize=int(
+                os.environ.get("PYXIS_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE)
+            ),
+            concurrency=int(os.environ.get("PYXIS_CONCURRENCY", DEFAULT_CONCURRENCY)),
+            keep_alive=os.environ.get("PYXIS_KEEP_ALIVE", "true").lower()
+            not in ("0", "false", "no"),
+        )
+        clients[identity] = client
+    return client
+
+
+async def close_clients() -> None:
+    """
+    Close and forget all shared async Pyxis clients of the current event loop
+    """
+    clients = _CLIENTS.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+async def post(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    POST pyxis API request to given URL with given payload
+
+    Args:
+        url (str): Pyxis API URL
+        body (Dict[str, Any]): Request payload
+
+    Returns:
+        Dict[str, Any]: Pyxis response
+    """
+    return await get_client(url).post(url, body)
+
+
+async def put(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    PUT pyxis API request to given URL with given payload
+
+    Args:
+        url (str): Pyxis API URL
+        body (Dict[str, Any]): Request payload
+
+    Returns:
+        Dict[str, Any]: Pyxis response
+    """
+    return await get_client(url).put(url, body)
+
+
+async def patch(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    PATCH pyxis API request to given URL with given payload
+
+    Args:
+        url (str): Pyxis API URL
+        body (Dict[str, Any]): Request payload
+
+    Returns:
+        Dict[str, Any]: Pyxis response
+    """
+    return await get_client(url).patch(url, body)
+
+
+async def get(url: str, include: Optional[List[str]] = None) -> httpx.Response:
+    """
+    Pyxis GET request
+
+    Args:
+        url (str): Pyxis URL
+        include (Optional[List[str]]): Fields to include in the response,
+            all fields are returned by default
+
+    Returns:
+        httpx.Response: Pyxis GET request response
+    """
+    # Not raising exception for error statuses, because GET request can be used to check
+    # if something exists. We don't want a 404 to cause failures.
+    return await get_client(url).get(url, params=_include_params(include))
+
+
+async def _get_json(
+    client: PyxisClient, url: str, params: Dict[str, Any], error: str
+) -> Dict[str, Any]:
+    """
+    Get a Pyxis resource and check the response status
+
+    Args:
+        client (PyxisClient): Pyxis client
+        url (str): Pyxis URL
+        params (Dict[str, Any]): Query parameters
+        error (str): Error message logged when the request fails
+
+    Returns:
+        Dict[str, Any]: Pyxis response
+    """
+    resp = await client.get(url, params=params)
+
+    try:
+        resp.raise_for_status()
+    except httpx.HTTPStatusError:
+        LOGGER.exception(f"{error} {url} - {resp.status_code} - {resp.text}")
+        raise
+    return resp.json()
+
+
+async def iter_pages(
+    url: str,
+    filter: Optional[str] = None,
+    include: Optional[List[str]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    params: Optional[Dict[str, Any]] = None,
+    auth_required: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterate over all records of a paginated Pyxis list endpoint.
+
+    The next page is requested while the records of the current page are
+    being consumed, see operatorcert.pyxis.iter_pages.
+
+    Args:
+        url (str): Pyxis list endpoint URL
+        filter (Optional[str]): Pyxis filter query
+        include (Optional[List[str]]): Fields to include in the response
+            records, e.g. ["data.ocp_version", "data.path"]
+        page_size (int): Number of records fetched per request
+        params (Optional[Dict[str, Any]]): Additional query parameters
+        auth_required (bool): Whether authentication should be required
+
+    Yields:
+        Dict[str, Any]: Pyxis records
+    """
+    client = get_client(url, auth_required=auth_required)
+    query = {**(params or {}), "page_size": page_size}
+    if filter:
+        query["filter"] = filter
+    if include:
+        # Total count is needed to recognize the last page
+        query["include"] = ",".join(["total", *include])
+
+    def fetch(page: int) -> "asyncio.Task[Dict[str, Any]]":
+        return asyncio.ensure_future(
+            _get_json(
+                client, url, {**query, "page": page}, f"Unable to get page {page} of"
+            )
+        )
+
+    page = 0
+    next_page: Optional["asyncio.Task[Dict[str, Any]]"] = fetch(page)
+    try:
+        while next_page is not None:
+            resp = await next_page
+            data = resp.get("data", [])
+
+            next_page = None
+            fetched = page * page_size + len(data)
+            if len(data) == page_size and fetched < resp.get("total", fetched + 1):
+                page += 1
+                next_page = fetch(page)
+
+            for record in data:
+                yield record
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+async def get_project(
+    base_url: str, project_id: str, include: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Get project details for given project ID
+
+    Args:
+        base_url (str): Pyxis base URL
+        project_id (str): certification project ID
+        include (Optional[List[str]]): Project fields to include in the response,
+            all fields are returned by default
+
+    Returns:
+        Dict[str, Any]: Pyxis project response
+    """
+    project_url = urljoin(base_url, f"v1/projects/certification/id/{project_id}")
+    LOGGER.debug(f"Getting project details: {project_id}")
+    return await _get_json(
+        get_client(base_url),
+        project_url,
+        _include_params(include),
+        "Unable to get project details",
+    )
+
+
+async def get_vendor_by_org_id(
+    base_url: str, org_id: str, include: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Get vendor using organization ID
+
+    Args:
+        base_url (str): Pyxis based API url
+        org_id (str): Organization ID
+        include (Optional[List[str]]): Vendor fields to include in the response,
+            all fields are returned by default
+
+    Returns:
+        Dict[str, Any]: Vendor Pyxis response
+    """
+    vendor_url = urljoin(base_url, f"v1/vendors/org-id/{org_id}")
+    LOGGER.debug(f"Getting project details by org_id: {org_id}")
+    return await _get_json(
+        get_client(base_url),
+        vendor_url,
+        _include_params(include),
+        "Unable to get vendor details",
+    )
+
+
+async def get_repository_by_isv_pid(
+    base_url: str, isv_pid: str, include: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Get container repository using ISV pid
+
+    Args:
+        base_url (str): Pyxis based API url
+        isv_pid (str): Project's isv_pid
+        include (Optional[List[str]]): Repository fields to include in the
+            response (e.g. ["data._id"]), all fields are returned by default
+
+    Returns:
+        Optional[Dict[str, Any]]: Repository Pyxis response
+    """
+    repo_url = urljoin(base_url, "v1/repositories")
+    LOGGER.debug(f"Getting repository details by isv_pid: {isv_pid}")
+    records = iter_pages(
+        repo_url, filter=f"isv_pid=={isv_pid}", include=include, page_size=2
+    )
+    repositories: List[Dict[str, Any]] = []
+    try:
+        async for repository in records:
+            repositories.append(repository)
+            # the second repository is only needed for the warning
+            if len(repositories) == 2:
+                break
+    finally:
+        # the prefetched next page isn't needed
+        await records.aclose()
+    if len(repositories) > 1:
+        LOGGER.warning(
+            f"Multiple repositories found for isv_pid {isv_pid}, "
+            f"using {repositories[0].get('_id')}"
+        )
+    return repositories[0] if repositories else None
@@ -0,0 +1,148 @@
+"""
+Persistent cache of API responses stored in a directory on disk
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import re
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+LOGGER = logging.getLogger("operator-cert")
+
+# Time the cached responses are used without revalidation (seconds)
+DEFAULT_TTL = 24 * 60 * 60
+
+# Name of the entry files, a SHA-256 digest of the entry key
+ENTRY_NAME = re.compile(r"[0-9a-f]{64}\.json")
+
+
+class DiskCache:
+    """
+    Cache of JSON values with a time to live and an optional ETag to
+    revalidate expired entries.
+
+    Every entry is a single file named by a digest of its key. Entries are
+    written to a temporary file first and then renamed, so the cache
+    directory can be shared by concurrent pipeline runs (e.g. through
+    a mounted volume) without reading partially written entries.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = DEFAULT_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            directory (str): Cache directory, created when it doesn't exist
+            ttl (float): Time the entries are fresh (seconds)
+            clock (Callable[[], float]): Source of the current POSIX timestamp
+        """
+        self.directory = pathlib.Path(directory)
+        self.ttl = ttl
+        self.clock = clock
+
+    def _path(self, key: Dict[str, Any]) -> pathlib.Path:
+        """
+        Location of the entry
+
+        Args:
+            key (Dict[str, Any]): Entry key
+
+        Returns:
+            Path: A path to the entry file
+        """
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8"))
+        return self.directory / f"{digest.hexdigest()}.json"
+
+    def get(self, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Get a cache entry, fresh or expired
+
+        Args:
+            key (Dict[str, Any]): Entry key
+
+        Returns:
+            Optional[Dict[str, Any]]: Entry with the cached "value", its
+                "etag" and the timestamp it was "stored" at, None when the
+                entry doesn't exist or can't be read
+        """
+        path = self._path(key)
+        try:
+            with path.open() as fh:
+                entry = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            LOGGER.warning(f"Ignoring unreadable cache entry {path}")
+            return None
+        return entry if entry.get("key") == key else None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """
+        Check if the entry can be used without revalidation
+
+        Args:
+            entry (Dict[str, Any]): Cache entry
+
+        Returns:
+            bool: True if the entry is younger than the TTL
+        """
+        return 0 <= self.clock() - entry["stored"] < self.ttl
+
+    def put(self, key: Dict[str, Any], value: Any, etag: Optional[str] = None) -> None:
+        """
+        Store a value in the cache, a stored entry is fresh for the TTL
+
+        Args:
+            key (Dict[str, Any]): Entry key
+            value (Any): JSON serializable value
+            etag (Optional[str]): ETag of the response the value is based on
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {"key": key, "value": value, "etag": etag, "stored": self.clock()}
+        path = self._path(key)
+        # a unique name, so concurrent writers of the entry don't collide,
+        # created with the default permissions like the other files
+        tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+        try:
+            with tmp_path.open("x") as fh:
+                json.dump(entry, fh)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def invalidate(self, **match: Any) -> int:
+        """
+        Remove cache entries. Only the files written by the cache are removed,
+        other files in the directory (e.g. on a shared volume) are kept.
+
+        Args:
+            match (Any): Key fields the removed entries have to match, all the
+                entries are removed when not set
+
+        Returns:
+            int: Number of removed entries
+        """
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            if not ENTRY_NAME.fullmatch(path.name):
+                continue
+            try:
+                key = json.loads(path.read_text())["key"]
+            except (OSError, ValueError, TypeError, KeyError):
+                continue
+            if not isinstance(key, dict) or self._path(key) != path:
+                continue
+            if any(key.get(name) != value for name, value in match.items()):
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
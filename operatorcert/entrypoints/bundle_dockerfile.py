@@ -47,8 +47,8 @@ def generate_dockerfile_content(args: Any) -> str:
     logging.debug("Generating a dockerfile...")
     dockerfile_content = "FROM scratch\n\n"
 
-    bundle_path = pathlib.Path(args.bundle_path)
-    annotations = operatorcert.get_bundle_annotations(bundle_path)
+    bundle = operatorcert.OperatorBundle(pathlib.Path(args.bundle_path))
+    annotations = bundle.annotations
 
     for annotation_key, annotation_value in annotations.items():
         dockerfile_content += f"LABEL {annotation_key}={annotation_value}\n"
@@ -87,7 +87,7 @@ def check_if_image_already_exists(args) -> bool:
     check_url = urljoin(args.pyxis_url, f"v1/images?page_size=1&filter={filter_str}")
 
     # Get the list of the ContainerImages with given parameters
-    rsp = pyxis.get(check_url)
+    rsp = pyxis.get(check_url, include=["data._id"])
     rsp.raise_for_status()
 
     query_results = rsp.json()["data"]
@@ -172,7 +172,7 @@ def remove_latest_from_previous_image(pyxis_url: str, isv_pid: str):
         f"v1/images?filter={filter_str}" f"&sort_by=creation_date[desc]&page_size=1",
     )
     # Get the list of the ContainerImages with given parameters
-    rsp = pyxis.get(get_previous_image_url)
+    rsp = pyxis.get(get_previous_image_url, include=["data._id", "data.repositories"])
     rsp.raise_for_status()
 
     query_results = rsp.json()["data"]
@@ -195,9 +195,11 @@ def remove_latest_from_previous_image(pyxis_url: str, isv_pid: str):
         LOGGER.info("Removing LATEST tag")
         del prev_image["repositories"][repo_no]["tags"][tag_no]
 
-        put_image_url = urljoin(pyxis_url, f"v1/images/id/{prev_image['_id']}")
+        patch_image_url = urljoin(pyxis_url, f"v1/images/id/{prev_image['_id']}")
 
-        pyxis.put(put_image_url, prev_image)
+        # Only repositories of the image are downloaded, so the image is patched
+        # instead of replaced
+        pyxis.patch(patch_image_url, {"repositories": prev_image["repositories"]})
 
 
 def main():
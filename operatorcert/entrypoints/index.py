@@ -2,10 +2,13 @@ import argparse
 import logging
 
 from operatorcert import iib, utils
-from typing import Any, List
+from operatorcert.polling import FINISHED_STATES, SCHEDULERS, PollScheduler
+from typing import Any, Dict, Iterator, List, Optional
 import time
 import os
-from datetime import datetime, timedelta
+
+import requests
+import yaml
 
 
 LOGGER = logging.getLogger("operator-cert")
@@ -19,15 +22,23 @@ def setup_argparser() -> argparse.ArgumentParser:
         Any: Initialized argument parser
     """
     parser = argparse.ArgumentParser(description="Publish bundle to index image")
-    parser.add_argument(
-        "--bundle-pullspec", required=True, help="Operator bundle pullspec"
+    bundles = parser.add_mutually_exclusive_group(required=True)
+    bundles.add_argument(
+        "--bundle-pullspec",
+        nargs="+",
+        help="Operator bundle pullspec(s), all published to the --indices",
+    )
+    bundles.add_argument(
+        "--manifest",
+        help="YAML file with a list of bundles to publish, each either a bundle "
+        "pullspec or a mapping with 'bundle' pullspec and its 'indices' "
+        "(--indices are used when missing)",
     )
     parser.add_argument(
         "--from-index", required=True, help="Base index pullspec (without tag)"
     )
     parser.add_argument(
         "--indices",
-        required=True,
         nargs="+",
         help="List of indices the bundle supports, e.g --indices registry/index:v4.9 registry/index:v4.8",
     )
@@ -36,12 +47,60 @@ def setup_argparser() -> argparse.ArgumentParser:
         default="https://iib.engineering.redhat.com",
         help="Base URL for IIB API",
     )
+    parser.add_argument(
+        "--per-index",
+        action="store_true",
+        help="Track each index build on its own and report it as soon as it finishes",
+    )
+    parser.add_argument(
+        "--resubmit-failed",
+        type=int,
+        default=0,
+        help="Number of times only the failed index builds are resubmitted "
+        "(implies --per-index)",
+    )
+    parser.add_argument(
+        "--poll-scheduler",
+        choices=sorted(SCHEDULERS),
+        default="fixed",
+        help="Strategy deciding how often the IIB builds are polled. The adaptive "
+        "strategy predicts the build duration from the latest IIB builds.",
+    )
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
 
     return parser
 
 
-def wait_for_results(iib_url: str, batch_id: int, timeout=30 * 60, delay=20) -> Any:
+def get_scheduler(name: str, iib_url: str) -> PollScheduler:
+    """
+    Create a poll scheduler, the adaptive scheduler learns from the latest
+    IIB builds
+
+    Args:
+        name (str): Scheduler name (fixed, exponential or adaptive)
+        iib_url (str): url of IIB instance
+
+    Returns:
+        PollScheduler: Poll scheduler
+    """
+    if name != "adaptive":
+        return SCHEDULERS[name]()
+    try:
+        builds = iib.get_recent_builds(iib_url)["items"]
+    except requests.RequestException:
+        LOGGER.warning("Unable to get latest IIB builds, polling without history")
+        builds = []
+    return SCHEDULERS[name](builds=builds)
+
+
+def wait_for_results(
+    iib_url: str,
+    batch_id: int,
+    timeout=30 * 60,
+    delay=20,
+    scheduler: Optional[PollScheduler] = None,
+    clock: Any = time,
+) -> Any:
     """
     Wait for IIB build till it finishes
 
@@ -50,11 +109,17 @@ def wait_for_results(iib_url: str, batch_id: int, timeout=30 * 60, delay=20) ->
         batch_id (int): IIB batch identifier
         timeout ([type], optional): Maximum wait time. Defaults to 30*60.
         delay (int, optional): Delay between build pollin. Defaults to 20.
+        scheduler (Optional[PollScheduler]): Scheduler deciding the delay
+            between polls. Defaults to polling with a fixed delay.
+        clock (Any, optional): Clock providing time() and sleep().
+            Defaults to the time module.
 
     Returns:
         Any: Build response
     """
-    start_time = datetime.now()
+    scheduler = scheduler or PollScheduler(delay)
+    scheduler.start()
+    start_time = clock.time()
     loop = True
 
     while loop:
@@ -80,57 +145,319 @@ def wait_for_results(iib_url: str, batch_id: int, timeout=30 * 60, delay=20) ->
         LOGGER.debug("Current states [build id - state]:")
         for build in builds:
             LOGGER.debug(f"{build['id']} - {build['state']}")
+            if build.get("state") in FINISHED_STATES:
+                scheduler.observe(build)
 
-        if datetime.now() - start_time > timedelta(seconds=timeout):
+        now = clock.time()
+        if now - start_time >= timeout:
             LOGGER.error(f"Timeout: Waiting for IIB batch build failed: {batch_id}.")
             break
 
-        LOGGER.info(f"Waiting for IIB batch build to finish: {batch_id}")
-        time.sleep(delay)
+        pending = [b for b in builds if b.get("state") not in FINISHED_STATES]
+        next_delay = scheduler.next_delay(pending, now)
+        LOGGER.info(
+            f"Waiting for IIB batch build to finish: {batch_id} "
+            f"(next poll in {next_delay:.0f}s)"
+        )
+        clock.sleep(min(next_delay, start_time + timeout - now))
     return None
 
 
-def publish_bundle(
-    from_index: str, bundle_pullspec: str, iib_url: str, index_versions: List[str]
-) -> None:
+def iter_build_results(
+    iib_url: str,
+    batch_id: int,
+    timeout=30 * 60,
+    delay=20,
+    scheduler: Optional[PollScheduler] = None,
+    clock: Any = time,
+) -> Iterator[Dict[str, Any]]:
     """
-    Publish a bundle to index image using IIB
+    Wait for IIB builds of the batch and yield each build as soon as it finishes
 
     Args:
-        iib_url: url of IIB instance
-        bundle_pullspec: bundle pullspec
-        from_index: target index pullspec
-        index_versions: list of index versions (tags)
-    Raises:
-        Exception: Exception is raised when IIB build fails
+        iib_url (str): url of IIB instance
+        batch_id (int): IIB batch identifier
+        timeout ([type], optional): Maximum wait time. Defaults to 30*60.
+        delay (int, optional): Delay between build polling. Defaults to 20.
+        scheduler (Optional[PollScheduler]): Scheduler deciding the delay
+            between polls. Defaults to polling with a fixed delay.
+        clock (Any, optional): Clock providing time() and sleep().
+            Defaults to the time module.
+
+    Yields:
+        Dict[str, Any]: Finished (complete or failed) build
+    """
+    scheduler = scheduler or PollScheduler(delay)
+    scheduler.start()
+    start_time = clock.time()
+    finished = set()
+
+    while True:
+        builds = iib.get_builds(iib_url, batch_id)["items"]
+
+        for build in builds:
+            if build["id"] not in finished and build.get("state") in FINISHED_STATES:
+                finished.add(build["id"])
+                scheduler.observe(build)
+                yield build
+
+        pending = [build for build in builds if build["id"] not in finished]
+        if not pending:
+            return
+
+        LOGGER.debug("Pending builds [build id - state]:")
+        for build in pending:
+            LOGGER.debug(f"{build['id']} - {build['state']}")
+
+        now = clock.time()
+        if now - start_time >= timeout:
+            LOGGER.error(f"Timeout: Waiting for IIB batch build failed: {batch_id}.")
+            return
+
+        next_delay = scheduler.next_delay(pending, now)
+        LOGGER.info(
+            f"Waiting for {len(pending)} of {len(builds)} IIB builds "
+            f"to finish: {batch_id} (next poll in {next_delay:.0f}s)"
+        )
+        clock.sleep(min(next_delay, start_time + timeout - now))
+
+
+def _get_build_payload(
+    from_index: str, index_bundles: Dict[str, List[str]]
+) -> Dict[str, Any]:
     """
+    Get IIB add-rm-batch payload adding the bundles to their index versions,
+    all bundles of the same index version are added by a single build
 
+    Args:
+        from_index: target index pullspec
+        index_bundles: bundle pullspecs by index version (tag)
+
+    Returns:
+        Dict[str, Any]: IIB batch build payload
+    """
     user = os.getenv("QUAY_USER")
     token = os.getenv("QUAY_TOKEN")
 
     payload = {"build_requests": []}
 
-    for version in index_versions:
+    for version, bundles in index_bundles.items():
         payload["build_requests"].append(
             {
                 "from_index": f"{from_index}:{version}",
-                "bundles": [bundle_pullspec],
+                "bundles": bundles,
                 "overwrite_from_index": True,
                 "add_arches": ["amd64", "s390x", "ppc64le"],
                 "overwrite_from_index_token": f"{user}:{token}",
             }
         )
+    return payload
 
+
+def publish_bundles_per_index(
+    from_index: str,
+    index_bundles: Dict[str, List[str]],
+    iib_url: str,
+    resubmit: int = 0,
+    scheduler: Optional[PollScheduler] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Publish bundles to index images using IIB and track each index on its own.
+
+    Result of every index is reported as soon as its build finishes. Failed
+    index versions are resubmitted (without the rest of the batch) up to
+    the given number of times.
+
+    Args:
+        from_index: target index pullspec
+        index_bundles: bundle pullspecs by index version (tag)
+        iib_url: url of IIB instance
+        resubmit: number of times the failed index versions are resubmitted
+        scheduler: scheduler deciding the delay between polls
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Last build of each index version
+    """
+    results = {}
+    versions = list(index_bundles)
+
+    for attempt in range(resubmit + 1):
+        if attempt:
+            LOGGER.warning(
+                f"Resubmitting failed index versions ({attempt}/{resubmit}): "
+                f"{', '.join(versions)}"
+            )
+        for version in versions:
+            results.pop(version, None)
+
+        payload = _get_build_payload(
+            from_index, {version: index_bundles[version] for version in versions}
+        )
+        resp = iib.add_builds(iib_url, payload)
+        batch_id = resp[0]["batch"]
+
+        failed = []
+        for build in iter_build_results(iib_url, batch_id, scheduler=scheduler):
+            version = build["from_index"].rsplit(":", 1)[-1]
+            results[version] = build
+            if build["state"] == "complete":
+                LOGGER.info(
+                    f"Index {version} published: {build.get('index_image')} "
+                    f"(build {build['id']})"
+                )
+                continue
+
+            failed.append(version)
+            LOGGER.error(f"Index {version} failed: IIB build {build['id']}")
+            state_history = build.get("state_history", [])
+            if state_history:
+                reason = state_history[0].get("state_reason")
+                LOGGER.info(f"Reason: {reason}")
+
+        # builds that didn't finish in time are not resubmitted
+        if not failed:
+            break
+        versions = failed
+
+    return results
+
+
+def publish_bundles(
+    from_index: str,
+    index_bundles: Dict[str, List[str]],
+    iib_url: str,
+    per_index: bool = False,
+    resubmit: int = 0,
+    scheduler: Optional[PollScheduler] = None,
+) -> None:
+    """
+    Publish bundles to index images using IIB in a single batch
+
+    Args:
+        from_index: target index pullspec
+        index_bundles: bundle pullspecs by index version (tag)
+        iib_url: url of IIB instance
+        per_index: track and report each index build on its own
+        resubmit: number of times only the failed index versions are
+            resubmitted, implies per_index
+        scheduler: scheduler deciding the delay between polls
+    Raises:
+        Exception: Exception is raised when IIB build fails
+    """
+    if per_index or resubmit:
+        results = publish_bundles_per_index(
+            from_index, index_bundles, iib_url, resubmit, scheduler
+        )
+        failed = [
+            version
+            for version in index_bundles
+            if results.get(version, {}).get("state") != "complete"
+        ]
+        if failed:
+            raise Exception(f"IIB build failed for index versions: {failed}")
+        return
+
+    payload = _get_build_payload(from_index, index_bundles)
     resp = iib.add_builds(iib_url, payload)
 
     batch_id = resp[0]["batch"]
-    response = wait_for_results(iib_url, batch_id)
+    response = wait_for_results(iib_url, batch_id, scheduler=scheduler)
     if response is None or not all(
         [build.get("state") == "complete" for build in response["items"]]
     ):
         raise Exception("IIB build failed")
 
 
+def publish_bundle(
+    from_index: str,
+    bundle_pullspec: str,
+    iib_url: str,
+    index_versions: List[str],
+    **kwargs: Any,
+) -> None:
+    """
+    Publish a bundle to index image using IIB
+
+    Args:
+        iib_url: url of IIB instance
+        bundle_pullspec: bundle pullspec
+        from_index: target index pullspec
+        index_versions: list of index versions (tags)
+        kwargs: options of publish_bundles (per_index, resubmit, scheduler)
+    Raises:
+        Exception: Exception is raised when IIB build fails
+    """
+    index_bundles = {version: [bundle_pullspec] for version in index_versions}
+    publish_bundles(from_index, index_bundles, iib_url, **kwargs)
+
+
+def group_bundles(bundle_versions: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Group bundles by the index versions they are published to,
+    e.g {bundle1: [v4.8, v4.9], bundle2: [v4.9]} -> {v4.8: [bundle1], v4.9: [bundle1, bundle2]}
+
+    Args:
+        bundle_versions: index versions by bundle pullspec
+
+    Returns:
+        Dict[str, List[str]]: bundle pullspecs by index version
+    """
+    index_bundles: Dict[str, List[str]] = {}
+    for bundle, versions in bundle_versions.items():
+        for version in versions:
+            bundles = index_bundles.setdefault(version, [])
+            if bundle not in bundles:
+                bundles.append(bundle)
+    return index_bundles
+
+
+def parse_manifest(
+    path: str, default_indices: Optional[List[str]] = None
+) -> Dict[str, List[str]]:
+    """
+    Parse a manifest of bundles to publish. The manifest is a YAML list of
+    bundle pullspecs or mappings with a bundle pullspec and its indices, e.g.
+
+        - bundle: registry/bundle1:v1.0.0
+          indices: [registry/index:v4.8, registry/index:v4.9]
+        - registry/bundle2:v2.0.0
+
+    Args:
+        path: Path to the manifest file
+        default_indices: Indices of the bundles without explicit indices
+
+    Returns:
+        Dict[str, List[str]]: index versions by bundle pullspec
+    """
+    with open(path, "r") as fh:
+        entries = yaml.safe_load(fh) or []
+    if not isinstance(entries, list):
+        raise Exception(
+            f"Invalid manifest {path}: expected a list of bundles, "
+            f"got {type(entries).__name__}"
+        )
+
+    bundle_versions = {}
+    for position, entry in enumerate(entries, start=1):
+        if isinstance(entry, str):
+            entry = {"bundle": entry}
+        if not isinstance(entry, dict) or not isinstance(entry.get("bundle"), str):
+            raise Exception(
+                f"Invalid manifest entry #{position}: {entry!r}, "
+                f"expected a bundle pullspec or a mapping with a 'bundle' key"
+            )
+        if entry["bundle"] in bundle_versions:
+            raise Exception(
+                f"Invalid manifest entry #{position}: "
+                f"bundle {entry['bundle']} is listed more than once"
+            )
+        indices = entry.get("indices") or default_indices
+        if not indices:
+            raise Exception(f"No indices defined for bundle {entry['bundle']}")
+        bundle_versions[entry["bundle"]] = parse_indices(indices)
+    return bundle_versions
+
+
 def parse_indices(indices: List[str]) -> List[str]:
     """
     Parses a list of indices and returns only the versions,
@@ -167,8 +494,21 @@ def main() -> None:  # pragma: no cover
 
     utils.set_client_keytab(os.environ.get("KRB_KEYTAB_FILE", "/etc/krb5.krb"))
 
-    publish_bundle(
-        args.from_index, args.bundle_pullspec, args.iib_url, parse_indices(args.indices)
+    if args.manifest:
+        bundle_versions = parse_manifest(args.manifest, args.indices)
+    elif args.indices:
+        versions = parse_indices(args.indices)
+        bundle_versions = {bundle: versions for bundle in args.bundle_pullspec}
+    else:
+        parser.error("--indices are required with --bundle-pullspec")
+
+    publish_bundles(
+        args.from_index,
+        group_bundles(bundle_versions),
+        args.iib_url,
+        per_index=args.per_index,
+        resubmit=args.resubmit_failed,
+        scheduler=get_scheduler(args.poll_scheduler, args.iib_url),
     )
 
 
@@ -0,0 +1,34 @@
+import argparse
+import logging
+import sys
+
+from operatorcert.cache import DiskCache
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Removes cached supported indices, e.g. after an OCP release."
+    )
+    parser.add_argument("cache_dir", help="Directory caching the supported indices")
+    parser.add_argument(
+        "--organization",
+        choices=("certified-operators", "redhat-marketplace"),
+        help="Remove only the indices of the organization",
+    )
+
+    return parser
+
+
+def main() -> None:
+    logging.basicConfig(stream=sys.stdout, level="INFO", format="%(message)s")
+
+    parser = setup_argparser()
+    args = parser.parse_args()
+
+    match = {"organization": args.organization} if args.organization else {}
+    removed = DiskCache(args.cache_dir).invalidate(**match)
+    logging.info(f"Removed {removed} cached entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ from twirp.context import Context
 from twirp.exceptions import TwirpServerException
 from google.protobuf.json_format import Parse
 
-from operatorcert import get_csv_content
+from operatorcert import OperatorBundle
 from operatorcert.webhook.webhook import webhook_twirp
 from operatorcert.webhook.webhook import webhook_pb2
 from operatorcert.logger import setup_logger
@@ -80,8 +80,8 @@ def call_ibm_webhook(args: Any) -> None:
         )
         sys.exit(1)
 
-    csv = get_csv_content(pathlib.Path(args.bundle_path), args.package)
-    related_images = csv.get("spec", {}).get("relatedImages")
+    bundle = OperatorBundle(pathlib.Path(args.bundle_path), args.package)
+    related_images = bundle.related_images
     if not related_images:
         LOGGER.error("No related images found in cluster service version file.")
         sys.exit(1)
@@ -4,7 +4,8 @@ import logging
 import pathlib
 import sys
 
-from operatorcert import ocp_version_info
+from operatorcert import OperatorBundle, ocp_version_info
+from operatorcert.cache import DEFAULT_TTL, DiskCache
 
 
 def setup_argparser() -> argparse.ArgumentParser:
@@ -22,6 +23,21 @@ def setup_argparser() -> argparse.ArgumentParser:
         default="https://catalog.redhat.com/api/containers/",
         help="Base URL for Pyxis container metadata API",
     )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory caching the supported indices, e.g. a shared volume",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help="Time the cached indices are used without revalidation (seconds)",
+    )
+    parser.add_argument(
+        "--local-resolver",
+        action="store_true",
+        help="Resolve the OCP versions range locally against the index catalogue",
+    )
 
     return parser
 
@@ -32,8 +48,18 @@ def main() -> None:
     parser = setup_argparser()
     args = parser.parse_args()
 
-    bundle_path = pathlib.Path(args.bundle_path)
-    version_info = ocp_version_info(bundle_path, args.pyxis_url, args.organization)
+    cache = None
+    if args.cache_dir:
+        cache = DiskCache(args.cache_dir, ttl=args.cache_ttl)
+
+    bundle = OperatorBundle(pathlib.Path(args.bundle_path))
+    version_info = ocp_version_info(
+        bundle,
+        args.pyxis_url,
+        args.organization,
+        cache=cache,
+        local=args.local_resolver,
+    )
     logging.info(json.dumps(version_info))
 
 
@@ -1,6 +1,7 @@
 """
 Script for publishing bundle related entities
 """
+
 import argparse
 import logging
 import textwrap
@@ -12,6 +13,21 @@ from operatorcert import pyxis, utils
 
 LOGGER = logging.getLogger("operator-cert")
 
+# Pyxis fields used for publishing, other fields are not downloaded
+VENDOR_FIELDS = ["_id", "label", "published"]
+REPOSITORY_FIELDS = ["data._id", "data.published"]
+PROJECT_FIELDS = [
+    "name",
+    "org_id",
+    "container.application_categories",
+    "container.distribution_method",
+    "container.isv_pid",
+    "container.privileged",
+    "container.release_category",
+    "container.repository_description",
+    "container.repository_name",
+]
+
 
 def setup_argparser() -> Any:
     """
@@ -66,7 +82,9 @@ def publish_vendor(args: Any) -> Dict[str, Any]:
         Dict[str, Any]: Vendor object
     """
     LOGGER.info("Publishing vendor...")
-    vendor = pyxis.get_vendor_by_org_id(args.pyxis_url, args.org_id)
+    vendor = pyxis.get_vendor_by_org_id(
+        args.pyxis_url, args.org_id, include=VENDOR_FIELDS
+    )
 
     identifier = vendor.get("_id")
     published = vendor.get("published", False)
@@ -98,10 +116,14 @@ def publish_repository(args: Any) -> Dict[str, Any]:
         Dict[str, Any]: Repository object
     """
     LOGGER.info("Publishing repository...")
-    project = pyxis.get_project(args.pyxis_url, args.cert_project_id)
+    project = pyxis.get_project(
+        args.pyxis_url, args.cert_project_id, include=PROJECT_FIELDS
+    )
     isv_pid = project.get("container", {}).get("isv_pid")
 
-    repository = pyxis.get_repository_by_isv_pid(args.pyxis_url, isv_pid)
+    repository = pyxis.get_repository_by_isv_pid(
+        args.pyxis_url, isv_pid, include=REPOSITORY_FIELDS
+    )
     if repository:
         repo_id = repository.get("_id")
         LOGGER.info(f"Repository already exists: {repo_id}")
@@ -143,7 +165,9 @@ def create_repository(args: Any, project: Dict[str, Any]) -> Any:
         )
         return None
 
-    vendor = pyxis.get_vendor_by_org_id(args.pyxis_url, project.get("org_id"))
+    vendor = pyxis.get_vendor_by_org_id(
+        args.pyxis_url, project.get("org_id"), include=VENDOR_FIELDS
+    )
     vendor_label = vendor["label"]
 
     repo_name = container.get("repository_name")
@@ -32,20 +32,16 @@ def setup_argparser() -> argparse.ArgumentParser:
 
 
 def check_operator_name(args) -> None:
-    rsp = pyxis.get(
-        urljoin(
-            args.pyxis_url,
-            f"v1/operators/packages?filter=package_name=={args.operator_name}",
-        )
+    packages = pyxis.iter_pages(
+        urljoin(args.pyxis_url, "v1/operators/packages"),
+        filter=f"package_name=={args.operator_name}",
+        include=["data.association"],
     )
 
-    rsp.raise_for_status()
-
-    packages = rsp.json().get("data")
+    # package names are unique, so there should only be 1
+    package = next(packages, None)
 
-    if packages:
-        # package names are unique, so there should only be 1
-        package = packages[0]
+    if package:
         if package["association"] != args.association:
             LOGGER.error(
                 f"Operator name {args.operator_name} is already taken by another "
@@ -0,0 +1,64 @@
+import argparse
+import logging
+import pathlib
+from typing import Any
+
+from operatorcert import scan
+from operatorcert.logger import setup_logger
+
+LOGGER = logging.getLogger("operator-cert")
+
+
+def setup_argparser() -> Any:
+    """
+    Setup argument parser
+
+    Returns:
+        Any: Initialized argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Scan all the operator bundles in an operators repository."
+    )
+    parser.add_argument("repo_path", help="Location of the operators repository")
+    parser.add_argument(
+        "--output",
+        default="bundles.jsonl",
+        help="JSON lines file with a record per bundle, records of unchanged "
+        "bundles are reused from the previous content of the file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Scan all the bundles, even those that haven't changed",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Verbose output")
+    return parser
+
+
+def main() -> None:
+    """
+    Main func
+    """
+    parser = setup_argparser()
+    args = parser.parse_args()
+
+    log_level = "INFO"
+    if args.verbose:
+        log_level = "DEBUG"
+    setup_logger(level=log_level)
+
+    output = pathlib.Path(args.output)
+    previous = {} if args.full else scan.load_records(output)
+    records = scan.scan(pathlib.Path(args.repo_path), previous, args.workers)
+    total, failed = scan.write_records(output, records)
+    LOGGER.info(f"Scanned {total} bundles, {failed} with errors: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 import argparse
-import base64
 import json
 import logging
 import os
-from typing import Any, Dict, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 from urllib.parse import urljoin
 
-import magic
-from operatorcert import pyxis
+import requests
+from operatorcert import mime, pyxis
+from operatorcert.utils import get_file_digest
 from operatorcert.logger import setup_logger
+from operatorcert.streaming import COMPRESSIONS, CompressedBody, JSONFileBody
 
 LOGGER = logging.getLogger("operator-cert")
 
@@ -49,6 +52,22 @@ def setup_argparser() -> Any:
         help="Type of artifact",
         required=True,
     )
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=1,
+        help="Number of artifacts uploaded at once",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=COMPRESSIONS,
+        help="Compress the upload requests with given Content-Encoding",
+    )
+    parser.add_argument(
+        "--upload-cache",
+        help="Path to a local cache of uploaded artifacts. When set, artifacts "
+        "that were already uploaded with the same content are skipped.",
+    )
     parser.add_argument(
         "--output",
         default="output.json",
@@ -80,7 +99,87 @@ def get_artifacts(artifacts_dir: str) -> List[str]:
     return artifact_paths
 
 
-def upload_artifact(args: Any, file_path: str, org_id: Any = None) -> Dict[str, Any]:
+class ArtifactCache:
+    """
+    Lookup of already uploaded artifacts, so repeated uploads (e.g. pipeline
+    retries) don't send the same content again.
+
+    Artifacts are looked up in a local cache by (cert project ID,
+    certification hash, file name, SHA-256 digest). Pyxis doesn't store
+    artifact digests, so the artifacts uploaded without the cache can't be
+    told apart from changed files with the same name and are uploaded again.
+    """
+
+    # Artifact fields kept in the cache, the content is never stored
+    FIELDS = ["_id", "certification_hash", "content_type", "filename", "file_size"]
+
+    def __init__(self, args: Any, path: str):
+        """
+        Args:
+            args (Any): CLI arguments
+            path (str): Path to the local cache file
+        """
+        self.args = args
+        self.path = path
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        if os.path.isfile(path):
+            with open(path, "r") as cache_file:
+                self._cache = json.load(cache_file)
+
+    def key(self, file_path: str) -> str:
+        """
+        Get the cache key of the artifact file
+
+        Args:
+            file_path (str): Path to an artifact file
+
+        Returns:
+            str: Cache key
+        """
+        return "/".join(
+            [
+                str(self.args.cert_project_id),
+                self.args.certification_hash,
+                os.path.basename(file_path),
+                get_file_digest(file_path),
+            ]
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the already uploaded artifact
+
+        Args:
+            key (str): Cache key of the artifact
+
+        Returns:
+            Optional[Dict[str, Any]]: Uploaded artifact, None if not uploaded yet
+        """
+        return self._cache.get(key)
+
+    def put(self, key: str, artifact: Dict[str, Any]) -> None:
+        """
+        Store the uploaded artifact in the local cache
+
+        Args:
+            key (str): Cache key of the artifact
+            artifact (Dict[str, Any]): Uploaded artifact
+        """
+        with self._lock:
+            self._cache[key] = {
+                field: artifact[field] for field in self.FIELDS if field in artifact
+            }
+            with open(self.path, "w") as cache_file:
+                json.dump(self._cache, cache_file)
+
+
+def upload_artifact(
+    args: Any,
+    file_path: str,
+    org_id: Any = None,
+    cache: Optional[ArtifactCache] = None,
+) -> Dict[str, Any]:
     """
     Upload artifact using Pyxis API
 
@@ -88,24 +187,28 @@ def upload_artifact(args: Any, file_path: str, org_id: Any = None) -> Dict[str,
         args (Any): CLI arguments
         file_path (str): Path to a artifact file
         org_id (Any): organization ID - optional
+        cache (Optional[ArtifactCache]): Already uploaded artifacts - optional
 
     Returns:
         Dict[str, Any]: Pyxis response
     """
+    if cache:
+        key = cache.key(file_path)
+        artifact = cache.get(key)
+        if artifact is not None:
+            LOGGER.info(f"Artifact already uploaded: {file_path}")
+            return artifact
+
     upload_url = urljoin(
         args.pyxis_url, f"v1/projects/certification/id/{args.cert_project_id}/artifacts"
     )
     file_name = os.path.basename(file_path)
     file_size = os.path.getsize(file_path)
-    with open(file_path, "rb") as artifact:
-        content = artifact.read()
-    base64_content = base64.b64encode(content).decode("utf8")
 
-    mime = magic.from_file(file_path, mime=True)
+    content_type = mime.from_file(file_path)
     artifact_payload = {
-        "content": base64_content,
         "certification_hash": args.certification_hash,
-        "content_type": mime,
+        "content_type": content_type,
         "filename": file_name,
         "file_size": file_size,
         "operator_package_name": args.operator_package_name,
@@ -113,28 +216,55 @@ def upload_artifact(args: Any, file_path: str, org_id: Any = None) -> Dict[str,
     }
     if org_id:
         artifact_payload["org_id"] = org_id
-    return pyxis.post(upload_url, artifact_payload)
+    # The file is encoded while being uploaded to keep memory usage low
+    body = JSONFileBody(artifact_payload, "content", file_path)
+    if args.compression:
+        body = CompressedBody(body, args.compression)
+    response = pyxis.post(upload_url, body)
+    if cache:
+        cache.put(key, response)
+    return response
 
 
-def upload_artifacts(args: Any, org_id: Any = None) -> List[Dict[str, Any]]:
+def upload_artifacts(
+    args: Any, org_id: Any = None, cache: Optional[ArtifactCache] = None
+) -> List[Dict[str, Any]]:
     """
     Upload all test artifacts using Pyxis API
 
     Args:
         args (Any): CLI arguments
         org_id (Any): organization ID - optional
+        cache (Optional[ArtifactCache]): Already uploaded artifacts - optional
 
     Returns:
         List[Dict[str, Any]]: List of Pyxis responses
     """
     artifacts = get_artifacts(args.path)
-    responses = []
-    for artifact_path in artifacts:
+
+    def upload(artifact_path: str) -> Dict[str, Any]:
         LOGGER.info(f"Uploading artifact: {artifact_path}")
         full_path = os.path.join(args.path, artifact_path)
+        return upload_artifact(args, full_path, org_id, cache)
+
+    # All workers share the connection pool of the Pyxis client
+    with ThreadPoolExecutor(max_workers=max(1, args.parallelism)) as executor:
+        futures = [executor.submit(upload, artifact) for artifact in artifacts]
 
-        response = upload_artifact(args, full_path, org_id)
-        responses.append(response)
+    responses = []
+    failed = []
+    for artifact_path, future in zip(artifacts, futures):
+        try:
+            responses.append(future.result())
+        except (requests.RequestException, OSError) as exc:
+            LOGGER.error(f"Failed to upload artifact {artifact_path}: {exc}")
+            failed.append(artifact_path)
+
+    if failed:
+        raise Exception(
+            f"Failed to upload {len(failed)} of {len(artifacts)} artifacts: "
+            f"{', '.join(failed)}"
+        )
     return responses
 
 
@@ -181,13 +311,17 @@ def upload_results_and_artifacts(args: Any) -> Dict[str, Any]:
     if pyxis.is_internal():
         # External Pyxis gets org_id directly from API key - internally we
         # have to get it from project
-        project = pyxis.get_project(args.pyxis_url, args.cert_project_id)
+        project = pyxis.get_project(
+            args.pyxis_url, args.cert_project_id, include=["org_id"]
+        )
         org_id = project.get("org_id")
 
+    cache = ArtifactCache(args, args.upload_cache) if args.upload_cache else None
+
     if args.type in ["preflight-logs", "pipeline-logs"]:
-        response = upload_artifact(args, args.path, org_id=org_id)
+        response = upload_artifact(args, args.path, org_id=org_id, cache=cache)
     elif args.type == "preflight-artifacts":
-        response = upload_artifacts(args, org_id=org_id)
+        response = upload_artifacts(args, org_id=org_id, cache=cache)
     elif args.type == "preflight-results":
         response = upload_test_results(args, org_id=org_id)
 
@@ -204,6 +338,11 @@ def main():
     log_level = "DEBUG" if args.verbose else "INFO"
     setup_logger(log_level)
 
+    # Keep a pooled connection for every upload worker
+    os.environ.setdefault(
+        "PYXIS_POOL_MAXSIZE", str(max(args.parallelism, pyxis.DEFAULT_POOL_MAXSIZE))
+    )
+
     response = upload_results_and_artifacts(args)
     with open(args.output, "w") as output:
         json.dump(response, output)
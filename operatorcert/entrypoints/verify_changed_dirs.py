@@ -1,7 +1,9 @@
 import argparse
 import logging
+import pathlib
 
 from operatorcert import (
+    get_files_added_in_local_repo,
     get_files_added_in_pr,
     verify_changed_files_location,
     get_repo_and_org_from_github_url,
@@ -25,12 +27,32 @@ def setup_argparser() -> argparse.ArgumentParser:
         "--pr-head-label",
         help="Label of the branch to be merged. Eg. User:branch-name",
     )
+    parser.add_argument(
+        "--pr-number",
+        type=int,
+        help="Number of the PR, found by the PR head label when not set",
+    )
     parser.add_argument(
         "--git-repo-url",
         help="Github repository URL",
     )
     parser.add_argument("--repository", help="Base branch repository name")
     parser.add_argument("--base-branch", help="Base branch of the PR", default="main")
+    parser.add_argument(
+        "--local-repo",
+        type=pathlib.Path,
+        help="Local clone of the repository with the PR head checked out. "
+        "The changes are compared with the base branch in the clone "
+        "instead of using the Github API. The base branch has to be "
+        "available locally or as origin/<base-branch>, and the clone needs "
+        "enough history to find the common ancestor of the base branch and "
+        "the PR head (not a --depth 1 clone)",
+    )
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Log only the number of the changes in the expected paths",
+    )
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
 
     return parser
@@ -48,14 +70,21 @@ def main() -> None:
     logging.basicConfig(level=log_level)
 
     # Logic
-    organization, repository = get_repo_and_org_from_github_url(args.git_repo_url)
-
-    changed_files = get_files_added_in_pr(
-        organization, repository, args.base_branch, args.pr_head_label
-    )
+    if args.local_repo:
+        changed_files = get_files_added_in_local_repo(args.local_repo, args.base_branch)
+    else:
+        organization, repository = get_repo_and_org_from_github_url(args.git_repo_url)
+        # the changed files are fetched while they are verified
+        changed_files = get_files_added_in_pr(
+            organization,
+            repository,
+            args.base_branch,
+            args.pr_head_label,
+            args.pr_number,
+        )
 
     verify_changed_files_location(
-        changed_files, args.operator_name, args.bundle_version
+        changed_files, args.operator_name, args.bundle_version, args.summary_only
     )
 
 
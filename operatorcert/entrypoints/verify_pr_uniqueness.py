@@ -1,7 +1,7 @@
 import argparse
 import logging
 
-from operatorcert import verify_pr_uniqueness
+from operatorcert import UNIQUENESS_BACKENDS, verify_pr_uniqueness
 
 
 def setup_argparser() -> argparse.ArgumentParser:
@@ -16,6 +16,14 @@ def setup_argparser() -> argparse.ArgumentParser:
         default="redhat-openshift-ecosystem/operator-pipelines-test",
     )
     parser.add_argument("--bundle-name", help="Name of the bundle")
+    parser.add_argument(
+        "--backend",
+        choices=list(UNIQUENESS_BACKENDS),
+        default="list",
+        help="How the duplicate PRs are found - by listing all the open PRs "
+        "or by a single Github search for the bundle name (search results "
+        "may lag behind newly opened PRs)",
+    )
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
 
     return parser
@@ -35,7 +43,7 @@ def main() -> None:
     # Logic
     # Verify, that there is no other PR opened for this Bundle
     repos = args.available_repositories.split(",")
-    verify_pr_uniqueness(repos, args.pr_url, args.bundle_name)
+    verify_pr_uniqueness(repos, args.pr_url, args.bundle_name, backend=args.backend)
 
 
 if __name__ == "__main__":
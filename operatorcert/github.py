@@ -1,9 +1,11 @@
 import logging
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, Optional
 
 import requests
 
+from operatorcert import retry
+
 LOGGER = logging.getLogger("operator-cert")
 
 
@@ -28,12 +30,25 @@ def _get_session(auth_required: bool = False) -> requests.Session:
         raise Exception("No auth details provided for Github. Define GITHUB_TOKEN.")
 
     session = requests.Session()
-    session.headers.update(
-        {"Authorization": f"Bearer {token}", "Accept": "application/vnd.github.v3+json"}
-    )
+    retry.mount(session)
+    session.headers.update({"Accept": "application/vnd.github.v3+json"})
+    if token:
+        session.headers.update({"Authorization": f"Bearer {token}"})
     return session
 
 
+def get_session() -> requests.Session:
+    """
+    Create a Github http session to be reused by many requests, e.g. when
+    listing many repositories. Failed requests are retried and the OAuth
+    token from GITHUB_TOKEN is used when it's defined.
+
+    Returns:
+        requests.Session: Github session
+    """
+    return _get_session()
+
+
 def post(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
     """
     POST Github API request to given URL with given payload
@@ -58,3 +73,43 @@ def post(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
         )
         raise
     return resp.json()
+
+
+def iter_pages(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    session: Optional[requests.Session] = None,
+) -> Iterator[Any]:
+    """
+    Iterate over pages of a paginated Github list endpoint. The next pages are
+    requested only when the previous one is consumed, following the Link
+    header.
+
+    Args:
+        url (str): Github API URL
+        params (Optional[Dict[str, Any]]): Query parameters of the first page,
+            e.g. {"per_page": 100}
+        session (Optional[requests.Session]): Session of the requests, see
+            get_session, a new one is created when not set
+
+    Yields:
+        Any: Response of a page, a list of items or, for the search
+            endpoints, a dict with the "items"
+    """
+    session = session or get_session()
+    while url:
+        LOGGER.debug(f"GET Github request: {url}")
+        resp = session.get(url, params=params)
+
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError:
+            LOGGER.exception(
+                f"Github GET query failed with {url} - {resp.status_code} - {resp.text}"
+            )
+            raise
+        yield resp.json()
+
+        # the next page URL already contains all the query parameters
+        url = resp.links.get("next", {}).get("url")
+        params = None
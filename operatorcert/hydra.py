@@ -5,6 +5,7 @@ import requests
 import sys
 from typing import Any, Dict
 
+from operatorcert import retry
 
 LOGGER = logging.getLogger("operator-cert")
 
@@ -27,6 +28,7 @@ def _get_session() -> requests.Session:
         sys.exit(1)
 
     session = requests.Session()
+    retry.mount(session)
     session.auth = (username, password)
     return session
 
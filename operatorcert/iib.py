@@ -4,6 +4,8 @@ from requests_kerberos import HTTPKerberosAuth
 import requests
 import logging
 
+from operatorcert import retry
+
 LOGGER = logging.getLogger("operator-cert")
 
 
@@ -18,6 +20,7 @@ def get_session(kerberos_auth=True) -> Any:
         Any: IIB session
     """
     session = requests.Session()
+    retry.mount(session)
 
     if kerberos_auth:
         session.auth = HTTPKerberosAuth()
@@ -79,3 +82,42 @@ def get_builds(base_url: str, batch_id: int) -> Any:
         )
         raise
     return resp.json()
+
+
+def get_recent_builds(
+    base_url: str, state: str = "complete", request_type: str = "add", count: int = 20
+) -> Any:
+    """
+    Get the latest IIB builds in given state
+
+    Args:
+        base_url (str): Base URL of IIB API
+        state (str): Build state
+        request_type (str): Build request type
+        count (int): Number of builds
+
+    Returns:
+        Any: Build API response
+    """
+
+    session = get_session(False)
+
+    builds_url = urljoin(base_url, "api/v1/builds")
+    params = {
+        "state": state,
+        "request_type": request_type,
+        "per_page": count,
+        # state history is returned only in verbose mode
+        "verbose": "true",
+    }
+
+    resp = session.get(builds_url, params=params)
+
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError:
+        LOGGER.exception(
+            f"IIB GET query failed with {builds_url} - {resp.status_code} - {resp.text}"
+        )
+        raise
+    return resp.json()
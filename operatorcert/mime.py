@@ -0,0 +1,105 @@
+"""
+MIME type detection of artifact files
+"""
+
+import logging
+import os
+import threading
+from typing import Optional
+
+import magic
+
+LOGGER = logging.getLogger("operator-cert")
+
+# MIME types of well known artifact extensions, the types match what libmagic
+# detects for such files. Longer extensions have to be listed first.
+EXTENSION_TYPES = [
+    (".tar.gz", "application/gzip"),
+    (".tgz", "application/gzip"),
+    (".gz", "application/gzip"),
+    (".tar", "application/x-tar"),
+    (".zip", "application/zip"),
+    (".log", "text/plain"),
+    (".txt", "text/plain"),
+    (".yaml", "text/plain"),
+    (".yml", "text/plain"),
+    (".json", "application/json"),
+]
+
+# Number of bytes from the start of a file used to detect its type
+HEADER_SIZE = 64 * 1024
+
+_MAGIC: Optional[magic.Magic] = None
+_MAGIC_LOCK = threading.Lock()
+
+
+def get_magic() -> magic.Magic:
+    """
+    Get a process-wide libmagic handle, the magic database is loaded only once
+
+    Returns:
+        magic.Magic: libmagic handle detecting MIME types
+    """
+    global _MAGIC
+    with _MAGIC_LOCK:
+        if _MAGIC is None:
+            _MAGIC = magic.Magic(mime=True)
+        return _MAGIC
+
+
+def from_extension(file_name: str) -> Optional[str]:
+    """
+    Get MIME type of a file based on its extension
+
+    Args:
+        file_name (str): File name or path
+
+    Returns:
+        Optional[str]: MIME type, None for unknown extensions
+    """
+    file_name = file_name.lower()
+    for extension, mime_type in EXTENSION_TYPES:
+        if file_name.endswith(extension):
+            return mime_type
+    return None
+
+
+def from_buffer(buffer: bytes) -> str:
+    """
+    Detect MIME type of a content
+
+    Args:
+        buffer (bytes): Content or its first part
+
+    Returns:
+        str: MIME type
+    """
+    handle = get_magic()
+    # libmagic handle can't be used by multiple threads at once
+    with _MAGIC_LOCK:
+        return handle.from_buffer(buffer[:HEADER_SIZE])
+
+
+def from_file(file_path: str, buffer: Optional[bytes] = None) -> str:
+    """
+    Get MIME type of a file. Well known extensions are resolved without
+    reading the file, other files are detected from their first bytes.
+
+    Args:
+        file_path (str): Path to a file
+        buffer (Optional[bytes]): Already read content or its first part,
+            the file is not read again when provided
+
+    Returns:
+        str: MIME type
+    """
+    mime_type = from_extension(os.path.basename(file_path))
+    if mime_type:
+        return mime_type
+
+    if buffer is None:
+        with open(file_path, "rb") as fh:
+            buffer = fh.read(HEADER_SIZE)
+    mime_type = from_buffer(buffer)
+    LOGGER.debug(f"Detected MIME type of {file_path}: {mime_type}")
+    return mime_type
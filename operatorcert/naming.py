@@ -0,0 +1,52 @@
+"""
+Naming conventions of operator bundle pull requests
+"""
+
+import re
+from typing import Iterable, List, NamedTuple, Optional
+
+# Title of a bundle pull request, e.g. "operator foo-operator (1.0.0)"
+PR_TITLE_PATTERN = re.compile(r"operator ([a-zA-Z0-9-]+) \(([^\s]+)\)")
+
+# Title of any pull request submitting a bundle, the version doesn't have to
+# follow the convention
+BUNDLE_TITLE_PATTERN = re.compile(r"operator ([a-zA-Z0-9-]+) [^\s]+")
+
+
+class BundleTitle(NamedTuple):
+    """
+    Operator bundle a pull request title refers to
+    """
+
+    bundle_name: str
+    version: str
+
+
+def parse_pr_title(pr_title: str) -> Optional[BundleTitle]:
+    """
+    Parse a pull request title following the convention
+
+    Args:
+        pr_title (str): Pull request title
+
+    Returns:
+        Optional[BundleTitle]: Bundle name and version, None when the title
+            doesn't follow the convention
+    """
+    match = PR_TITLE_PATTERN.fullmatch(pr_title)
+    return BundleTitle(*match.groups()) if match else None
+
+
+def classify_titles(pr_titles: Iterable[str]) -> List[Optional[str]]:
+    """
+    Find the bundles many pull request titles refer to in a single pass
+
+    Args:
+        pr_titles (Iterable[str]): Pull request titles
+
+    Returns:
+        List[Optional[str]]: Bundle name for every title, None for titles not
+            referring to a bundle
+    """
+    match = BUNDLE_TITLE_PATTERN.fullmatch
+    return [found.group(1) if found else None for found in map(match, pr_titles)]
@@ -0,0 +1,165 @@
+"""
+Local resolution of OpenShift version ranges to the supported indices
+"""
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+from operatorcert import pyxis
+from operatorcert.cache import DiskCache
+
+LOGGER = logging.getLogger("operator-cert")
+
+Version = Tuple[int, ...]
+
+VERSION_PATTERN = re.compile(r"^v?(\d+(?:\.\d+)*)$")
+
+
+def parse_version(value: str) -> Version:
+    """
+    Parse an OpenShift version (e.g. v4.8 or 4.10)
+
+    Args:
+        value (str): OpenShift version with an optional "v" prefix
+
+    Returns:
+        Version: Numeric components of the version
+    """
+    match = VERSION_PATTERN.match(str(value).strip())
+    if not match:
+        raise ValueError(f"Invalid OpenShift version: {value}")
+    return tuple(int(part) for part in match.group(1).split("."))
+
+
+class VersionRange:
+    """
+    Range of OpenShift versions the bundle supports, inclusive on both sides
+    """
+
+    def __init__(self, minimum: Version, maximum: Optional[Version] = None):
+        """
+        Args:
+            minimum (Version): The oldest supported version
+            maximum (Optional[Version]): The newest supported version, all the
+                newer versions are supported when not set
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def includes(self, version: Version) -> bool:
+        """
+        Check if the version is in the range
+
+        Args:
+            version (Version): OpenShift version
+
+        Returns:
+            bool: True if the version is supported
+        """
+        if version < self.minimum:
+            return False
+        return self.maximum is None or version <= self.maximum
+
+
+def parse_range(expression: str) -> VersionRange:
+    """
+    Parse the value of the com.redhat.openshift.versions bundle annotation.
+
+    Supported expressions are a single version meaning the version and all
+    the later ones (v4.7), a range (v4.6-v4.9), a single version only (=v4.8)
+    and the legacy list of versions meaning the oldest one of them and all
+    the later ones (v4.5,v4.6).
+
+    Args:
+        expression (str): OpenShift versions annotation
+
+    Returns:
+        VersionRange: Range of the supported versions
+    """
+    expression = str(expression).strip()
+    try:
+        if expression.startswith("="):
+            version = parse_version(expression[1:])
+            return VersionRange(version, version)
+        if "-" in expression:
+            minimum, maximum = expression.split("-")
+            return VersionRange(parse_version(minimum), parse_version(maximum))
+        versions = [parse_version(version) for version in expression.split(",")]
+        return VersionRange(min(versions))
+    except ValueError:
+        raise ValueError(f"Invalid OpenShift versions range: {expression}") from None
+
+
+def resolve_indices(
+    ocp_versions_range: str,
+    indices: List[Dict[str, Any]],
+    max_ocp_version: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Select the indices supported by the bundle
+
+    Args:
+        ocp_versions_range (str): OpenShift versions annotation
+        indices (List[Dict[str, Any]]): Index catalogue, index records with
+            their "ocp_version"
+        max_ocp_version (Optional[str]): OLM property in the bundle CSV
+
+    Returns:
+        List[Dict[str, Any]]: Supported indices from the newest OCP version
+    """
+    versions_range = parse_range(ocp_versions_range)
+    maximum = parse_version(max_ocp_version) if max_ocp_version else None
+
+    supported = []
+    for index in indices:
+        version = parse_version(index["ocp_version"])
+        if versions_range.includes(version) and (maximum is None or version <= maximum):
+            supported.append((version, index))
+    supported.sort(key=lambda item: item[0], reverse=True)
+    return [index for _, index in supported]
+
+
+def get_index_catalogue(
+    pyxis_url: str, organization: str, cache: Optional[DiskCache] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get all the indices of the organization. A cached catalogue is used while
+    it's fresh, or when Pyxis can't be reached.
+
+    Args:
+        pyxis_url (str): Base URL to Pyxis
+        organization (str): Organization of the index (e.g. "certified-operators")
+        cache (Optional[DiskCache]): Cache of the catalogue
+
+    Returns:
+        List[Dict[str, Any]]: Index records with their "ocp_version" and "path"
+    """
+    url = urljoin(pyxis_url, "v1/operators/indices")
+    key = {"url": url, "organization": organization, "catalogue": True}
+    entry = cache.get(key) if cache else None
+    if entry and cache.is_fresh(entry):
+        LOGGER.debug(f"Using cached index catalogue of {organization}")
+        return entry["value"]
+
+    try:
+        indices = list(
+            pyxis.iter_pages(
+                url,
+                filter=f"organization=={organization}",
+                include=["data.ocp_version", "data.path"],
+                auth_required=False,
+            )
+        )
+    except requests.RequestException:
+        if not entry:
+            raise
+        LOGGER.warning("Pyxis is not available, using the cached index catalogue")
+        return entry["value"]
+
+    if cache:
+        cache.put(key, indices)
+    return indices
@@ -0,0 +1,174 @@
+"""
+Policy of the paths an operator bundle pull request may change
+"""
+
+import fnmatch
+import glob
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Verdicts of the policy
+ALLOWED = "allowed"
+DENIED = "denied"
+# Paths no glob matches aren't allowed either
+UNMATCHED = "unmatched"
+
+GLOBSTAR = "**"
+
+
+class _Node:
+    """
+    Node of the glob trie, an edge is a single path component
+    """
+
+    __slots__ = ("children", "patterns", "globstar", "verdicts")
+
+    def __init__(self) -> None:
+        # literal components
+        self.children: Dict[str, "_Node"] = {}
+        # components with wildcards, e.g. "*.yaml"
+        self.patterns: List[Tuple["re.Pattern[str]", "_Node"]] = []
+        # node matching any number of components, e.g. "**" in "a/**/b"
+        self.globstar: Optional["_Node"] = None
+        # verdicts of the globs ending in the node
+        self.verdicts: Set[str] = set()
+
+
+class PathPolicy:
+    """
+    Allowed and denied path globs compiled into a prefix trie.
+
+    The globs are matched component by component, so a directory only
+    matches itself and never a sibling with a longer name
+    ("operators/foo/1.0/**" doesn't match "operators/foo/1.0.1/x"). A "*"
+    component matches a single path component, a "**" component matches any
+    number of them, trailing "**" only the content of the directory. Denied
+    globs take precedence over the allowed ones.
+
+    A path is classified in a single walk of the trie, literal components are
+    looked up instead of matching every glob, so the time depends on the
+    number of the path components and a diff is classified in linear time.
+    """
+
+    def __init__(self, allowed: Iterable[str] = (), denied: Iterable[str] = ()):
+        """
+        Args:
+            allowed (Iterable[str]): Globs of the allowed paths
+            denied (Iterable[str]): Globs of the denied paths
+        """
+        self._root = _Node()
+        self._closures: Dict[_Node, Tuple[_Node, ...]] = {}
+        self.allowed: List[str] = []
+        self.denied: List[str] = []
+        for glob in allowed:
+            self.add(glob, ALLOWED)
+        for glob in denied:
+            self.add(glob, DENIED)
+
+    def add(self, glob: str, verdict: str) -> None:
+        """
+        Add a glob to the policy
+
+        Args:
+            glob (str): Path glob relative to the repository root
+            verdict (str): ALLOWED or DENIED
+        """
+        if verdict not in (ALLOWED, DENIED):
+            raise ValueError(f"Invalid path policy verdict: {verdict}")
+        (self.allowed if verdict == ALLOWED else self.denied).append(glob)
+        self._closures.clear()
+
+        components = glob.strip("/").split("/")
+        if components[-1] == GLOBSTAR:
+            # the directory content, not the directory itself
+            components[-1:] = ["*", GLOBSTAR]
+
+        node = self._root
+        for component in components:
+            if component == GLOBSTAR:
+                if not node.globstar:
+                    # the globstar node matches components looping to itself
+                    node.globstar = _Node()
+                    node.globstar.globstar = node.globstar
+                node = node.globstar
+            elif not any(char in component for char in "*?["):
+                node = node.children.setdefault(component, _Node())
+            else:
+                pattern = re.compile(fnmatch.translate(component))
+                for existing, child in node.patterns:
+                    if existing.pattern == pattern.pattern:
+                        node = child
+                        break
+                else:
+                    child = _Node()
+                    node.patterns.append((pattern, child))
+                    node = child
+        node.verdicts.add(verdict)
+
+    def _closure(self, node: _Node) -> Tuple[_Node, ...]:
+        """
+        The node and the globstar nodes following it, which match no
+        components
+        """
+        closure = self._closures.get(node)
+        if closure is None:
+            closure = (node,)
+            if node.globstar and node.globstar is not node:
+                closure += self._closure(node.globstar)
+            self._closures[node] = closure
+        return closure
+
+    def classify(self, path: str) -> str:
+        """
+        Classify a path
+
+        Args:
+            path (str): Path relative to the repository root
+
+        Returns:
+            str: ALLOWED, DENIED or UNMATCHED
+        """
+        nodes = self._closure(self._root)
+        for component in path.strip("/").split("/"):
+            matched: List[_Node] = []
+            for node in nodes:
+                child = node.children.get(component)
+                if child:
+                    matched.extend(self._closure(child))
+                for pattern, child in node.patterns:
+                    if pattern.match(component):
+                        matched.extend(self._closure(child))
+                if node.globstar is node:
+                    matched.append(node)
+            if not matched:
+                return UNMATCHED
+            nodes = tuple(dict.fromkeys(matched)) if len(matched) > 1 else matched
+
+        verdicts = set().union(*(node.verdicts for node in nodes))
+        if DENIED in verdicts:
+            return DENIED
+        return ALLOWED if verdicts else UNMATCHED
+
+
+def bundle_policy(operator_name: str, bundle_version: str) -> PathPolicy:
+    """
+    Policy of a pull request submitting an operator bundle, only the bundle
+    directory and the operator config can be changed
+
+    Args:
+        operator_name (str): Name of the operator
+        bundle_version (str): Version of the submitted bundle
+
+    Returns:
+        PathPolicy: Policy of the changed paths
+    """
+    # the name and version come from the PR title, wildcards in them are
+    # matched literally
+    operator_name = glob.escape(operator_name)
+    bundle_version = glob.escape(bundle_version)
+    return PathPolicy(
+        allowed=[
+            f"operators/{operator_name}/{bundle_version}/**",
+            f"operators/{operator_name}/ci.yaml",
+        ]
+    )
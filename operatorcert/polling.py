@@ -0,0 +1,223 @@
+"""
+Schedulers deciding how long to wait between polls of IIB builds
+"""
+
+import logging
+import statistics
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+LOGGER = logging.getLogger("operator-cert")
+
+# Build states after which the build doesn't change anymore
+FINISHED_STATES = ("complete", "failed")
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    Parse IIB timestamp (e.g. 2021-06-22T12:34:56.789012Z)
+
+    Args:
+        value (str): ISO 8601 timestamp
+
+    Returns:
+        float: POSIX timestamp
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def get_build_start(build: Dict[str, Any]) -> Optional[float]:
+    """
+    Get the time the build was submitted based on its state history
+
+    Args:
+        build (Dict[str, Any]): IIB build
+
+    Returns:
+        Optional[float]: POSIX timestamp, None if the build has no history
+    """
+    # State history is ordered from the newest state
+    history = build.get("state_history") or []
+    if not history or not history[-1].get("updated"):
+        return None
+    return parse_timestamp(history[-1]["updated"])
+
+
+def get_build_duration(build: Dict[str, Any]) -> Optional[float]:
+    """
+    Get the time it took the finished build to finish
+
+    Args:
+        build (Dict[str, Any]): IIB build
+
+    Returns:
+        Optional[float]: Duration in seconds, None if the build isn't finished
+            or its history is missing
+    """
+    history = build.get("state_history") or []
+    start = get_build_start(build)
+    if build.get("state") not in FINISHED_STATES or start is None:
+        return None
+    if not history[0].get("updated"):
+        return None
+    return parse_timestamp(history[0]["updated"]) - start
+
+
+class PollScheduler:
+    """
+    Base scheduler polling with a fixed delay.
+
+    A scheduler is asked for the delay before every next poll. Finished builds
+    are passed to observe(), so schedulers can learn from them.
+    """
+
+    def __init__(self, delay: float = 20):
+        """
+        Args:
+            delay (float): Delay between polls (seconds)
+        """
+        self.delay = delay
+
+    def start(self) -> None:
+        """
+        Reset the state before waiting for a new batch
+        """
+
+    def observe(self, build: Dict[str, Any]) -> None:
+        """
+        Learn from a finished build
+
+        Args:
+            build (Dict[str, Any]): Finished IIB build
+        """
+
+    def next_delay(self, pending: List[Dict[str, Any]], now: float) -> float:
+        """
+        Get the delay before the next poll
+
+        Args:
+            pending (List[Dict[str, Any]]): Builds that haven't finished yet
+            now (float): Current POSIX timestamp
+
+        Returns:
+            float: Delay in seconds
+        """
+        return self.delay
+
+
+class ExponentialScheduler(PollScheduler):
+    """
+    Scheduler polling often at first and less and less frequently later
+    """
+
+    def __init__(self, initial: float = 5, factor: float = 2, max_delay: float = 120):
+        """
+        Args:
+            initial (float): Delay before the first poll (seconds)
+            factor (float): Factor the delay grows by with every poll
+            max_delay (float): Maximum delay between polls (seconds)
+        """
+        super().__init__(initial)
+        self.factor = factor
+        self.max_delay = max_delay
+        self._polls = 0
+
+    def start(self) -> None:
+        self._polls = 0
+
+    def next_delay(self, pending: List[Dict[str, Any]], now: float) -> float:
+        delay = min(self.max_delay, self.delay * self.factor**self._polls)
+        self._polls += 1
+        return delay
+
+
+class AdaptiveScheduler(PollScheduler):
+    """
+    Scheduler predicting when the builds finish based on earlier builds.
+
+    Durations of the earlier builds are taken from their state history. No
+    polls are sent until the fastest builds (10th percentile) would finish,
+    then the builds are polled often until the slowest builds (90th
+    percentile) would finish. Builds running longer than that are polled
+    with a delay growing with the time they're late. Without any history
+    the scheduler falls back to an exponential backoff.
+    """
+
+    def __init__(
+        self,
+        min_delay: float = 5,
+        max_delay: float = 120,
+        window: int = 20,
+        polls: int = 15,
+        builds: Iterable[Dict[str, Any]] = (),
+    ):
+        """
+        Args:
+            min_delay (float): Minimum delay between polls (seconds)
+            max_delay (float): Maximum delay between polls (seconds)
+            window (int): Number of the latest builds used for the prediction
+            polls (int): Number of polls while the builds are expected to finish
+            builds (Iterable[Dict[str, Any]]): Earlier finished builds
+        """
+        super().__init__(min_delay)
+        self.max_delay = max_delay
+        self.window = window
+        self.polls = polls
+        self.fallback = ExponentialScheduler(min_delay, max_delay=max_delay)
+        self._durations: "OrderedDict[Any, float]" = OrderedDict()
+        for build in builds:
+            self.observe(build)
+
+    @property
+    def expected_duration(self) -> Optional[Tuple[float, float]]:
+        """
+        Range of durations most of the builds finish in, based on the earlier
+        builds
+
+        Returns:
+            Optional[Tuple[float, float]]: 10th and 90th percentile of durations
+                (seconds), None without any history
+        """
+        durations = list(self._durations.values())
+        if len(durations) < 2:
+            return (durations[0], durations[0]) if durations else None
+        deciles = statistics.quantiles(durations, n=10)
+        return deciles[0], deciles[-1]
+
+    def start(self) -> None:
+        self.fallback.start()
+
+    def observe(self, build: Dict[str, Any]) -> None:
+        duration = get_build_duration(build)
+        if duration is None or build.get("id") in self._durations:
+            return
+        self._durations[build.get("id")] = duration
+        while len(self._durations) > self.window:
+            self._durations.popitem(last=False)
+
+    def next_delay(self, pending: List[Dict[str, Any]], now: float) -> float:
+        expected_duration = self.expected_duration
+        starts = [get_build_start(build) for build in pending]
+        if expected_duration is None or None in starts:
+            return self.fallback.next_delay(pending, now)
+
+        fastest, slowest = expected_duration
+        interval = (slowest - fastest) / self.polls
+        delays = [self.max_delay]
+        for start in starts:
+            if now < start + fastest:
+                delays.append(start + fastest - now)
+            elif now <= start + slowest:
+                delays.append(interval)
+            else:
+                # the later the build is, the less often it's polled
+                delays.append(max(interval, (now - start - slowest) / 2))
+        return max(self.delay, min(delays))
+
+
+SCHEDULERS = {
+    "fixed": PollScheduler,
+    "exponential": ExponentialScheduler,
+    "adaptive": AdaptiveScheduler,
+}
@@ -1,12 +1,27 @@
 import logging
 import os
-from typing import Any, Dict
-from urllib.parse import urljoin
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
 
 import requests
 
+from operatorcert import retry
+from operatorcert.streaming import StreamingBody
+
 LOGGER = logging.getLogger("operator-cert")
 
+# Default maximum number of connections kept in a Pyxis client pool
+DEFAULT_POOL_MAXSIZE = 10
+
+# Default number of records fetched per page from Pyxis list endpoints
+DEFAULT_PAGE_SIZE = 100
+
+# Shared Pyxis clients by (scheme, host, api key, cert, key)
+_CLIENTS: Dict[Tuple[Optional[str], ...], "PyxisClient"] = {}
+_CLIENTS_LOCK = threading.Lock()
+
 
 def is_internal() -> bool:
     """
@@ -20,63 +35,268 @@ def is_internal() -> bool:
     return cert and key
 
 
-def _get_session() -> requests.Session:
+def _get_auth_from_env() -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
-    Create a Pyxis http session with auth based on env variables.
+    Get Pyxis auth details from env variables
 
-    Auth is set to use either API key or certificate + key.
+    Returns:
+        Tuple[Optional[str], Optional[str], Optional[str]]: API key, cert path
+            and key path
+    """
+    return (
+        os.environ.get("PYXIS_API_KEY"),
+        os.environ.get("PYXIS_CERT_PATH"),
+        os.environ.get("PYXIS_KEY_PATH"),
+    )
 
-    Raises:
-        Exception: Exception is raised when auth ENV variables are missing.
 
-    Returns:
-        requests.Session: Pyxis session
+class PyxisClient:
     """
-    api_key = os.environ.get("PYXIS_API_KEY")
-    cert = os.environ.get("PYXIS_CERT_PATH")
-    key = os.environ.get("PYXIS_KEY_PATH")
+    Pyxis http client with a pooled session.
 
-    # API key or cert + key need to be provided using env variable
-    if not api_key and (not cert or not key):
-        raise Exception(
-            "No auth details provided for Pyxis. "
-            "Either define PYXIS_API_KEY or PYXIS_CERT_PATH + PYXIS_KEY_PATH"
-        )
+    The session is created lazily and kept for the whole life of the client,
+    so connections (including the TLS handshake and mTLS cert loading) are
+    reused by all requests sent through the client.
+    """
 
-    session = requests.Session()
-    if api_key:
-        LOGGER.debug("Pyxis session using API key is created")
-        session.headers.update({"X-API-KEY": api_key})
-    else:
-        LOGGER.debug("Pyxis session using cert + key is created")
-        session.cert = (cert, key)
-    return session
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cert: Optional[str] = None,
+        key: Optional[str] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        auth_required: bool = True,
+    ):
+        """
+        Args:
+            api_key (Optional[str]): Pyxis API key
+            cert (Optional[str]): Path to a client certificate
+            key (Optional[str]): Path to a client certificate key
+            pool_maxsize (int): Maximum number of connections kept in the pool
+            keep_alive (bool): Keep connections open between requests
+            auth_required (bool): Whether authentication should be required
+                for the client
+
+        Raises:
+            Exception: Exception is raised when auth details are missing.
+        """
+        # API key or cert + key need to be provided
+        if auth_required and not api_key and (not cert or not key):
+            raise Exception(
+                "No auth details provided for Pyxis. "
+                "Either define PYXIS_API_KEY or PYXIS_CERT_PATH + PYXIS_KEY_PATH"
+            )
+        self.api_key = api_key
+        self.cert = cert
+        self.key = key
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Pyxis session with auth based on the client configuration.
+
+        Auth is set to use either API key or certificate + key.
+
+        Returns:
+            requests.Session: Pyxis session
+        """
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        """
+        Create a new pooled Pyxis session
+
+        Returns:
+            requests.Session: Pyxis session
+        """
+        session = requests.Session()
+        retry.mount(session, pool_maxsize=self.pool_maxsize)
+
+        if self.api_key:
+            LOGGER.debug("Pyxis session using API key is created")
+            session.headers.update({"X-API-KEY": self.api_key})
+        elif self.cert and self.key:
+            LOGGER.debug("Pyxis session using cert + key is created")
+            session.cert = (self.cert, self.key)
+        else:
+            LOGGER.debug("Pyxis session without auth is created")
+
+        if not self.keep_alive:
+            session.headers.update({"Connection": "close"})
+        return session
+
+    @property
+    def is_authenticated(self) -> bool:
+        """
+        Check if the client sends auth details with requests
+
+        Returns:
+            bool: Client uses API key or cert + key
+        """
+        return bool(self.api_key or (self.cert and self.key))
+
+    def close(self) -> None:
+        """
+        Close the session and all pooled connections
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Pyxis GET request
+
+        Args:
+            url (str): Pyxis URL
+            kwargs (Any): Additional arguments passed to the request
+
+        Returns:
+            requests.Response: Pyxis GET request response
+        """
+        LOGGER.debug(f"GET Pyxis request: {url}")
+        return self.session.get(url, **kwargs)
+
+    def _send(
+        self, method: str, url: str, body: Union[Dict[str, Any], StreamingBody]
+    ) -> Dict[str, Any]:
+        """
+        Send a Pyxis API request with given payload and check the response status
+
+        Args:
+            method (str): HTTP method
+            url (str): Pyxis API URL
+            body (Union[Dict[str, Any], StreamingBody]): Request payload,
+                streaming bodies are sent as they are produced
+
+        Returns:
+            Dict[str, Any]: Pyxis response
+        """
+        LOGGER.debug(f"{method} Pyxis request: {url}")
+        if isinstance(body, StreamingBody):
+            resp = self.session.request(method, url, data=body, headers=body.headers)
+        else:
+            resp = self.session.request(method, url, json=body)
+
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError:
+            LOGGER.exception(
+                f"Pyxis {method} query failed with {url} - {resp.status_code} - {resp.text}"
+            )
+            raise
+        return resp.json()
+
+    def post(
+        self, url: str, body: Union[Dict[str, Any], StreamingBody]
+    ) -> Dict[str, Any]:
+        """
+        POST pyxis API request to given URL with given payload
+
+        Args:
+            url (str): Pyxis API URL
+            body (Union[Dict[str, Any], StreamingBody]): Request payload
+
+        Returns:
+            Dict[str, Any]: Pyxis response
+        """
+        return self._send("POST", url, body)
+
+    def put(self, url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        PUT pyxis API request to given URL with given payload
+
+        Args:
+            url (str): Pyxis API URL
+            body (Dict[str, Any]): Request payload
+
+        Returns:
+            Dict[str, Any]: Pyxis response
+        """
+        return self._send("PUT", url, body)
+
+    def patch(self, url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        PATCH pyxis API request to given URL with given payload
+
+        Args:
+            url (str): Pyxis API URL
+            body (Dict[str, Any]): Request payload
+
+        Returns:
+            Dict[str, Any]: Pyxis response
+        """
+        return self._send("PATCH", url, body)
+
+
+def get_client(url: str, auth_required: bool = True) -> PyxisClient:
+    """
+    Get a process-wide Pyxis client for the given URL.
+
+    One client is kept per Pyxis base URL and auth identity (based on env
+    variables). The connection pool can be tuned using PYXIS_POOL_MAXSIZE and
+    PYXIS_KEEP_ALIVE env variables.
+
+    Args:
+        url (str): Pyxis URL (any URL of the Pyxis instance)
+        auth_required (bool): Whether authentication should be required
+            for the client
+
+    Returns:
+        PyxisClient: Shared Pyxis client
+    """
+    parsed_url = urlsplit(url)
+    auth = _get_auth_from_env()
+    identity = (parsed_url.scheme, parsed_url.netloc, *auth)
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(identity)
+        if client is None or (auth_required and not client.is_authenticated):
+            client = PyxisClient(
+                *auth,
+                auth_required=auth_required,
+                pool_maxsize=int(
+                    os.environ.get("PYXIS_POOL_MAXSIZE", DEFAULT_POOL_MAXSIZE)
+                ),
+                keep_alive=os.environ.get("PYXIS_KEEP_ALIVE", "true").lower()
+                not in ("0", "false", "no"),
+            )
+            _CLIENTS[identity] = client
+    return client
+
+
+def close_clients() -> None:
+    """
+    Close and forget all shared Pyxis clients
+    """
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
 
 
-def post(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+def post(url: str, body: Union[Dict[str, Any], StreamingBody]) -> Dict[str, Any]:
     """
     POST pyxis API request to given URL with given payload
 
     Args:
         url (str): Pyxis API URL
-        body (Dict[str, Any]): Request payload
+        body (Union[Dict[str, Any], StreamingBody]): Request payload
 
     Returns:
         Dict[str, Any]: Pyxis response
     """
-    session = _get_session()
-
-    LOGGER.debug(f"POST Pyxis request: {url}")
-    resp = session.post(url, json=body)
-
-    try:
-        resp.raise_for_status()
-    except requests.HTTPError:
-        LOGGER.exception(
-            f"Pyxis POST query failed with {url} - {resp.status_code} - {resp.text}"
-        )
-        raise
-    return resp.json()
+    return get_client(url).post(url, body)
 
 
 def put(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
@@ -90,19 +310,7 @@ def put(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Pyxis response
     """
-    session = _get_session()
-
-    LOGGER.debug(f"PATCH Pyxis request: {url}")
-    resp = session.put(url, json=body)
-
-    try:
-        resp.raise_for_status()
-    except requests.HTTPError:
-        LOGGER.exception(
-            f"Pyxis PUT query failed with {url} - {resp.status_code} - {resp.text}"
-        )
-        raise
-    return resp.json()
+    return get_client(url).put(url, body)
 
 
 def patch(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
@@ -116,56 +324,143 @@ def patch(url: str, body: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Pyxis response
     """
-    session = _get_session()
+    return get_client(url).patch(url, body)
 
-    LOGGER.debug(f"PATCH Pyxis request: {url}")
-    resp = session.patch(url, json=body)
 
-    try:
-        resp.raise_for_status()
-    except requests.HTTPError:
-        LOGGER.exception(
-            f"Pyxis PATCH query failed with {url} - {resp.status_code} - {resp.text}"
-        )
-        raise
-    return resp.json()
+def _include_params(include: Optional[List[str]]) -> Dict[str, str]:
+    """
+    Query parameters for a sparse fieldset projection
+
+    Args:
+        include (Optional[List[str]]): Fields to include in the response
+
+    Returns:
+        Dict[str, str]: Query parameters
+    """
+    return {"include": ",".join(include)} if include else {}
 
 
-def get(url: str) -> Any:
+def get(url: str, include: Optional[List[str]] = None) -> Any:
     """
     Pyxis GET request
 
     Args:
         url (str): Pyxis URL
+        include (Optional[List[str]]): Fields to include in the response,
+            all fields are returned by default
 
     Returns:
         Any: Pyxis GET request response
     """
-    session = _get_session()
-    LOGGER.debug(f"GET Pyxis request: {url}")
-    resp = session.get(url)
+    resp = get_client(url).get(url, params=_include_params(include))
     # Not raising exception for error statuses, because GET request can be used to check
     # if something exists. We don't want a 404 to cause failures.
 
     return resp
 
 
-def get_project(base_url: str, project_id: str) -> Dict[str, Any]:
+def _get_page(client: PyxisClient, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get a single page of a Pyxis list endpoint
+
+    Args:
+        client (PyxisClient): Pyxis client
+        url (str): Pyxis list endpoint URL
+        params (Dict[str, Any]): Query parameters including the page number
+
+    Returns:
+        Dict[str, Any]: Pyxis page response
+    """
+    resp = client.get(url, params=params)
+
+    try:
+        resp.raise_for_status()
+    except requests.HTTPError:
+        LOGGER.exception(
+            f"Unable to get page {params['page']} of {url} - "
+            f"{resp.status_code} - {resp.text}"
+        )
+        raise
+    return resp.json()
+
+
+def iter_pages(
+    url: str,
+    filter: Optional[str] = None,
+    include: Optional[List[str]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    params: Optional[Dict[str, Any]] = None,
+    auth_required: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over all records of a paginated Pyxis list endpoint.
+
+    Records are yielded one at a time. The next page is fetched in the
+    background while the records of the current page are being consumed,
+    so at most two pages are held in memory regardless of the result size.
+
+    Args:
+        url (str): Pyxis list endpoint URL
+        filter (Optional[str]): Pyxis filter query
+        include (Optional[List[str]]): Fields to include in the response
+            records, e.g. ["data.ocp_version", "data.path"]
+        page_size (int): Number of records fetched per request
+        params (Optional[Dict[str, Any]]): Additional query parameters
+        auth_required (bool): Whether authentication should be required
+
+    Yields:
+        Dict[str, Any]: Pyxis records
+    """
+    client = get_client(url, auth_required=auth_required)
+    query = {**(params or {}), "page_size": page_size}
+    if filter:
+        query["filter"] = filter
+    if include:
+        # Total count is needed to recognize the last page
+        query["include"] = ",".join(["total", *include])
+
+    def fetch(page: int) -> Dict[str, Any]:
+        return _get_page(client, url, {**query, "page": page})
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        page = 0
+        next_page = executor.submit(fetch, page)
+        while next_page is not None:
+            resp = next_page.result()
+            data = resp.get("data", [])
+
+            next_page = None
+            fetched = page * page_size + len(data)
+            if len(data) == page_size and fetched < resp.get("total", fetched + 1):
+                page += 1
+                next_page = executor.submit(fetch, page)
+
+            yield from data
+    finally:
+        executor.shutdown(wait=False)
+
+
+def get_project(
+    base_url: str, project_id: str, include: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Get project details for given project ID
 
     Args:
         base_url (str): Pyxis base URL
         project_id (str): certification project ID
+        include (Optional[List[str]]): Project fields to include in the response,
+            all fields are returned by default
 
     Returns:
         Dict[str, Any]: Pyxis project response
     """
-    session = _get_session()
+    client = get_client(base_url)
 
     project_url = urljoin(base_url, f"v1/projects/certification/id/{project_id}")
     LOGGER.debug(f"Getting project details: {project_id}")
-    resp = session.get(project_url)
+    resp = client.get(project_url, params=_include_params(include))
 
     try:
         resp.raise_for_status()
@@ -177,22 +472,26 @@ def get_project(base_url: str, project_id: str) -> Dict[str, Any]:
     return resp.json()
 
 
-def get_vendor_by_org_id(base_url: str, org_id: str) -> Dict[str, Any]:
+def get_vendor_by_org_id(
+    base_url: str, org_id: str, include: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Get vendor using organization ID
 
     Args:
         base_url (str): Pyxis based API url
         org_id (str): Organization ID
+        include (Optional[List[str]]): Vendor fields to include in the response,
+            all fields are returned by default
 
     Returns:
         Dict[str, Any]: Vendor Pyxis response
     """
-    session = _get_session()
+    client = get_client(base_url)
 
     project_url = urljoin(base_url, f"v1/vendors/org-id/{org_id}")
     LOGGER.debug(f"Getting project details by org_id: {org_id}")
-    resp = session.get(project_url)
+    resp = client.get(project_url, params=_include_params(include))
 
     try:
         resp.raise_for_status()
@@ -204,30 +503,33 @@ def get_vendor_by_org_id(base_url: str, org_id: str) -> Dict[str, Any]:
     return resp.json()
 
 
-def get_repository_by_isv_pid(base_url: str, isv_pid: str) -> Dict[str, Any]:
+def get_repository_by_isv_pid(
+    base_url: str, isv_pid: str, include: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Get container repository using ISV pid
 
     Args:
         base_url (str): Pyxis based API url
         isv_pid (str): Project's isv_pid
+        include (Optional[List[str]]): Repository fields to include in the
+            response (e.g. ["data._id"]), all fields are returned by default
 
     Returns:
         Dict[str, Any]: Repository Pyxis response
     """
-    session = _get_session()
-
     repo_url = urljoin(base_url, "v1/repositories")
     LOGGER.debug(f"Getting repository details by isv_pid: {isv_pid}")
-    query_filter = f"isv_pid=={isv_pid}"
-    resp = session.get(repo_url, params={"filter": query_filter})
-
-    try:
-        resp.raise_for_status()
-    except requests.HTTPError:
-        LOGGER.exception(
-            f"Unable to get vendor details {repo_url} - {resp.status_code} - {resp.text}"
+    # A single page is enough, the second repository is only needed for the
+    # warning, so no other pages are fetched
+    params = {"filter": f"isv_pid=={isv_pid}", "page_size": 2, "page": 0}
+    if include:
+        params["include"] = ",".join(include)
+    repositories = _get_page(get_client(repo_url), repo_url, params).get("data", [])
+
+    if len(repositories) > 1:
+        LOGGER.warning(
+            f"Multiple repositories found for isv_pid {isv_pid}, "
+            f"using {repositories[0].get('_id')}"
         )
-        raise
-    json_resp = resp.json()
-    return None if len(json_resp.get("data")) == 0 else json_resp["data"][0]
+    return repositories[0] if repositories else None
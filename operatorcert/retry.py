@@ -0,0 +1,353 @@
+"""
+Retry layer shared by all http clients (Pyxis, IIB, Hydra, Github)
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+LOGGER = logging.getLogger("operator-cert")
+
+# Response statuses that signal a transient failure of the upstream
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Methods that can be repeated without changing the result
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+
+# Header marking a non-idempotent request (e.g. POST) as safe to repeat
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+# Default number of retries allowed per host for the whole process
+DEFAULT_HOST_BUDGET = 30
+
+
+class RetryBudget:
+    """
+    Number of retries allowed per host.
+
+    The budget is shared by all sessions of the process, so a failing upstream
+    is not hammered by retries of every single request.
+    """
+
+    def __init__(self, retries_per_host: int = DEFAULT_HOST_BUDGET):
+        """
+        Args:
+            retries_per_host (int): Maximum number of retries per host
+        """
+        self.retries_per_host = retries_per_host
+        self._spent: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str) -> bool:
+        """
+        Take one retry from the budget of the given host
+
+        Args:
+            host (str): Host name (with port)
+
+        Returns:
+            bool: The retry is allowed
+        """
+        with self._lock:
+            if self._spent[host] >= self.retries_per_host:
+                return False
+            self._spent[host] += 1
+            return True
+
+    def remaining(self, host: str) -> int:
+        """
+        Number of retries left for the given host
+
+        Args:
+            host (str): Host name (with port)
+
+        Returns:
+            int: Remaining retries
+        """
+        with self._lock:
+            return self.retries_per_host - self._spent[host]
+
+    def reset(self) -> None:
+        """
+        Restore the budget of all hosts
+        """
+        with self._lock:
+            self._spent.clear()
+
+
+# Process-wide retry budget
+BUDGET = RetryBudget()
+
+
+def get_retry_after(response: Any) -> Optional[float]:
+    """
+    Get the delay requested by the server before the next attempt.
+
+    Both the standard Retry-After header (seconds or http date) and the Github
+    rate limit headers are supported.
+
+    Args:
+        response (Any): Failed response (requests or httpx)
+
+    Returns:
+        Optional[float]: Delay in seconds, None if the server didn't request any
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after).timestamp()
+        except (TypeError, ValueError):
+            LOGGER.debug(f"Unable to parse Retry-After header: {retry_after}")
+        else:
+            return max(0.0, retry_at - time.time())
+
+    rate_limit_reset = response.headers.get("X-RateLimit-Reset")
+    if rate_limit_reset and response.headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            return max(0.0, float(rate_limit_reset) - time.time())
+        except ValueError:
+            LOGGER.debug(f"Unable to parse X-RateLimit-Reset: {rate_limit_reset}")
+    return None
+
+
+def is_rate_limited(response: Any) -> bool:
+    """
+    Check if the response rejects the request because of a rate limit.
+    Github uses 403 with exhausted rate limit headers instead of 429.
+
+    Args:
+        response (Any): Response (requests or httpx)
+
+    Returns:
+        bool: Request was rejected by a rate limit
+    """
+    if response.status_code == 429:
+        return True
+    return (
+        response.status_code == 403
+        and response.headers.get("X-RateLimit-Remaining") == "0"
+    )
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is retried.
+
+    The delay before each retry is drawn at random between zero and the
+    exponential backoff (full jitter), unless the server requests a specific
+    delay using Retry-After or Github rate limit headers. Requests that are not
+    idempotent (e.g. POST) are retried only when it's known the server didn't
+    process them or when they carry an Idempotency-Key header.
+    """
+
+    def __init__(
+        self,
+        retries: int = 5,
+        backoff_factor: float = 1.0,
+        max_backoff: float = 60.0,
+        max_wait: float = 300.0,
+        budget: RetryBudget = BUDGET,
+    ):
+        """
+        Args:
+            retries (int): Maximum number of retries of a single request
+            backoff_factor (float): Backoff before the first retry (seconds),
+                doubled with every next retry
+            max_backoff (float): Maximum backoff between retries (seconds)
+            max_wait (float): Maximum delay requested by the server the policy
+                is willing to wait (seconds)
+            budget (RetryBudget): Per-host retry budget
+        """
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self.budget = budget
+
+    def backoff(self, retry: int) -> float:
+        """
+        Randomized exponential backoff before the given retry
+
+        Args:
+            retry (int): Retry number (starting from 0)
+
+        Returns:
+            float: Delay in seconds
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2**retry))
+
+    @staticmethod
+    def is_idempotent(method: str, headers: Mapping[str, str]) -> bool:
+        """
+        Check if the request can be safely repeated
+
+        Args:
+            method (str): Request method
+            headers (Mapping[str, str]): Request headers
+
+        Returns:
+            bool: Request is idempotent
+        """
+        return method in IDEMPOTENT_METHODS or IDEMPOTENCY_KEY_HEADER in headers
+
+    def get_delay(
+        self,
+        method: str,
+        headers: Mapping[str, str],
+        retry: int,
+        response: Optional[Any] = None,
+        sent: bool = True,
+    ) -> Optional[float]:
+        """
+        Get the delay before retrying the failed request
+
+        Args:
+            method (str): Request method
+            headers (Mapping[str, str]): Request headers
+            retry (int): Retry number (starting from 0)
+            response (Optional[Any]): Failed response (requests or httpx),
+                None if the request failed with a connection error
+            sent (bool): The request might have reached the server
+
+        Returns:
+            Optional[float]: Delay in seconds, None if the request can't be retried
+        """
+        if retry >= self.retries:
+            return None
+
+        if response is not None:
+            rate_limited = is_rate_limited(response)
+            if response.status_code not in RETRY_STATUSES and not rate_limited:
+                return None
+            # Rate limited requests are rejected before being processed
+            if not rate_limited and not self.is_idempotent(method, headers):
+                return None
+
+            delay = get_retry_after(response)
+            if delay is not None:
+                return delay if delay <= self.max_wait else None
+        elif sent and not self.is_idempotent(method, headers):
+            return None
+        return self.backoff(retry)
+
+    def acquire(self, url: str) -> bool:
+        """
+        Take one retry from the budget of the url host
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            bool: The retry is allowed
+        """
+        return self.budget.acquire(urlsplit(url).netloc)
+
+
+class RetryAdapter(HTTPAdapter):
+    """
+    Http adapter that retries transient failures based on a retry policy.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        **kwargs: Any,
+    ):
+        """
+        Args:
+            policy (Optional[RetryPolicy]): Retry policy, default policy is used
+                if not set
+            sleep (Callable[[float], None]): Sleep function
+            kwargs (Any): Arguments of the HTTPAdapter (e.g. pool_maxsize)
+        """
+        super().__init__(**kwargs)
+        self.policy = policy or RetryPolicy()
+        self.sleep = sleep
+
+    @staticmethod
+    def _is_sent(error: Exception) -> bool:
+        """
+        Check if the request that failed with given error might have reached
+        the server. Connection that failed to be established never did.
+
+        Args:
+            error (Exception): Connection error
+
+        Returns:
+            bool: The request might have been sent
+        """
+        if isinstance(error, requests.ConnectTimeout):
+            return False
+        reason = getattr(error.args[0] if error.args else None, "reason", None)
+        return not isinstance(reason, NewConnectionError)
+
+    def send(
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        """
+        Send the request and retry transient failures
+
+        Args:
+            request (requests.PreparedRequest): Request to send
+            kwargs (Any): Arguments of the HTTPAdapter.send
+
+        Returns:
+            requests.Response: Response of the last attempt
+        """
+        retry = 0
+        while True:
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                delay = self.policy.get_delay(
+                    request.method, request.headers, retry, sent=self._is_sent(exc)
+                )
+                if delay is None or not self.policy.acquire(request.url):
+                    raise
+                reason = str(exc)
+            else:
+                delay = self.policy.get_delay(
+                    request.method, request.headers, retry, response=response
+                )
+                if delay is None or not self.policy.acquire(request.url):
+                    return response
+                reason = response.status_code
+                response.close()
+
+            LOGGER.warning(
+                f"{request.method} {request.url} failed ({reason}), "
+                f"retrying in {delay:.1f}s ({retry + 1}/{self.policy.retries})"
+            )
+            self.sleep(delay)
+            retry += 1
+
+
+def mount(session: requests.Session, **kwargs: Any) -> requests.Session:
+    """
+    Mount the retry adapter to the session for both http and https
+
+    Args:
+        session (requests.Session): Session
+        kwargs (Any): Arguments of the RetryAdapter (policy, sleep, pool_maxsize)
+
+    Returns:
+        requests.Session: The same session
+    """
+    adapter = RetryAdapter(**kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,196 @@
+"""
+Batch scanning of all the operator bundles in an operators repository
+"""
+
+import json
+import logging
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from operatorcert import OCP_VERSIONS_ANNOTATION, OperatorBundle
+
+LOGGER = logging.getLogger("operator-cert")
+
+# Bundle directories whose files describe the bundle
+BUNDLE_DIRECTORIES = ("metadata", "manifests")
+
+# Number of bundles sent to a worker process at once
+CHUNK_SIZE = 16
+
+
+def iter_bundle_paths(repo_path: pathlib.Path) -> Iterator[pathlib.Path]:
+    """
+    Find all the bundles in an operators repository
+
+    Args:
+        repo_path (Path): A path to the root of the repository, bundles are
+            expected in operators/<operator>/<version>
+
+    Yields:
+        Path: Paths to the bundle versions sorted by the operator and version
+    """
+    for bundle_path in sorted(repo_path.glob("operators/*/*")):
+        if bundle_path.is_dir() and any(
+            (bundle_path / directory).is_dir() for directory in BUNDLE_DIRECTORIES
+        ):
+            yield bundle_path
+
+
+def get_bundle_files(bundle_path: pathlib.Path) -> Dict[str, List[int]]:
+    """
+    Get the modification time and size of all the bundle files
+
+    Args:
+        bundle_path (Path): A path to the bundle version
+
+    Returns:
+        Dict[str, List[int]]: Modification time (ns) and size of the files by
+            their paths relative to the bundle
+    """
+    files = {}
+    for directory in BUNDLE_DIRECTORIES:
+        for path in sorted((bundle_path / directory).glob("**/*")):
+            if path.is_file():
+                stat = path.stat()
+                files[str(path.relative_to(bundle_path))] = [
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                ]
+    return files
+
+
+def scan_bundle(
+    bundle_path: pathlib.Path, repo_path: Optional[pathlib.Path] = None
+) -> Dict[str, Any]:
+    """
+    Gather the facts about a bundle. Errors don't stop the scan, they are
+    stored in the record together with the facts that could be gathered.
+
+    Args:
+        bundle_path (Path): A path to the bundle version
+        repo_path (Optional[Path]): A path to the root of the repository
+            the record path is relative to
+
+    Returns:
+        Dict[str, Any]: Bundle record
+    """
+    bundle = OperatorBundle(bundle_path)
+    record: Dict[str, Any] = {
+        "path": str(bundle_path.relative_to(repo_path or bundle_path.parent)),
+        "operator": bundle_path.parent.name,
+        "version": bundle_path.name,
+        "files": get_bundle_files(bundle_path),
+        "errors": [],
+    }
+    try:
+        record["annotations"] = bundle.annotations
+        record["ocp_versions"] = bundle.annotations.get(OCP_VERSIONS_ANNOTATION)
+        record["package"] = bundle.package
+        record["max_ocp_version"] = bundle.max_ocp_version
+        record["related_images"] = bundle.related_images
+    except Exception as exc:
+        LOGGER.debug(f"Failed to scan {bundle_path}", exc_info=True)
+        record["errors"].append(f"{type(exc).__name__}: {exc}")
+    return record
+
+
+def load_records(path: pathlib.Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the records of an earlier scan
+
+    Args:
+        path (Path): A path to the JSON lines file with the records
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Records by the bundle path, empty when
+            the file doesn't exist
+    """
+    records = {}
+    if not path.exists():
+        return records
+    with path.open() as fh:
+        for line in fh:
+            if line.strip():
+                record = json.loads(line)
+                records[record["path"]] = record
+    return records
+
+
+def scan(
+    repo_path: pathlib.Path,
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Scan all the bundles in an operators repository across a process pool.
+    Bundles whose files have the same modification time and size as in the
+    previous scan aren't parsed again, their previous records are reused.
+
+    Args:
+        repo_path (Path): A path to the root of the repository
+        previous (Optional[Dict[str, Dict[str, Any]]]): Records of the previous
+            scan by the bundle path
+        workers (Optional[int]): Number of worker processes, defaults to the
+            number of CPUs, bundles are scanned in this process when set to 1
+
+    Yields:
+        Dict[str, Any]: Bundle records in the order of the bundle paths
+    """
+    previous = previous or {}
+    bundles: List[Tuple[pathlib.Path, Optional[Dict[str, Any]]]] = []
+    for bundle_path in iter_bundle_paths(repo_path):
+        record = previous.get(str(bundle_path.relative_to(repo_path)))
+        if record and record.get("files") != get_bundle_files(bundle_path):
+            record = None
+        bundles.append((bundle_path, record))
+
+    changed = [path for path, record in bundles if record is None]
+    LOGGER.info(
+        f"Found {len(bundles)} bundles, {len(bundles) - len(changed)} unchanged"
+    )
+    executor = None
+    if workers == 1 or len(changed) <= 1:
+        results: Iterable[Dict[str, Any]] = map(scan_bundle, changed, repeat(repo_path))
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(
+            scan_bundle, changed, repeat(repo_path), chunksize=CHUNK_SIZE
+        )
+
+    try:
+        results = iter(results)
+        for _, record in bundles:
+            yield record if record is not None else next(results)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def write_records(
+    path: pathlib.Path, records: Iterable[Dict[str, Any]]
+) -> Tuple[int, int]:
+    """
+    Write the records to a JSON lines file. The file is replaced only once
+    all the records are written, so an interrupted scan keeps the previous
+    results.
+
+    Args:
+        path (Path): A path to the JSON lines file
+        records (Iterable[Dict[str, Any]]): Bundle records
+
+    Returns:
+        Tuple[int, int]: Number of the records and of those with errors
+    """
+    total = failed = 0
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w") as fh:
+        for record in records:
+            fh.write(json.dumps(record, sort_keys=True) + "\n")
+            total += 1
+            if record["errors"]:
+                failed += 1
+    os.replace(tmp_path, path)
+    return total, failed
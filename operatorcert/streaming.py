@@ -0,0 +1,193 @@
+"""
+Request bodies streamed from files instead of being built in memory
+"""
+
+import abc
+import base64
+import json
+import os
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import zstandard
+
+# Size of the file blocks read at once, the base64 encoding needs blocks
+# aligned to 3 bytes to be concatenated without padding
+DEFAULT_CHUNK_SIZE = 3 * 64 * 1024
+
+# Supported Content-Encoding of compressed request bodies
+COMPRESSIONS = ("gzip", "zstd")
+
+
+def iter_base64(
+    path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, size: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Read a file and encode it to base64 in blocks
+
+    Args:
+        path (str): Path to a file
+        chunk_size (int): Size of the blocks read from the file, rounded down
+            to a multiple of 3
+        size (Optional[int]): Number of bytes read from the file, the whole
+            file is read when not set
+
+    Yields:
+        bytes: Base64 encoded blocks, concatenated they are the base64 encoded
+            file
+    """
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+    remaining = size
+    remainder = b""
+    with open(path, "rb") as fh:
+        while remaining is None or remaining > 0:
+            read_size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = fh.read(read_size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            # reads may return fewer bytes, only complete 3-byte groups are
+            # encoded before the end of the file
+            if remainder:
+                chunk = remainder + chunk
+            aligned = len(chunk) - len(chunk) % 3
+            remainder = chunk[aligned:]
+            if aligned:
+                yield base64.b64encode(memoryview(chunk)[:aligned])
+    if remaining:
+        raise IOError(f"File {path} was truncated while being read")
+    if remainder:
+        yield base64.b64encode(remainder)
+
+
+class StreamingBody(abc.ABC):
+    """
+    Request body produced in chunks while it's being sent
+    """
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """
+        Headers describing the body
+
+        Returns:
+            Dict[str, str]: Request headers
+        """
+        return {}
+
+    @abc.abstractmethod
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Produce the body
+
+        Yields:
+            bytes: Chunks of the body
+        """
+
+
+class JSONFileBody(StreamingBody):
+    """
+    JSON request body with a base64 encoded file content in one of its fields.
+
+    The body is encoded while it's being sent, so memory usage is bounded by
+    the chunk size instead of the file size. The body can be iterated
+    repeatedly (e.g. when the request is retried) and has a known length,
+    so it's sent with a Content-Length header.
+    """
+
+    def __init__(
+        self,
+        payload: Dict[str, Any],
+        field: str,
+        path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Args:
+            payload (Dict[str, Any]): Other fields of the JSON object
+            field (str): Name of the field with the file content
+            path (str): Path to the file
+            chunk_size (int): Size of the blocks read from the file
+        """
+        if field in payload:
+            raise ValueError(f"Field {field} is already in the payload")
+        self.payload = payload
+        self.field = field
+        self.path = path
+        self.chunk_size = chunk_size
+        # The size is fixed upfront, so the body matches its length even if
+        # the file changes while it's being sent
+        self.size = os.path.getsize(path)
+
+        # The file content is the first field of the object
+        rest = json.dumps(payload)[1:]
+        self._prefix = ("{" + json.dumps(field) + ': "').encode("utf-8")
+        self._suffix = ('", ' + rest if payload else '"}').encode("utf-8")
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Type": "application/json"}
+
+    def __len__(self) -> int:
+        content_size = -(-self.size // 3) * 4
+        return len(self._prefix) + content_size + len(self._suffix)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._prefix
+        yield from iter_base64(self.path, self.chunk_size, self.size)
+        yield self._suffix
+
+
+class CompressedBody(StreamingBody):
+    """
+    Request body compressed while it's being sent.
+
+    The compressed size isn't known upfront, so the body is sent using chunked
+    transfer encoding with the Content-Encoding header. The server decompresses
+    the body, so the payload itself is unchanged.
+    """
+
+    def __init__(
+        self, body: Iterable[bytes], encoding: str, level: Optional[int] = None
+    ):
+        """
+        Args:
+            body (Iterable[bytes]): Body to compress, streaming bodies are
+                compressed one chunk at a time
+            encoding (str): Content encoding (gzip or zstd)
+            level (Optional[int]): Compression level, default level of the
+                encoding is used when not set
+        """
+        if encoding not in COMPRESSIONS:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+        self.body = body
+        self.encoding = encoding
+        self.level = level
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = getattr(self.body, "headers", {})
+        return {**headers, "Content-Encoding": self.encoding}
+
+    def _compressor(self) -> Any:
+        """
+        Create a new compressor for the encoding
+
+        Returns:
+            Any: Compressor with compress() and flush() methods
+        """
+        if self.encoding == "gzip":
+            level = zlib.Z_DEFAULT_COMPRESSION if self.level is None else self.level
+            # 16 + window bits selects the gzip container
+            return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        level = 3 if self.level is None else self.level
+        return zstandard.ZstdCompressor(level=level).compressobj()
+
+    def __iter__(self) -> Iterator[bytes]:
+        compressor = self._compressor()
+        for chunk in self.body:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
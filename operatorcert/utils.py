@@ -1,11 +1,19 @@
+import hashlib
 import json
 import logging
 import os
 import pathlib
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import yaml
 
 LOGGER = logging.getLogger("operator-cert")
 
+# The libyaml based loader is many times faster than the pure Python one and
+# builds the same documents, the pure Python loader is only used when PyYAML
+# is built without libyaml
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def find_file(
     base_path: pathlib.Path, relative_paths: List[Tuple[str, ...]]
@@ -82,3 +90,213 @@ def set_client_keytab(keytab_file: str):
     LOGGER.debug(
         "Set KRB5_CLIENT_KTNAME env variable: %s", os.environ["KRB5_CLIENT_KTNAME"]
     )
+
+
+def get_file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute SHA-256 digest of a file without loading it into memory
+
+    Args:
+        path (str): Path to a file
+        chunk_size (int): Size of the blocks read from the file
+
+    Returns:
+        str: Hex encoded SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_yaml(path: pathlib.Path) -> Any:
+    """
+    Safely parse a YAML file, using libyaml when it's available
+
+    Args:
+        path (Path): A path to the file
+
+    Returns:
+        Any: Parsed content of the file
+    """
+    with open(path, "rb") as fh:
+        return yaml.load(fh, Loader=YAML_LOADER)
+
+
+def _compose_node(loader: Any, anchors: Dict[str, yaml.Node]) -> yaml.Node:
+    """
+    Compose a node from the YAML events of the loader
+
+    Args:
+        loader (Any): YAML loader positioned at the start of the node
+        anchors (Dict[str, yaml.Node]): Nodes of the anchors defined so far
+
+    Returns:
+        yaml.Node: Composed node
+    """
+    event = loader.get_event()
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:
+            raise yaml.composer.ComposerError(
+                None, None, f"found undefined alias {event.anchor}", event.start_mark
+            )
+        return anchors[event.anchor]
+
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(
+            tag, event.value, event.start_mark, event.end_mark, style=event.style
+        )
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        return node
+
+    is_sequence = isinstance(event, yaml.SequenceStartEvent)
+    node_class = yaml.SequenceNode if is_sequence else yaml.MappingNode
+    end_event = yaml.SequenceEndEvent if is_sequence else yaml.MappingEndEvent
+    tag = event.tag
+    if tag is None or tag == "!":
+        tag = loader.resolve(node_class, None, event.implicit)
+    node = node_class(tag, [], event.start_mark, None, flow_style=event.flow_style)
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    while not loader.check_event(end_event):
+        if is_sequence:
+            node.value.append(_compose_node(loader, anchors))
+        else:
+            key = _compose_node(loader, anchors)
+            node.value.append((key, _compose_node(loader, anchors)))
+    node.end_mark = loader.get_event().end_mark
+    return node
+
+
+def _skip_node(loader: Any, anchors: Dict[str, yaml.Node]) -> None:
+    """
+    Skip the YAML events of a node without composing it. Anchored nodes are
+    still composed, so the extracted nodes can refer to them.
+
+    Args:
+        loader (Any): YAML loader positioned at the start of the node
+        anchors (Dict[str, yaml.Node]): Nodes of the anchors defined so far
+    """
+    event = loader.peek_event()
+    if isinstance(event, yaml.AliasEvent) or event.anchor is not None:
+        _compose_node(loader, anchors)
+        return
+    loader.get_event()
+    if isinstance(event, yaml.CollectionStartEvent):
+        end_event = (
+            yaml.SequenceEndEvent
+            if isinstance(event, yaml.SequenceStartEvent)
+            else yaml.MappingEndEvent
+        )
+        while not loader.check_event(end_event):
+            _skip_node(loader, anchors)
+        loader.get_event()
+
+
+# Tag of the "<<" merge keys
+MERGE_TAG = "tag:yaml.org,2002:merge"
+
+
+class _MergeKeyFound(Exception):
+    """
+    A merge key was found on the way to a requested value
+    """
+
+
+def extract_paths(
+    path: pathlib.Path, paths: Iterable[Union[str, Tuple[str, ...]]]
+) -> Dict[Union[str, Tuple[str, ...]], Any]:
+    """
+    Extract values of the given mapping key paths from a YAML file.
+
+    Only the requested subtrees are built, the rest of the document is just
+    scanned, so large unrelated values (e.g. CSV icons or alm-examples) are
+    never turned into Python objects. When a mapping on the way to a requested
+    value has a "<<" merge key, the whole document is loaded instead, so the
+    values are the same as from load_yaml.
+
+    Args:
+        path (Path): A path to the file
+        paths (Iterable[Union[str, Tuple[str, ...]]]): Paths of the values,
+            either dot separated (e.g. "spec.relatedImages") or tuples of keys
+            when the keys contain dots (e.g. ("metadata", "olm.properties"))
+
+    Returns:
+        Dict[Union[str, Tuple[str, ...]], Any]: Extracted values by their paths,
+            paths missing in the document are left out
+    """
+    requested = {
+        (tuple(key.split(".")) if isinstance(key, str) else tuple(key)): key
+        for key in paths
+    }
+    prefixes = {keys[:i] for keys in requested for i in range(len(keys))}
+    anchors: Dict[str, yaml.Node] = {}
+    nodes: Dict[Tuple[str, ...], yaml.Node] = {}
+
+    def walk(keys: Tuple[str, ...]) -> None:
+        event = loader.peek_event()
+        if keys not in prefixes or not isinstance(event, yaml.MappingStartEvent):
+            if keys in requested:
+                select(_compose_node(loader, anchors), keys)
+            else:
+                _skip_node(loader, anchors)
+        elif keys in requested or event.anchor is not None:
+            # the whole mapping is needed, either it's requested or it can be
+            # referred to later
+            select(_compose_node(loader, anchors), keys)
+        else:
+            loader.get_event()
+            while not loader.check_event(yaml.MappingEndEvent):
+                if loader.check_event(yaml.ScalarEvent):
+                    key = _compose_node(loader, anchors)
+                    if key.tag == MERGE_TAG:
+                        raise _MergeKeyFound()
+                    walk(keys + (key.value,))
+                else:
+                    _skip_node(loader, anchors)
+                    _skip_node(loader, anchors)
+            loader.get_event()
+
+    def select(node: yaml.Node, keys: Tuple[str, ...]) -> None:
+        if keys in requested:
+            nodes[keys] = node
+        if keys in prefixes and isinstance(node, yaml.MappingNode):
+            for key, value in node.value:
+                if key.tag == MERGE_TAG:
+                    raise _MergeKeyFound()
+                if isinstance(key, yaml.ScalarNode):
+                    select(value, keys + (key.value,))
+
+    with open(path, "rb") as fh:
+        loader = YAML_LOADER(fh)
+        try:
+            loader.get_event()  # stream start
+            if loader.check_event(yaml.DocumentStartEvent):
+                loader.get_event()
+                walk(())
+            return {
+                requested[keys]: loader.construct_document(node)
+                for keys, node in nodes.items()
+            }
+        except _MergeKeyFound:
+            pass
+        finally:
+            loader.dispose()
+
+    # the merged keys are resolved by the constructor of the whole document
+    document = load_yaml(path)
+    values = {}
+    for keys, key in requested.items():
+        value = document
+        for name in keys:
+            if not isinstance(value, dict) or name not in value:
+                break
+            value = value[name]
+        else:
+            values[key] = value
+    return values
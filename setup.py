@@ -23,6 +23,7 @@ setup(
         "console_scripts": [
             "bundle-dockerfile=operatorcert.entrypoints.bundle_dockerfile:main",
             "ocp-version-info=operatorcert.entrypoints.ocp_version_info:main",
+            "invalidate-indices-cache=operatorcert.entrypoints.invalidate_indices_cache:main",
             "verify-changed-dirs=operatorcert.entrypoints.verify_changed_dirs:main",
             "verify-pr-title=operatorcert.entrypoints.verify_pr_title:main",
             "verify-pr-uniqueness=operatorcert.entrypoints.verify_pr_uniqueness:main",
@@ -41,6 +42,7 @@ setup(
             "hydra-checklist=operatorcert.entrypoints.hydra_checklist:main",
             "create-container-image=operatorcert.entrypoints.create_container_image:main",
             "marketplace-replication=operatorcert.entrypoints.marketplace_replication:main",
+            "scan-bundles=operatorcert.entrypoints.scan_bundles:main",
         ],
     },
 )
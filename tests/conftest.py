@@ -0,0 +1,11 @@
+from typing import Generator
+
+import pytest
+
+from tests.stand_in import StandInServer
+
+
+@pytest.fixture
+def stand_in_server() -> Generator[StandInServer, None, None]:
+    with StandInServer() as server:
+        yield server
@@ -30,7 +30,8 @@ def test_check_if_image_already_exists(mock_get: MagicMock):
     # Assert
     assert exists
     mock_get.assert_called_with(
-        "https://catalog.redhat.com/api/containers/v1/images?page_size=1&filter=isv_pid%3D%3D%22some_isv_pid%22%3Bdocker_image_digest%3D%3D%22some_digest%22%3Bnot%28deleted%3D%3Dtrue%29"
+        "https://catalog.redhat.com/api/containers/v1/images?page_size=1&filter=isv_pid%3D%3D%22some_isv_pid%22%3Bdocker_image_digest%3D%3D%22some_digest%22%3Bnot%28deleted%3D%3Dtrue%29",
+        include=["data._id"],
     )
 
     # Image doesn't exist
@@ -117,8 +118,8 @@ def test_prepare_parsed_data():
 
 
 @patch("operatorcert.entrypoints.create_container_image.pyxis.get")
-@patch("operatorcert.entrypoints.create_container_image.pyxis.put")
-def test_remove_latest_from_previous_image(mock_put: MagicMock, mock_get: MagicMock):
+@patch("operatorcert.entrypoints.create_container_image.pyxis.patch")
+def test_remove_latest_from_previous_image(mock_patch: MagicMock, mock_get: MagicMock):
     pyxis_url = "some_url.com"
     isv_pid = "some_pid"
 
@@ -138,10 +139,12 @@ def test_remove_latest_from_previous_image(mock_put: MagicMock, mock_get: MagicM
 
     remove_latest_from_previous_image(pyxis_url, isv_pid)
 
-    mock_put.assert_called_with(
+    mock_get.assert_called_once_with(
+        "v1/images?filter=isv_pid%3D%3D%22some_pid%22%3Bnot%28deleted%3D%3Dtrue%29"
+        "&sort_by=creation_date[desc]&page_size=1",
+        include=["data._id", "data.repositories"],
+    )
+    mock_patch.assert_called_with(
         "v1/images/id/1234",
-        {
-            "_id": "1234",
-            "repositories": [{"tags": [{"name": "some_other"}]}],
-        },
+        {"repositories": [{"tags": [{"name": "some_other"}]}]},
     )
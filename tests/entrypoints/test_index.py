@@ -0,0 +1,272 @@
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from operatorcert import polling
+from operatorcert.entrypoints import index
+
+
+def build(id: int, version: str, state: str) -> Dict[str, Any]:
+    return {
+        "id": id,
+        "from_index": f"registry/index:{version}",
+        "index_image": f"registry/index:{version}-{id}",
+        "state": state,
+        "state_history": [{"state_reason": state}],
+    }
+
+
+def test_setup_argparser() -> None:
+    assert index.setup_argparser() is not None
+
+
+def test_parse_indices() -> None:
+    assert index.parse_indices(["registry/index:v4.9", "registry/index:v4.8"]) == [
+        "v4.9",
+        "v4.8",
+    ]
+    with pytest.raises(Exception):
+        index.parse_indices(["registry/index"])
+
+
+@patch("operatorcert.entrypoints.index.iib.get_recent_builds")
+def test_get_scheduler(mock_recent_builds: MagicMock) -> None:
+    assert (
+        type(index.get_scheduler("fixed", "https://iib.com")) is polling.PollScheduler
+    )
+
+    mock_recent_builds.return_value = {
+        "items": [
+            {
+                "id": 1,
+                "state": "complete",
+                "state_history": [
+                    {"updated": "2021-06-22T12:10:00.000000Z"},
+                    {"updated": "2021-06-22T12:00:00.000000Z"},
+                ],
+            }
+        ]
+    }
+    scheduler = index.get_scheduler("adaptive", "https://iib.com")
+    assert scheduler.expected_duration == (600, 600)
+
+    mock_recent_builds.side_effect = requests.HTTPError()
+    scheduler = index.get_scheduler("adaptive", "https://iib.com")
+    assert scheduler.expected_duration is None
+
+
+@patch("operatorcert.entrypoints.index.time.sleep")
+@patch("operatorcert.entrypoints.index.iib.get_builds")
+def test_wait_for_results(mock_get_builds: MagicMock, mock_sleep: MagicMock) -> None:
+    mock_get_builds.side_effect = [
+        {"items": [build(1, "v4.8", "in_progress"), build(2, "v4.9", "complete")]},
+        {"items": [build(1, "v4.8", "complete"), build(2, "v4.9", "complete")]},
+    ]
+    resp = index.wait_for_results("https://iib.com", 1)
+    assert [b["state"] for b in resp["items"]] == ["complete", "complete"]
+
+    mock_get_builds.side_effect = None
+    mock_get_builds.return_value = {"items": [build(1, "v4.8", "failed")]}
+    assert index.wait_for_results("https://iib.com", 1)["items"][0]["id"] == 1
+
+    mock_get_builds.return_value = {"items": [build(1, "v4.8", "in_progress")]}
+    assert index.wait_for_results("https://iib.com", 1, timeout=-1) is None
+
+
+@patch("operatorcert.entrypoints.index.time.sleep")
+@patch("operatorcert.entrypoints.index.iib.get_builds")
+def test_iter_build_results(mock_get_builds: MagicMock, mock_sleep: MagicMock) -> None:
+    mock_get_builds.side_effect = [
+        {"items": [build(1, "v4.8", "in_progress"), build(2, "v4.9", "complete")]},
+        {"items": [build(1, "v4.8", "in_progress"), build(2, "v4.9", "complete")]},
+        {"items": [build(1, "v4.8", "failed"), build(2, "v4.9", "complete")]},
+    ]
+    results = index.iter_build_results("https://iib.com", 1)
+
+    # the finished build is reported before the others are done
+    assert next(results)["id"] == 2
+    assert mock_get_builds.call_count == 1
+    assert [b["id"] for b in results] == [1]
+    assert mock_get_builds.call_count == 3
+
+    mock_get_builds.side_effect = None
+    mock_get_builds.return_value = {"items": [build(1, "v4.8", "in_progress")]}
+    assert list(index.iter_build_results("https://iib.com", 1, timeout=-1)) == []
+
+
+@patch("operatorcert.entrypoints.index.wait_for_results")
+@patch("operatorcert.entrypoints.index.iib.add_builds")
+def test_publish_bundle(
+    mock_add_builds: MagicMock, mock_wait: MagicMock, monkeypatch: Any
+) -> None:
+    monkeypatch.setenv("QUAY_USER", "user")
+    monkeypatch.setenv("QUAY_TOKEN", "token")
+    mock_add_builds.return_value = [{"batch": 1}]
+    mock_wait.return_value = {"items": [build(1, "v4.8", "complete")]}
+
+    index.publish_bundle("registry/index", "bundle", "https://iib.com", ["v4.8"])
+    mock_add_builds.assert_called_once_with(
+        "https://iib.com",
+        {
+            "build_requests": [
+                {
+                    "from_index": "registry/index:v4.8",
+                    "bundles": ["bundle"],
+                    "overwrite_from_index": True,
+                    "add_arches": ["amd64", "s390x", "ppc64le"],
+                    "overwrite_from_index_token": "user:token",
+                }
+            ]
+        },
+    )
+
+    mock_wait.return_value = {"items": [build(1, "v4.8", "failed")]}
+    with pytest.raises(Exception):
+        index.publish_bundle("registry/index", "bundle", "https://iib.com", ["v4.8"])
+
+
+@patch("operatorcert.entrypoints.index.iter_build_results")
+@patch("operatorcert.entrypoints.index.iib.add_builds")
+def test_publish_bundle_per_index(
+    mock_add_builds: MagicMock, mock_results: MagicMock
+) -> None:
+    mock_add_builds.side_effect = [[{"batch": 1}], [{"batch": 2}]]
+    mock_results.side_effect = [
+        iter(
+            [
+                build(1, "v4.8", "complete"),
+                build(2, "v4.9", "failed"),
+                build(3, "v4.10", "complete"),
+            ]
+        ),
+        iter([build(4, "v4.9", "complete")]),
+    ]
+
+    index.publish_bundle(
+        "registry/index",
+        "bundle",
+        "https://iib.com",
+        ["v4.8", "v4.9", "v4.10"],
+        resubmit=1,
+    )
+
+    # only the failed index is resubmitted
+    resubmitted = mock_add_builds.call_args_list[1][0][1]["build_requests"]
+    assert [r["from_index"] for r in resubmitted] == ["registry/index:v4.9"]
+    mock_results.assert_called_with("https://iib.com", 2, scheduler=None)
+
+
+@patch("operatorcert.entrypoints.index.iter_build_results")
+@patch("operatorcert.entrypoints.index.iib.add_builds")
+def test_publish_bundle_per_index_failed(
+    mock_add_builds: MagicMock, mock_results: MagicMock
+) -> None:
+    mock_add_builds.return_value = [{"batch": 1}]
+    mock_results.side_effect = [
+        iter([build(1, "v4.8", "failed"), build(2, "v4.9", "complete")]),
+        iter([build(3, "v4.8", "failed")]),
+    ]
+
+    with pytest.raises(Exception, match="v4.8"):
+        index.publish_bundle(
+            "registry/index",
+            "bundle",
+            "https://iib.com",
+            ["v4.8", "v4.9"],
+            resubmit=1,
+        )
+    assert mock_add_builds.call_count == 2
+
+    # build that didn't finish in time is a failure, but it's not resubmitted
+    mock_add_builds.reset_mock()
+    mock_results.side_effect = [iter([build(1, "v4.8", "complete")])]
+    with pytest.raises(Exception, match="v4.9"):
+        index.publish_bundle(
+            "registry/index",
+            "bundle",
+            "https://iib.com",
+            ["v4.8", "v4.9"],
+            per_index=True,
+        )
+    assert mock_add_builds.call_count == 1
+
+
+def test_group_bundles() -> None:
+    assert index.group_bundles(
+        {"bundle1": ["v4.8", "v4.9"], "bundle2": ["v4.9", "v4.9"]}
+    ) == {"v4.8": ["bundle1"], "v4.9": ["bundle1", "bundle2"]}
+
+
+def test_parse_manifest(tmp_path: Any) -> None:
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(
+        "- bundle: registry/bundle1:v1\n"
+        "  indices: [registry/index:v4.8, registry/index:v4.9]\n"
+        "- registry/bundle2:v2\n"
+    )
+
+    assert index.parse_manifest(str(manifest), ["registry/index:v4.10"]) == {
+        "registry/bundle1:v1": ["v4.8", "v4.9"],
+        "registry/bundle2:v2": ["v4.10"],
+    }
+    with pytest.raises(Exception, match="registry/bundle2:v2"):
+        index.parse_manifest(str(manifest))
+
+    manifest.write_text("")
+    assert index.parse_manifest(str(manifest)) == {}
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "- indices: [registry/index:v4.8]\n",
+        "- bundle:\n  indices: [registry/index:v4.8]\n",
+        "- [registry/bundle1:v1]\n",
+        "- registry/bundle2:v2\n",
+        "- bundle: registry/bundle2:v2\n  indices: [registry/index:v4.8]\n",
+    ],
+)
+def test_parse_manifest_invalid_entry(tmp_path: Any, content: str) -> None:
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text("- registry/bundle2:v2\n" + content)
+
+    with pytest.raises(Exception, match="Invalid manifest entry #2"):
+        index.parse_manifest(str(manifest), ["registry/index:v4.10"])
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "bundle: registry/bundle1:v1\nindices: [registry/index:v4.9]\n",
+        "registry/bundle1:v1\n",
+    ],
+)
+def test_parse_manifest_not_list(tmp_path: Any, content: str) -> None:
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(content)
+
+    with pytest.raises(Exception, match="expected a list of bundles"):
+        index.parse_manifest(str(manifest), ["registry/index:v4.10"])
+
+
+@patch("operatorcert.entrypoints.index.wait_for_results")
+@patch("operatorcert.entrypoints.index.iib.add_builds")
+def test_publish_bundles(mock_add_builds: MagicMock, mock_wait: MagicMock) -> None:
+    mock_add_builds.return_value = [{"batch": 1}]
+    mock_wait.return_value = {
+        "items": [build(1, "v4.8", "complete"), build(2, "v4.9", "complete")]
+    }
+
+    index.publish_bundles(
+        "registry/index",
+        {"v4.8": ["bundle1"], "v4.9": ["bundle1", "bundle2"]},
+        "https://iib.com",
+    )
+
+    # a single build per index adds all its bundles
+    build_requests = mock_add_builds.call_args[0][1]["build_requests"]
+    assert [(r["from_index"], r["bundles"]) for r in build_requests] == [
+        ("registry/index:v4.8", ["bundle1"]),
+        ("registry/index:v4.9", ["bundle1", "bundle2"]),
+    ]
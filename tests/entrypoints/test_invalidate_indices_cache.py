@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+from typing import Any
+
+from operatorcert.cache import DiskCache
+from operatorcert.entrypoints import invalidate_indices_cache
+
+
+def test_main(tmp_path: Path, monkeypatch: Any) -> None:
+    cache = DiskCache(str(tmp_path))
+    cache.put({"organization": "certified-operators"}, [])
+    cache.put({"organization": "redhat-marketplace"}, [])
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "invalidate-indices-cache",
+            str(tmp_path),
+            "--organization",
+            "redhat-marketplace",
+        ],
+    )
+    invalidate_indices_cache.main()
+    assert cache.get({"organization": "redhat-marketplace"}) is None
+    assert cache.get({"organization": "certified-operators"}) is not None
+
+    monkeypatch.setattr(sys, "argv", ["invalidate-indices-cache", str(tmp_path)])
+    invalidate_indices_cache.main()
+    assert cache.get({"organization": "certified-operators"}) is None
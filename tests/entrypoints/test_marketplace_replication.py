@@ -31,14 +31,14 @@ def test_marketplace_replication_no_token() -> None:
         marketplace_replication.call_ibm_webhook(args)
 
 
-@patch("operatorcert.entrypoints.marketplace_replication.get_csv_content")
+@patch("operatorcert.entrypoints.marketplace_replication.OperatorBundle")
 @patch(
     "operatorcert.entrypoints.marketplace_replication.webhook_twirp.MirrorServiceClient"
 )
 def test_marketplace_replication(
-    mock_mirror_client: MagicMock, mock_get_csv: MagicMock, monkeypatch: Any
+    mock_mirror_client: MagicMock, mock_bundle: MagicMock, monkeypatch: Any
 ) -> None:
-    mock_get_csv.return_value = {"spec": {"relatedImages": [{"name": "test-image"}]}}
+    mock_bundle.return_value.related_images = [{"name": "test-image"}]
     args = MagicMock()
     args.package = "test-package"
     args.ocp_version = "v1.1"
@@ -51,6 +51,6 @@ def test_marketplace_replication(
     marketplace_replication.call_ibm_webhook(args)
     mock_mirror_client.return_value.NewOperatorBundles.assert_called_once()
 
-    mock_get_csv.return_value = {}
+    mock_bundle.return_value.related_images = []
     with pytest.raises(SystemExit):
         marketplace_replication.call_ibm_webhook(args)
@@ -49,6 +49,9 @@ def test_publish_repository_exists(
 
     assert resp == {"published": True}
     mock_patch.assert_not_called()
+    mock_get_repo.assert_called_once_with(
+        "https://pyxis.com/", "foo", include=publish.REPOSITORY_FIELDS
+    )
 
     mock_get_repo.return_value = {"published": False, "_id": "foobar"}
     mock_patch.return_value = {"published": True}
@@ -16,7 +16,7 @@ def test_main(
 
 
 @patch("sys.exit")
-@patch("operatorcert.entrypoints.reserve_operator_name.pyxis.get")
+@patch("operatorcert.entrypoints.reserve_operator_name.pyxis.iter_pages")
 def test_check_operator_name_taken(mock_get: MagicMock, mock_exit: MagicMock) -> None:
     args = MagicMock()
     args.pyxis_url = "http://foo.com/"
@@ -24,22 +24,21 @@ def test_check_operator_name_taken(mock_get: MagicMock, mock_exit: MagicMock) ->
     args.association = "ospid-123"
     args.package_name = "operator-taken"
 
-    mock_get.status_code = 200
-    mock_get.return_value.json.return_value = {
-        "data": [
+    mock_get.return_value = iter(
+        [
             {
                 "association": "ospid-other",
                 "package_name": "operator-taken",
             }
         ]
-    }
+    )
 
     reserve_operator_name.check_operator_name(args)
     mock_exit.assert_called_once_with(1)
 
 
 @patch("sys.exit")
-@patch("operatorcert.entrypoints.reserve_operator_name.pyxis.get")
+@patch("operatorcert.entrypoints.reserve_operator_name.pyxis.iter_pages")
 def test_check_operator_name_taken_by_same_assocation(
     mock_get: MagicMock, mock_exit: MagicMock
 ) -> None:
@@ -49,22 +48,21 @@ def test_check_operator_name_taken_by_same_assocation(
     args.association = "ospid-123"
     args.package_name = "operator-taken"
 
-    mock_get.status_code = 200
-    mock_get.return_value.json.return_value = {
-        "data": [
+    mock_get.return_value = iter(
+        [
             {
                 "association": "ospid-123",
                 "package_name": "operator-taken",
             }
         ]
-    }
+    )
 
     reserve_operator_name.check_operator_name(args)
     mock_exit.assert_called_once_with(0)
 
 
 @patch("sys.exit")
-@patch("operatorcert.entrypoints.reserve_operator_name.pyxis.get")
+@patch("operatorcert.entrypoints.reserve_operator_name.pyxis.iter_pages")
 def test_check_operator_name_available(
     mock_get: MagicMock, mock_exit: MagicMock
 ) -> None:
@@ -74,8 +72,7 @@ def test_check_operator_name_available(
     args.association = "ospid-123"
     args.package_name = "operator-available"
 
-    mock_get.return_value.status_code = 404
-    mock_get.return_value.json.return_value = {}
+    mock_get.return_value = iter([])
 
     reserve_operator_name.check_operator_name(args)
     mock_exit.assert_not_called()
@@ -0,0 +1,40 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from operatorcert.entrypoints import scan_bundles
+
+
+def test_main(tmp_path: Path, monkeypatch: Any) -> None:
+    bundle_path = tmp_path / "operators" / "foo" / "1.0.0"
+    (bundle_path / "metadata").mkdir(parents=True)
+    (bundle_path / "metadata" / "annotations.yaml").write_text(
+        "annotations:\n  operators.operatorframework.io.bundle.package.v1: foo\n"
+    )
+    output = tmp_path / "bundles.jsonl"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["scan-bundles", str(tmp_path), "--output", str(output), "--workers", "1"],
+    )
+
+    scan_bundles.main()
+    record = json.loads(output.read_text())
+    assert record["package"] == "foo"
+    assert record["errors"] == [
+        "RuntimeError: Cluster service version (CSV) file not found"
+    ]
+
+    # unchanged bundles are reused from the previous output
+    with patch("operatorcert.scan.scan_bundle") as mock_scan:
+        scan_bundles.main()
+        mock_scan.assert_not_called()
+
+    monkeypatch.setattr(sys, "argv", [*sys.argv, "--full", "--verbose"])
+    with patch("operatorcert.scan.scan_bundle") as mock_scan:
+        mock_scan.return_value = {**record, "package": "bar"}
+        scan_bundles.main()
+        mock_scan.assert_called_once()
+    assert json.loads(output.read_text())["package"] == "bar"
@@ -1,46 +1,107 @@
+import base64
+import gzip
+import json
 import os.path
+import threading
+from typing import Any
 from unittest.mock import MagicMock, patch
 
+import pytest
 from operatorcert.entrypoints import upload_artifacts
+from requests import HTTPError
 
 
 @patch("operatorcert.entrypoints.upload_artifacts.json.dump")
 @patch("operatorcert.entrypoints.upload_artifacts.setup_argparser")
 @patch("operatorcert.entrypoints.upload_artifacts.upload_results_and_artifacts")
 def test_main(
-    mock_upload: MagicMock, mock_arg_parser: MagicMock, mock_dump: MagicMock
+    mock_upload: MagicMock,
+    mock_arg_parser: MagicMock,
+    mock_dump: MagicMock,
+    monkeypatch: Any,
 ) -> None:
+    monkeypatch.delenv("PYXIS_POOL_MAXSIZE", raising=False)
+    mock_arg_parser.return_value.parse_args.return_value.parallelism = 16
     upload_artifacts.main()
     mock_upload.assert_called_once()
+    assert os.environ["PYXIS_POOL_MAXSIZE"] == "16"
+
+
+@patch("operatorcert.entrypoints.upload_artifacts.upload_artifact")
+def test_upload_artifacts(mock_upload: MagicMock, tmp_path: Any) -> None:
+    for name in ["a.log", "b.log", "c.log", "d.log"]:
+        (tmp_path / name).write_text(name)
+    args = MagicMock()
+    args.path = str(tmp_path)
+    args.parallelism = 4
+
+    # all uploads have to run at once to get through the barrier
+    barrier = threading.Barrier(4, timeout=5)
+
+    def upload(args: Any, path: str, org_id: Any, cache: Any) -> Any:
+        barrier.wait()
+        return {"filename": os.path.basename(path), "org_id": org_id}
+
+    mock_upload.side_effect = upload
+    responses = upload_artifacts.upload_artifacts(args, 1)
+
+    # responses keep the order of the artifacts
+    names = sorted(os.listdir(tmp_path))
+    order = upload_artifacts.get_artifacts(str(tmp_path))
+    assert sorted(order) == names
+    assert responses == [{"filename": name, "org_id": 1} for name in order]
+
+
+@patch("operatorcert.entrypoints.upload_artifacts.upload_artifact")
+def test_upload_artifacts_partial_failure(
+    mock_upload: MagicMock, tmp_path: Any
+) -> None:
+    for name in ["a.log", "b.log", "c.log"]:
+        (tmp_path / name).write_text(name)
+    args = MagicMock()
+    args.path = str(tmp_path)
+    args.parallelism = 2
+
+    def upload(args: Any, path: str, org_id: Any, cache: Any) -> Any:
+        if path.endswith("b.log"):
+            raise HTTPError("500 Server Error")
+        return {"filename": os.path.basename(path)}
+
+    mock_upload.side_effect = upload
+    with pytest.raises(Exception, match="1 of 3 artifacts: b.log"):
+        upload_artifacts.upload_artifacts(args)
+
+    # every artifact is uploaded despite the failure
+    assert mock_upload.call_count == 3
 
 
-@patch("operatorcert.entrypoints.upload_artifacts.base64.b64encode")
 @patch("operatorcert.entrypoints.upload_artifacts.pyxis.post")
-def test_upload_artifact(mock_post: MagicMock, mock_b64) -> None:
+def test_upload_artifact(mock_post: MagicMock) -> None:
     args = MagicMock()
     args.pyxis_url = "http://foo.com/"
     args.certification_hash = "hashhash"
     args.operator_package_name = "foo"
     args.operator_version = "1.0"
     args.cert_project_id = "123123"
+    args.compression = None
 
-    mock_b64.return_value = b"a"
     filename = "tests/data/preflight.log"
     upload_artifacts.upload_artifact(args, filename, 1)
 
-    mock_post.assert_called_once_with(
-        "http://foo.com/v1/projects/certification/id/123123/artifacts",
-        {
-            "content": "a",
-            "certification_hash": args.certification_hash,
-            "content_type": "text/plain",
-            "filename": "preflight.log",
-            "file_size": os.path.getsize(filename),
-            "operator_package_name": args.operator_package_name,
-            "version": args.operator_version,
-            "org_id": 1,
-        },
-    )
+    url, body = mock_post.call_args[0]
+    assert url == "http://foo.com/v1/projects/certification/id/123123/artifacts"
+    with open(filename, "rb") as artifact:
+        content = base64.b64encode(artifact.read()).decode("utf-8")
+    assert json.loads(b"".join(body)) == {
+        "content": content,
+        "certification_hash": args.certification_hash,
+        "content_type": "text/plain",
+        "filename": "preflight.log",
+        "file_size": os.path.getsize(filename),
+        "operator_package_name": args.operator_package_name,
+        "version": args.operator_version,
+        "org_id": 1,
+    }
 
 
 @patch("operatorcert.entrypoints.upload_artifacts.json.load")
@@ -66,3 +127,98 @@ def test_upload_test_results(mock_post: MagicMock, mock_load: MagicMock) -> None
             "org_id": 1,
         },
     )
+
+
+def test_artifact_cache(monkeypatch: Any, tmp_path: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    artifacts = tmp_path / "artifacts"
+    artifacts.mkdir()
+    (artifacts / "a.log").write_text("foo")
+    (artifacts / "b.log").write_text("bar")
+    uploaded = []
+
+    def pyxis_handler(request: Any) -> Any:
+        method, _, _, body = request
+        if method == "POST":
+            artifact = json.loads(body)
+            artifact["_id"] = str(len(uploaded))
+            uploaded.append(artifact)
+            return 201, {}, artifact
+        return 404, {}, {}
+
+    stand_in_server.handler = pyxis_handler
+    args = MagicMock()
+    args.pyxis_url = stand_in_server.url
+    args.cert_project_id = "123"
+    args.certification_hash = "hashhash"
+    args.operator_package_name = "foo"
+    args.operator_version = "1.0"
+    args.path = str(artifacts)
+    args.parallelism = 2
+    args.compression = None
+
+    def upload(cache_path: str) -> Any:
+        cache = upload_artifacts.ArtifactCache(args, str(tmp_path / cache_path))
+        responses = upload_artifacts.upload_artifacts(args, cache=cache)
+        return sorted(r["filename"] for r in responses)
+
+    assert upload("cache.json") == ["a.log", "b.log"]
+    assert len(uploaded) == 2
+    cache = json.loads((tmp_path / "cache.json").read_text())
+    assert all("content" not in artifact for artifact in cache.values())
+
+    # retry finds the artifacts in the local cache
+    stand_in_server.requests.clear()
+    assert upload("cache.json") == ["a.log", "b.log"]
+    assert stand_in_server.requests == []
+
+    # changed content is uploaded again
+    (artifacts / "a.log").write_text("foo bar")
+    assert upload("cache.json") == ["a.log", "b.log"]
+    assert [r[0] for r in stand_in_server.requests] == ["POST"]
+    assert len(uploaded) == 3
+
+    # changed content of the same size is uploaded again
+    (artifacts / "a.log").write_text("FAIL")
+    (artifacts / "b.log").write_text("PASS")
+    stand_in_server.requests.clear()
+    assert upload("cache.json") == ["a.log", "b.log"]
+    (artifacts / "a.log").write_text("PASS")
+    (artifacts / "b.log").write_text("FAIL")
+    assert upload("cache.json") == ["a.log", "b.log"]
+    assert [r[0] for r in stand_in_server.requests] == ["POST"] * 4
+    assert len(uploaded) == 7
+
+
+def test_upload_artifact_compressed(
+    monkeypatch: Any, tmp_path: Any, stand_in_server: Any
+) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    artifact = tmp_path / "preflight.log"
+    artifact.write_text(
+        "time=2021-09-22T10:00:00Z level=info msg=check passed\n" * 1000
+    )
+    stand_in_server.handler = lambda request: (
+        201,
+        {},
+        json.loads(gzip.decompress(request[3])),
+    )
+    args = MagicMock()
+    args.pyxis_url = stand_in_server.url
+    args.cert_project_id = "123"
+    args.certification_hash = "hashhash"
+    args.operator_package_name = "foo"
+    args.operator_version = "1.0"
+    args.compression = "gzip"
+
+    resp = upload_artifacts.upload_artifact(args, str(artifact))
+
+    # metadata describe the original file
+    assert resp["content_type"] == "text/plain"
+    assert resp["file_size"] == artifact.stat().st_size
+    assert base64.b64decode(resp["content"]) == artifact.read_bytes()
+
+    _, _, headers, body = stand_in_server.requests[0]
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Transfer-Encoding"] == "chunked"
+    assert len(body) < artifact.stat().st_size / 10
@@ -0,0 +1,135 @@
+"""
+Local HTTP(S) server standing in for a remote API in the tests and benchmarks
+"""
+
+import json
+import pathlib
+import ssl
+import subprocess
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A stand-in route handler gets the request (method, path, headers, body) and
+# returns a response (status code, headers, body)
+Request = Tuple[str, str, Dict[str, str], bytes]
+Response = Tuple[int, Dict[str, str], Any]
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Local HTTP server standing in for a remote API.
+
+    The server supports persistent connections and records every accepted
+    connection (TLS handshake) and received request, so tests can check how
+    clients use it. With TLS, clients need to trust the self-signed
+    certificate in ca_bundle.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, tls: bool = False) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.connections = 0
+        self.requests: List[Request] = []
+        self.handler: Callable[[Request], Response] = lambda request: (200, {}, {})
+        self.ca_bundle: Optional[str] = None
+        self._lock = threading.Lock()
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        if tls:
+            self.ca_bundle = _self_signed_cert(pathlib.Path(self._tmp_dir.name))
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.ca_bundle, self.ca_bundle)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+
+    @property
+    def url(self) -> str:
+        scheme = "https" if self.ca_bundle else "http"
+        host, port = self.server_address[:2]
+        return f"{scheme}://{host}:{port}/"
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def __enter__(self) -> "StandInServer":
+        threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        ).start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()
+        self._tmp_dir.cleanup()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Buffer the whole response, so it is sent in a single write
+    wbufsize = -1
+
+    def _handle(self) -> None:
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                body += self.rfile.read(size + 2)[:size]
+                if not size:
+                    break
+        else:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+        request = (self.command, self.path, dict(self.headers), body)
+        with self.server._lock:
+            self.server.requests.append(request)
+
+        status, headers, content = self.server.handler(request)
+        if not isinstance(content, bytes):
+            content = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = _handle
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def _self_signed_cert(directory: pathlib.Path) -> str:
+    """
+    Generate a self-signed certificate for the loopback address using openssl
+
+    Returns:
+        str: Path to a PEM file with both the certificate and the key
+    """
+    pem = directory / "localhost.pem"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=DNS:localhost,IP:127.0.0.1",
+            "-keyout",
+            str(pem),
+            "-out",
+            str(pem),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return str(pem)
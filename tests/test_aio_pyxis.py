@@ -0,0 +1,246 @@
+import asyncio
+import json
+import threading
+from typing import Any, Generator
+from unittest.mock import patch
+
+import httpx
+import pytest
+from operatorcert import retry
+from operatorcert.aio import pyxis
+
+
+@pytest.fixture(autouse=True)
+def budget() -> Generator[None, None, None]:
+    yield
+    retry.BUDGET.reset()
+
+
+def run(coroutine: Any) -> Any:
+    """
+    Run the coroutine and close the shared clients of its event loop
+    """
+
+    async def wrapper() -> Any:
+        try:
+            return await coroutine
+        finally:
+            await pyxis.close_clients()
+
+    return asyncio.run(wrapper())
+
+
+def test_get_client(monkeypatch: Any) -> None:
+    async def clients() -> Any:
+        return (
+            pyxis.get_client("https://foo.com/v1/foo"),
+            pyxis.get_client("https://foo.com/v1/bar"),
+            pyxis.get_client("https://bar.com/v1/foo"),
+        )
+
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    monkeypatch.setenv("PYXIS_CONCURRENCY", "3")
+    first, second, third = run(clients())
+    assert first is second
+    assert first is not third
+    assert first.concurrency == 3
+
+    # a new event loop gets new clients
+    assert run(clients())[0] is not first
+
+    monkeypatch.delenv("PYXIS_API_KEY")
+    with pytest.raises(Exception):
+        run(clients())
+
+
+def test_client_auth(monkeypatch: Any) -> None:
+    client = pyxis.PyxisClient(api_key="123")
+    assert client.client.headers["X-API-KEY"] == "123"
+
+    with patch("ssl.SSLContext.load_cert_chain") as mock_load:
+        client = pyxis.PyxisClient(cert="cert", key="key", keep_alive=False)
+        assert "X-API-KEY" not in client.client.headers
+        mock_load.assert_called_once_with("cert", "key")
+
+    client = pyxis.PyxisClient(auth_required=False)
+    assert not client.is_authenticated
+    assert "X-API-KEY" not in client.client.headers
+    run(client.aclose())
+    assert client._client is None
+
+
+def test_concurrent_lookups(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+
+    # every lookup waits until all of them reach the server
+    barrier = threading.Barrier(10, timeout=5)
+
+    def handler(request: Any) -> Any:
+        barrier.wait()
+        return 200, {}, {"_id": request[1].split("?")[0].split("/")[-1]}
+
+    stand_in_server.handler = handler
+
+    async def lookups() -> Any:
+        return await asyncio.gather(
+            *[
+                pyxis.get_project(stand_in_server.url, str(i), include=["_id"])
+                for i in range(10)
+            ]
+        )
+
+    projects = run(lookups())
+
+    assert [p["_id"] for p in projects] == [str(i) for i in range(10)]
+    # lookups run concurrently - about one round trip instead of ten
+    assert stand_in_server.connections == 10
+    assert all(r[2]["X-API-KEY"] == "123" for r in stand_in_server.requests)
+    assert all(r[1].endswith("?include=_id") for r in stand_in_server.requests)
+
+
+def test_concurrency_limit(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    monkeypatch.setenv("PYXIS_CONCURRENCY", "2")
+    stand_in_server.handler = lambda request: (200, {}, {})
+
+    async def lookups() -> Any:
+        await asyncio.gather(
+            *[pyxis.get(stand_in_server.url + "v1/foo") for _ in range(10)]
+        )
+
+    run(lookups())
+    # connections are reused and limited by the concurrency
+    assert stand_in_server.connections == 2
+    assert len(stand_in_server.requests) == 10
+
+
+def test_verbs(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    stand_in_server.handler = lambda request: (200, {}, json.loads(request[3]))
+    url = stand_in_server.url + "v1/foo"
+
+    async def verbs() -> Any:
+        return [
+            await pyxis.post(url, {"verb": "post"}),
+            await pyxis.put(url, {"verb": "put"}),
+            await pyxis.patch(url, {"verb": "patch"}),
+        ]
+
+    assert run(verbs()) == [{"verb": "post"}, {"verb": "put"}, {"verb": "patch"}]
+    assert [r[0] for r in stand_in_server.requests] == ["POST", "PUT", "PATCH"]
+
+
+def test_errors(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    stand_in_server.handler = lambda request: (404, {}, {"error": "not found"})
+    url = stand_in_server.url
+
+    # GET doesn't raise
+    assert run(pyxis.get(url + "v1/foo")).status_code == 404
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(pyxis.post(url + "v1/foo", {}))
+    with pytest.raises(httpx.HTTPStatusError):
+        run(pyxis.get_project(url, "123"))
+    with pytest.raises(httpx.HTTPStatusError):
+        run(pyxis.get_vendor_by_org_id(url, "123"))
+
+
+def test_retry(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    monkeypatch.setattr(retry.RetryPolicy, "backoff", lambda self, retry: 0)
+    responses = [502, 503]
+    stand_in_server.handler = lambda request: (
+        responses.pop(0) if responses else 200,
+        {},
+        {"org_id": 123},
+    )
+
+    assert run(pyxis.get_vendor_by_org_id(stand_in_server.url, "123")) == {
+        "org_id": 123
+    }
+    assert len(stand_in_server.requests) == 3
+
+    # POST isn't retried
+    responses = [502]
+    with pytest.raises(httpx.HTTPStatusError):
+        run(pyxis.post(stand_in_server.url + "v1/foo", {}))
+
+
+def test_retry_connection_error(monkeypatch: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    monkeypatch.setattr(retry.RetryPolicy, "backoff", lambda self, retry: 0)
+
+    # nothing listens on the port - connection is refused before sending anything
+    with pytest.raises(httpx.ConnectError):
+        run(pyxis.post("http://127.0.0.1:1/v1/foo", {}))
+    assert retry.BUDGET.remaining("127.0.0.1:1") == retry.DEFAULT_HOST_BUDGET - 5
+
+    with patch("httpx.AsyncClient.request") as mock_request:
+        mock_request.side_effect = httpx.ReadError("Connection reset by peer")
+        # request might have been processed - POST is not retried
+        with pytest.raises(httpx.ReadError):
+            run(pyxis.post("http://foo.com/v1/foo", {}))
+        assert mock_request.call_count == 1
+
+
+def test_iter_pages(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    records = [{"_id": i} for i in range(5)]
+
+    def handler(request: Any) -> Any:
+        page = int(request[1].split("page=")[1].split("&")[0])
+        return 200, {}, {"data": records[page * 2 : page * 2 + 2], "total": 5}
+
+    stand_in_server.handler = handler
+
+    async def collect(**kwargs: Any) -> Any:
+        return [
+            r
+            async for r in pyxis.iter_pages(
+                stand_in_server.url + "v1/foo", page_size=2, **kwargs
+            )
+        ]
+
+    assert run(collect(filter="foo==bar", include=["data._id"])) == records
+    assert len(stand_in_server.requests) == 3
+    assert "include=total%2Cdata._id" in stand_in_server.requests[0][1]
+    assert "filter=foo%3D%3Dbar" in stand_in_server.requests[0][1]
+
+    async def first() -> Any:
+        pages = pyxis.iter_pages(stand_in_server.url + "v1/foo", page_size=2)
+        record = await pages.__anext__()
+        await pages.aclose()
+        return record
+
+    # prefetched page is dropped when the iteration stops early
+    assert run(first()) == records[0]
+
+
+def test_get_repository_by_isv_pid(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    data = [{"_id": "1"}, {"_id": "2"}]
+    stand_in_server.handler = lambda request: (200, {}, {"data": data, "total": 2})
+
+    assert run(pyxis.get_repository_by_isv_pid(stand_in_server.url, "foo")) == {
+        "_id": "1"
+    }
+    data = []
+    assert run(pyxis.get_repository_by_isv_pid(stand_in_server.url, "foo")) is None
+
+
+def test_get_repository_by_isv_pid_first_page(
+    monkeypatch: Any, stand_in_server: Any
+) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    stand_in_server.handler = lambda request: (
+        200,
+        {},
+        {"data": [{"_id": "1"}, {"_id": "2"}], "total": 10},
+    )
+
+    assert run(pyxis.get_repository_by_isv_pid(stand_in_server.url, "foo")) == {
+        "_id": "1"
+    }
+    # the other pages aren't read
+    assert len(stand_in_server.requests) == 1
@@ -0,0 +1,79 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from operatorcert.cache import DiskCache
+
+
+def test_disk_cache(tmp_path: Path) -> None:
+    now: List[float] = [1000]
+    cache = DiskCache(str(tmp_path / "cache"), ttl=60, clock=lambda: now[0])
+    key = {"organization": "certified-operators", "range": "v4.8"}
+
+    assert cache.get(key) is None
+    cache.put(key, ["foo"], etag='"123"')
+    entry = cache.get(key)
+    assert entry == {"key": key, "value": ["foo"], "etag": '"123"', "stored": 1000}
+    assert cache.is_fresh(entry)
+
+    now[0] += 60
+    assert not cache.is_fresh(cache.get(key))
+    now[0] = 0
+    assert not cache.is_fresh(cache.get(key))
+
+    # another key is stored separately, no partially written files are left
+    cache.put({"organization": "redhat-marketplace"}, [])
+    assert cache.get({"organization": "redhat-marketplace"})["value"] == []
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+def test_disk_cache_unreadable(tmp_path: Path) -> None:
+    cache = DiskCache(str(tmp_path))
+    key = {"organization": "certified-operators"}
+    cache.put(key, ["foo"])
+    path = next(tmp_path.iterdir())
+
+    # entries of colliding keys aren't used
+    path.write_text('{"key": {"organization": "other"}, "value": []}')
+    assert cache.get(key) is None
+
+    path.write_text("{")
+    assert cache.get(key) is None
+
+
+def test_disk_cache_invalidate(tmp_path: Path) -> None:
+    cache = DiskCache(str(tmp_path))
+    for organization in ["certified-operators", "redhat-marketplace"]:
+        for ocp_version in ["v4.7", "v4.8"]:
+            cache.put({"organization": organization, "range": ocp_version}, [])
+    # files not written by the cache are kept
+    foreign = {
+        "broken.json": "{",
+        "other.json": '{"key": {"organization": "certified-operators"}}',
+        "0" * 64 + ".json": '{"key": {"organization": "certified-operators"}}',
+        "1" * 64 + ".json": "[]",
+    }
+    for name, content in foreign.items():
+        (tmp_path / name).write_text(content)
+
+    assert cache.invalidate(organization="redhat-marketplace") == 2
+    assert cache.get({"organization": "redhat-marketplace", "range": "v4.7"}) is None
+    assert cache.get({"organization": "certified-operators", "range": "v4.7"})
+    assert cache.invalidate() == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(foreign)
+    assert DiskCache(str(tmp_path / "missing")).invalidate() == 0
+
+
+def test_disk_cache_put(tmp_path: Path) -> None:
+    cache = DiskCache(str(tmp_path))
+    (tmp_path / "other.json").write_text("{}")
+    cache.put({"id": 1}, ["foo"])
+    modes = {path.stat().st_mode & 0o777 for path in tmp_path.iterdir()}
+    assert len(modes) == 1
+
+    # no temporary file is left when the value can't be stored
+    with pytest.raises(TypeError):
+        cache.put({"id": 2}, object())
+    assert cache.get({"id": 2}) is None
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == [".json", ".json"]
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from operatorcert import github
+from operatorcert.retry import RetryAdapter
 from requests import HTTPError, Response
 
 
@@ -22,6 +23,14 @@ def test_get_session_no_auth() -> None:
         github._get_session(auth_required=True)
 
 
+def test_get_session(monkeypatch: Any) -> None:
+    monkeypatch.setenv("GITHUB_TOKEN", "123")
+    session = github.get_session()
+
+    assert session.headers["Authorization"] == "Bearer 123"
+    assert isinstance(session.get_adapter("https://api.github.com"), RetryAdapter)
+
+
 @patch("operatorcert.github._get_session")
 def test_post(mock_session: MagicMock) -> None:
     mock_session.return_value.post.return_value.json.return_value = {"key": "val"}
@@ -39,3 +48,22 @@ def test_post_with_error(mock_session: MagicMock) -> None:
     )
     with pytest.raises(HTTPError):
         github.post("https://foo.com/v1/bar", {})
+
+
+def test_iter_pages(stand_in_server: Any, monkeypatch: Any) -> None:
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    url = stand_in_server.url + "repos/foo/bar/pulls"
+
+    def handler(request: Any) -> Any:
+        _, path, headers, _ = request
+        assert "Authorization" not in headers
+        if path.endswith("page=2"):
+            return 200, {}, [{"id": 2}]
+        return 200, {"Link": f'<{url}?per_page=1&page=2>; rel="next"'}, [{"id": 1}]
+
+    stand_in_server.handler = handler
+    assert list(github.iter_pages(url, {"per_page": 1})) == [[{"id": 1}], [{"id": 2}]]
+
+    stand_in_server.handler = lambda request: (404, {}, {"message": "Not Found"})
+    with pytest.raises(HTTPError):
+        list(github.iter_pages(url))
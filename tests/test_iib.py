@@ -49,3 +49,32 @@ def test_get_builds_404(mock_session: MagicMock) -> None:
 
     with pytest.raises(HTTPError):
         iib.get_builds("https://foo.com/v1/bar", {})
+
+
+@patch("operatorcert.iib.get_session")
+def test_get_recent_builds(mock_session: MagicMock) -> None:
+    mock_session.return_value.get.return_value.json.return_value = {"items": []}
+    resp = iib.get_recent_builds("https://foo.com/", count=5)
+
+    assert resp == {"items": []}
+    mock_session.return_value.get.assert_called_once_with(
+        "https://foo.com/api/v1/builds",
+        params={
+            "state": "complete",
+            "request_type": "add",
+            "per_page": 5,
+            "verbose": "true",
+        },
+    )
+
+
+@patch("operatorcert.iib.get_session")
+def test_get_recent_builds_404(mock_session: MagicMock) -> None:
+    response = Response()
+    response.status_code = 404
+    mock_session.return_value.get.return_value.raise_for_status.side_effect = HTTPError(
+        response=response
+    )
+
+    with pytest.raises(HTTPError):
+        iib.get_recent_builds("https://foo.com/")
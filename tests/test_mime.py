@@ -0,0 +1,73 @@
+import gzip
+import json
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import magic
+import pytest
+from operatorcert import mime
+
+
+@pytest.mark.parametrize(
+    "file_name, mime_type",
+    [
+        ("preflight.log", "text/plain"),
+        ("results.JSON", "application/json"),
+        ("ci.yaml", "text/plain"),
+        ("must-gather.tar.gz", "application/gzip"),
+        ("bundle.tar", "application/x-tar"),
+        ("artifact", None),
+        ("artifact.bin", None),
+    ],
+)
+def test_from_extension(file_name: str, mime_type: str) -> None:
+    assert mime.from_extension(file_name) == mime_type
+
+
+@pytest.mark.parametrize(
+    "file_name, content",
+    [
+        ("preflight.log", b"time=2021-09-22 level=info msg=foo\n" * 10),
+        ("results.json", json.dumps({"passed": True}).encode("utf-8")),
+        ("ci.yaml", b"cert_project_id: 123\nmerge: false\n"),
+        ("must-gather.tar.gz", gzip.compress(b"foo")),
+    ],
+)
+def test_fast_path_matches_libmagic(
+    tmp_path: Path, file_name: str, content: bytes
+) -> None:
+    path = tmp_path / file_name
+    path.write_bytes(content)
+    assert mime.from_extension(file_name) == magic.from_file(str(path), mime=True)
+
+
+def test_from_file(tmp_path: Path) -> None:
+    path = tmp_path / "artifact"
+    path.write_bytes(gzip.compress(b"foo"))
+
+    assert mime.from_file(str(path)) == "application/gzip"
+    # already read content is not read again
+    with patch("builtins.open") as mock_open:
+        assert mime.from_file(str(path), buffer=b"foo bar\n") == "text/plain"
+        assert mime.from_file("artifact.log") == "text/plain"
+        mock_open.assert_not_called()
+
+
+@patch("operatorcert.mime.magic.Magic")
+def test_get_magic(mock_magic: MagicMock, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(mime, "_MAGIC", None)
+    mock_magic.return_value.from_buffer.return_value = "text/plain"
+
+    threads = [
+        threading.Thread(target=mime.from_buffer, args=(b"foo",)) for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # the magic database is loaded once per process
+    mock_magic.assert_called_once_with(mime=True)
+    assert mock_magic.return_value.from_buffer.call_count == 10
+    assert mime.get_magic() is mock_magic.return_value
@@ -0,0 +1,42 @@
+import pytest
+
+from operatorcert import naming
+
+
+@pytest.mark.parametrize(
+    "pr_title, expected",
+    [
+        ("operator foo-operator (1.0.1)", ("foo-operator", "1.0.1")),
+        ("operator FOO (1.0.1-ok)", ("FOO", "1.0.1-ok")),
+        ("operator foo (1.0.1) aa", None),
+        ("operator foo 1.0.1", None),
+        ("operator foo (1.0.1)\n", None),
+        ("operator f@o (1.0.1)", None),
+    ],
+)
+def test_parse_pr_title(pr_title: str, expected: tuple) -> None:
+    result = naming.parse_pr_title(pr_title)
+    assert result == expected
+    if expected:
+        assert result.bundle_name == expected[0]
+        assert result.version == expected[1]
+
+
+def test_classify_titles() -> None:
+    titles = [
+        "operator foo (1.0.0)",
+        "operator bar v2",
+        "Update documentation",
+        "operator baz (1.0.0) extra",
+        "operator b@z (1.0.0)",
+        "",
+    ]
+    assert naming.classify_titles(iter(titles)) == [
+        "foo",
+        "bar",
+        None,
+        None,
+        None,
+        None,
+    ]
+    assert naming.classify_titles([]) == []
@@ -0,0 +1,157 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from hypothesis import given
+from hypothesis import strategies as st
+
+from operatorcert import ocp_versions
+from operatorcert.cache import DiskCache
+
+RECORDED = json.loads(
+    (Path(__file__).parent / "data" / "pyxis_indices.json").read_text()
+)
+
+minors = st.integers(min_value=0, max_value=20)
+prefixes = st.sampled_from(["v", ""])
+
+
+@st.composite
+def expressions(draw: Any) -> Tuple[str, int, Optional[int]]:
+    """
+    OCP versions range expression with its expected minimum and maximum minor
+    """
+    kind = draw(st.sampled_from(["single", "range", "exact", "legacy"]))
+    prefix = draw(prefixes)
+    if kind == "single":
+        minor = draw(minors)
+        return f"{prefix}4.{minor}", minor, None
+    if kind == "exact":
+        minor = draw(minors)
+        return f"={prefix}4.{minor}", minor, minor
+    if kind == "range":
+        low, high = sorted([draw(minors), draw(minors)])
+        return f"{prefix}4.{low}-{prefix}4.{high}", low, high
+    versions = draw(st.lists(minors, min_size=1, max_size=3))
+    return ",".join(f"{prefix}4.{minor}" for minor in versions), min(versions), None
+
+
+def index(minor: int) -> Dict[str, Any]:
+    return {"ocp_version": f"4.{minor}", "path": f"quay.io/index:v4.{minor}"}
+
+
+@pytest.mark.parametrize(
+    "response",
+    RECORDED["responses"],
+    ids=[
+        f"{r['organization']}:{r['ocp_versions_range']}:{r['max_ocp_version']}"
+        for r in RECORDED["responses"]
+    ],
+)
+def test_resolve_indices_recorded(response: Dict[str, Any]) -> None:
+    catalogue = RECORDED["catalogue"][response["organization"]]
+    indices = ocp_versions.resolve_indices(
+        response["ocp_versions_range"], catalogue, response["max_ocp_version"]
+    )
+    assert indices == response["data"]
+
+
+@given(
+    st.sampled_from(RECORDED["responses"]).flatmap(
+        lambda response: st.tuples(
+            st.just(response),
+            st.permutations(RECORDED["catalogue"][response["organization"]]),
+        )
+    )
+)
+def test_resolve_indices_recorded_any_order(args: Any) -> None:
+    response, catalogue = args
+    indices = ocp_versions.resolve_indices(
+        response["ocp_versions_range"], catalogue, response["max_ocp_version"]
+    )
+    assert indices == response["data"]
+
+
+@given(
+    expressions(),
+    st.sets(minors).map(sorted),
+    st.one_of(st.none(), minors),
+    prefixes,
+)
+def test_resolve_indices(
+    expression: Tuple[str, int, Optional[int]],
+    catalogue: List[int],
+    max_minor: Optional[int],
+    prefix: str,
+) -> None:
+    ocp_versions_range, low, high = expression
+    max_ocp_version = None if max_minor is None else f"{prefix}4.{max_minor}"
+
+    indices = ocp_versions.resolve_indices(
+        ocp_versions_range, [index(minor) for minor in catalogue], max_ocp_version
+    )
+
+    expected = [
+        minor
+        for minor in reversed(catalogue)
+        if low <= minor
+        and (high is None or minor <= high)
+        and (max_minor is None or minor <= max_minor)
+    ]
+    assert indices == [index(minor) for minor in expected]
+
+
+def test_resolve_indices_version_order() -> None:
+    catalogue = [index(9), index(10), {"ocp_version": "5.0", "path": "foo"}]
+    assert [
+        i["ocp_version"] for i in ocp_versions.resolve_indices("v4.9", catalogue)
+    ] == ["5.0", "4.10", "4.9"]
+    assert ocp_versions.resolve_indices("v4.9", catalogue, "4.9") == [index(9)]
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["", "4.x", "v4.6-", "-v4.6", "v4.6-v4.7-v4.8", "=", "=v4.6-v4.7", "v4.6,"],
+)
+def test_parse_range_invalid(expression: str) -> None:
+    with pytest.raises(ValueError, match="Invalid OpenShift versions range"):
+        ocp_versions.parse_range(expression)
+
+
+@patch("operatorcert.pyxis.iter_pages")
+def test_get_index_catalogue(mock_pages: MagicMock, tmp_path: Path) -> None:
+    now = [1000.0]
+    cache = DiskCache(str(tmp_path), ttl=60, clock=lambda: now[0])
+    mock_pages.return_value = iter([index(8)])
+
+    assert ocp_versions.get_index_catalogue("https://foo/", "foo", cache) == [index(8)]
+    mock_pages.assert_called_once_with(
+        "https://foo/v1/operators/indices",
+        filter="organization==foo",
+        include=["data.ocp_version", "data.path"],
+        auth_required=False,
+    )
+
+    # fresh catalogue is used offline
+    assert ocp_versions.get_index_catalogue("https://foo/", "foo", cache) == [index(8)]
+    assert mock_pages.call_count == 1
+
+    now[0] += 60
+    mock_pages.return_value = iter([index(8), index(9)])
+    assert ocp_versions.get_index_catalogue("https://foo/", "foo", cache) == [
+        index(8),
+        index(9),
+    ]
+
+    # expired catalogue is used when Pyxis isn't available
+    now[0] += 60
+    mock_pages.side_effect = requests.ConnectionError()
+    assert len(ocp_versions.get_index_catalogue("https://foo/", "foo", cache)) == 2
+
+    with pytest.raises(requests.ConnectionError):
+        ocp_versions.get_index_catalogue("https://foo/", "bar", cache)
+    with pytest.raises(requests.ConnectionError):
+        ocp_versions.get_index_catalogue("https://foo/", "foo")
@@ -1,11 +1,19 @@
+import json
+import subprocess
+import threading
+import time
 from pathlib import Path
 from unittest import mock
 from unittest.mock import patch, MagicMock, call
-from typing import Dict
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
 
 import pytest
+import requests
 import yaml
 import operatorcert
+from operatorcert import github
+from operatorcert.cache import DiskCache
 
 Bundle = Dict[str, Path]
 
@@ -65,16 +73,102 @@ def test_get_csv_annotations(bundle: Bundle) -> None:
         operatorcert.get_csv_annotations(bundle_root, "foo-operator")
 
 
-@patch("requests.get")
-def test_get_supported_indices(mock_get: MagicMock) -> None:
-    mock_rsp = MagicMock()
-    mock_rsp.json.return_value = {"data": ["foo", "bar"]}
-    mock_get.return_value = mock_rsp
+@patch("operatorcert.pyxis.iter_pages")
+def test_get_supported_indices(mock_pages: MagicMock) -> None:
+    mock_pages.return_value = iter(["foo", "bar"])
 
     result = operatorcert.get_supported_indices(
         "https://foo.bar", "4.6-4.8", "certified-operators", max_ocp_version="4.7"
     )
     assert result == ["foo", "bar"]
+    mock_pages.assert_called_once_with(
+        "https://foo.bar/v1/operators/indices",
+        filter="organization==certified-operators;ocp_version=le=4.7",
+        include=["data.ocp_version", "data.path"],
+        params={"ocp_versions_range": "4.6-4.8", "sort_by": "ocp_version[desc]"},
+        auth_required=False,
+    )
+
+
+def test_get_supported_indices_cache(tmp_path: Path, stand_in_server: Any) -> None:
+    now = [1000.0]
+    cache = DiskCache(str(tmp_path), ttl=60, clock=lambda: now[0])
+    indices = [{"ocp_version": "4.8", "path": "quay.io/foo:4.8"}]
+    etag = ['"1"']
+
+    def handler(request: Any) -> Any:
+        headers = request[2]
+        if headers.get("If-None-Match") == etag[0]:
+            return 304, {"ETag": etag[0]}, b""
+        return 200, {"ETag": etag[0]}, {"data": indices, "total": len(indices)}
+
+    stand_in_server.handler = handler
+
+    def get_indices() -> Any:
+        return operatorcert.get_supported_indices(
+            stand_in_server.url, "v4.8", "certified-operators", cache=cache
+        )
+
+    assert get_indices() == indices
+    _, path, headers, _ = stand_in_server.requests[0]
+    assert "page_size=500" in path
+    assert "If-None-Match" not in headers
+
+    # fresh entries are used without any request
+    assert get_indices() == indices
+    assert len(stand_in_server.requests) == 1
+
+    # expired entries are revalidated
+    now[0] += 60
+    assert get_indices() == indices
+    assert len(stand_in_server.requests) == 2
+    assert stand_in_server.requests[1][2]["If-None-Match"] == '"1"'
+    assert get_indices() == indices
+    assert len(stand_in_server.requests) == 2
+
+    now[0] += 60
+    indices = [{"ocp_version": "4.9", "path": "quay.io/foo:4.9"}, *indices]
+    etag[0] = '"2"'
+    assert get_indices() == indices
+    assert (
+        cache.get(
+            {
+                "url": stand_in_server.url + "v1/operators/indices",
+                "organization": "certified-operators",
+                "ocp_versions_range": "v4.8",
+                "max_ocp_version": None,
+            }
+        )["etag"]
+        == '"2"'
+    )
+
+
+@patch("operatorcert.pyxis.iter_pages")
+def test_get_supported_indices_cache_pages(
+    mock_pages: MagicMock, tmp_path: Path, stand_in_server: Any
+) -> None:
+    cache = DiskCache(str(tmp_path))
+    stand_in_server.handler = lambda request: (
+        200,
+        {"ETag": '"1"'},
+        {"data": [{"ocp_version": "4.8"}], "total": 2},
+    )
+    mock_pages.return_value = iter([{"ocp_version": "4.8"}, {"ocp_version": "4.7"}])
+
+    # more indices than fit in a page are fetched page by page
+    indices = operatorcert.get_supported_indices(
+        stand_in_server.url, "v4.7", "certified-operators", "4.8", cache=cache
+    )
+    assert indices == [{"ocp_version": "4.8"}, {"ocp_version": "4.7"}]
+    assert mock_pages.call_args[1]["filter"] == (
+        "organization==certified-operators;ocp_version=le=4.8"
+    )
+
+    stand_in_server.handler = lambda request: (404, {}, {})
+    with pytest.raises(requests.HTTPError):
+        operatorcert.get_supported_indices(
+            stand_in_server.url, "v4.6", "certified-operators", cache=cache
+        )
 
 
 @patch("operatorcert.get_supported_indices")
@@ -113,6 +207,25 @@ def test_ocp_version_info(mock_indices: MagicMock, bundle: Bundle) -> None:
         operatorcert.ocp_version_info(bundle_root, "", organization)
 
 
+@patch("operatorcert.ocp_versions.get_index_catalogue")
+def test_ocp_version_info_local(mock_catalogue: MagicMock, bundle: Bundle) -> None:
+    mock_catalogue.return_value = [
+        {"ocp_version": version, "path": f"quay.io/foo:{version}"}
+        for version in ["4.5", "4.6", "4.7", "4.8"]
+    ]
+    cache = MagicMock()
+
+    info = operatorcert.ocp_version_info(
+        bundle["root"], "", "certified-operators", cache=cache, local=True
+    )
+    assert info["indices"] == [
+        {"ocp_version": "4.7", "path": "quay.io/foo:4.7"},
+        {"ocp_version": "4.6", "path": "quay.io/foo:4.6"},
+    ]
+    assert info["max_version_index"] == info["indices"][0]
+    mock_catalogue.assert_called_once_with("", "certified-operators", cache)
+
+
 def test_get_repo_and_org_from_github_url():
     # test http and ssh
     for url in [
@@ -136,43 +249,207 @@ def test_get_repo_and_org_from_github_url():
         )
 
 
-@patch("requests.get")
-def test_get_files_added_in_pr(mock_get: MagicMock):
-    mock_rsp = MagicMock()
-    mock_rsp.json.return_value = {
-        "irrelevant_key": "abc",
-        "files": [
+def files_handler(server: Any, pages: List[List[Dict[str, str]]]) -> Any:
+    """
+    Stand-in Github handler of a PR found by its head label with pages of
+    changed files
+    """
+
+    def handler(request: Any) -> Any:
+        url = urlparse(request[1])
+        query = parse_qs(url.query)
+        if url.path == "/repos/rh/operator-repo/pulls":
+            assert query == {
+                "state": ["open"],
+                "base": ["main"],
+                "head": ["user:fixup"],
+            }
+            return 200, {}, [{"number": 42}] if pages else []
+
+        assert url.path == "/repos/rh/operator-repo/pulls/42/files"
+        page = int(query.get("page", ["1"])[0])
+        headers = {}
+        if page < len(pages):
+            next_url = f"{server.url}repos/rh/operator-repo/pulls/42/files"
+            headers["Link"] = f'<{next_url}?per_page=100&page={page + 1}>; rel="next"'
+        return 200, headers, pages[page - 1]
+
+    return handler
+
+
+def test_get_files_added_in_pr(stand_in_server: Any) -> None:
+    pages = [
+        [{"filename": f"file-{i}", "status": "added"} for i in range(100)],
+        [{"filename": "last", "status": "added"}],
+    ]
+    stand_in_server.handler = files_handler(stand_in_server, pages)
+
+    files = operatorcert.get_files_added_in_pr(
+        "rh", "operator-repo", "main", "user:fixup", github_api_url=stand_in_server.url
+    )
+    # nothing is requested until the files are consumed
+    assert not stand_in_server.requests
+    assert list(files) == [f"file-{i}" for i in range(100)] + ["last"]
+    assert [request[1] for request in stand_in_server.requests] == [
+        "/repos/rh/operator-repo/pulls?state=open&base=main&head=user%3Afixup",
+        "/repos/rh/operator-repo/pulls/42/files?per_page=100",
+        "/repos/rh/operator-repo/pulls/42/files?per_page=100&page=2",
+    ]
+
+    # the known PR number isn't looked up
+    stand_in_server.requests.clear()
+    files = operatorcert.get_files_added_in_pr(
+        "rh", "operator-repo", "main", "user:fixup", 42, stand_in_server.url
+    )
+    assert len(list(files)) == 101
+    assert len(stand_in_server.requests) == 2
+
+
+def test_get_files_added_in_pr_changed_files(stand_in_server: Any) -> None:
+    pages = [
+        [
             {"filename": "first", "status": "added"},
-            {"filename": "second", "status": "added"},
+            {"filename": "second", "status": "modified"},
         ],
-    }
-    mock_get.return_value = mock_rsp
+        [{"filename": "third", "status": "removed"}],
+    ]
+    stand_in_server.handler = files_handler(stand_in_server, pages)
+
     files = operatorcert.get_files_added_in_pr(
-        "rh", "operator-repo", "main", "user:fixup"
+        "rh", "operator-repo", "main", "user:fixup", 42, stand_in_server.url
     )
-    mock_get.assert_called_with(
-        "https://api.github.com/repos/rh/operator-repo/compare/main...user:fixup"
+    assert next(files) == "first"
+    with pytest.raises(RuntimeError):
+        next(files)
+    # the next page isn't requested after the first changed file
+    assert len(stand_in_server.requests) == 1
+
+
+def test_get_files_added_in_pr_missing_pr(stand_in_server: Any) -> None:
+    stand_in_server.handler = files_handler(stand_in_server, [])
+
+    with pytest.raises(RuntimeError):
+        list(
+            operatorcert.get_files_added_in_pr(
+                "rh", "operator-repo", "main", "user:fixup", None, stand_in_server.url
+            )
+        )
+
+
+def git(repo_path: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=repo_path,
+        check=True,
+        capture_output=True,
     )
-    assert files == ["first", "second"]
 
 
-@patch("requests.get")
-def test_get_files_added_in_pr_changed_files(mock_get: MagicMock):
-    mock_rsp = MagicMock()
-    mock_rsp.json.return_value = {
-        "irrelevant_key": "abc",
-        "files": [
-            {"filename": "first", "status": "deleted"},
-            {"filename": "second", "status": "changed"},
-        ],
-    }
-    mock_get.return_value = mock_rsp
+@pytest.fixture
+def operators_repo(tmp_path: Path) -> Path:
+    """
+    Git repository with a merged bundle and a PR branch checked out
+    """
+    bundle_path = tmp_path / "operators" / "sample-operator" / "0.1.0"
+    bundle_path.mkdir(parents=True)
+    (bundle_path / "1.txt").write_text("merged")
+    (bundle_path / "2.txt").write_text("merged")
+    git(tmp_path, "init", "-q", "-b", "main")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "merged bundle")
+    git(tmp_path, "checkout", "-q", "-b", "pr")
+    return tmp_path
+
+
+def test_get_files_added_in_local_repo(operators_repo: Path) -> None:
+    bundle_path = operators_repo / "operators" / "sample-operator" / "0.2.0"
+    bundle_path.mkdir()
+    (bundle_path / "1 with space.txt").write_text("new")
+    (operators_repo / "operators" / "sample-operator" / "ci.yaml").write_text("new")
+    git(operators_repo, "add", "-A")
+    git(operators_repo, "commit", "-q", "-m", "new bundle")
+    # changes in the base branch after the PR was opened aren't part of the PR
+    git(operators_repo, "checkout", "-q", "main")
+    (operators_repo / "README.md").write_text("main")
+    git(operators_repo, "add", "-A")
+    git(operators_repo, "commit", "-q", "-m", "main change")
+    git(operators_repo, "checkout", "-q", "pr")
+
+    files = operatorcert.get_files_added_in_local_repo(operators_repo, "main")
+    assert list(files) == [
+        "operators/sample-operator/0.2.0/1 with space.txt",
+        "operators/sample-operator/ci.yaml",
+    ]
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        # modified
+        lambda path: (path / "1.txt").write_text("changed"),
+        # removed
+        lambda path: (path / "1.txt").unlink(),
+        # renamed
+        lambda path: (path / "1.txt").rename(path / "3.txt"),
+    ],
+)
+def test_get_files_added_in_local_repo_changed_files(
+    operators_repo: Path, change: Any
+) -> None:
+    change(operators_repo / "operators" / "sample-operator" / "0.1.0")
+    git(operators_repo, "add", "-A")
+    git(operators_repo, "commit", "-q", "-m", "changed bundle")
+
     with pytest.raises(RuntimeError):
-        operatorcert.get_files_added_in_pr("rh", "operator-repo", "main", "user:fixup")
-    mock_get.assert_called_with(
-        "https://api.github.com/repos/rh/operator-repo/compare/main...user:fixup"
+        list(operatorcert.get_files_added_in_local_repo(operators_repo, "main"))
+
+
+def test_get_files_added_in_local_repo_unknown_ref(operators_repo: Path) -> None:
+    with pytest.raises(RuntimeError, match="git fetch origin unknown"):
+        list(operatorcert.get_files_added_in_local_repo(operators_repo, "unknown"))
+
+
+def add_bundle(repo_path: Path) -> None:
+    bundle_path = repo_path / "operators" / "sample-operator" / "0.2.0"
+    bundle_path.mkdir()
+    (bundle_path / "1.txt").write_text("new")
+    git(repo_path, "add", "-A")
+    git(repo_path, "commit", "-q", "-m", "new bundle")
+
+
+def test_get_files_added_in_local_repo_remote_base(
+    operators_repo: Path, tmp_path_factory: Any
+) -> None:
+    add_bundle(operators_repo)
+    # a pipeline clone of the PR branch has only origin/main
+    clone = tmp_path_factory.mktemp("clone")
+    git(clone, "clone", "-q", "-b", "pr", str(operators_repo), ".")
+
+    files = operatorcert.get_files_added_in_local_repo(clone, "main")
+    assert list(files) == ["operators/sample-operator/0.2.0/1.txt"]
+
+
+def test_get_files_added_in_local_repo_shallow(
+    operators_repo: Path, tmp_path_factory: Any
+) -> None:
+    add_bundle(operators_repo)
+    clone = tmp_path_factory.mktemp("clone")
+    git(
+        clone,
+        "clone",
+        "-q",
+        "--depth",
+        "1",
+        "--no-single-branch",
+        "-b",
+        "pr",
+        f"file://{operators_repo}",
+        ".",
     )
 
+    with pytest.raises(RuntimeError, match="shallow"):
+        list(operatorcert.get_files_added_in_local_repo(clone, "main"))
+
 
 @pytest.mark.parametrize(
     "wrong_change",
@@ -187,6 +464,8 @@ def test_get_files_added_in_pr_changed_files(mock_get: MagicMock):
         "sample-repository/operators/sample-operator/0.1.1/1.txt",
         # change other than ci.yaml in the operator directory level
         "sample-repository/operators/sample-operator/1.txt",
+        # version sharing the prefix of the bundle version
+        "operators/sample-operator/0.1.0.1/1.txt",
     ],
 )
 def test_verify_changed_files_location(wrong_change: str):
@@ -213,6 +492,32 @@ def test_verify_changed_files_location(wrong_change: str):
         )
 
 
+def test_verify_changed_files_location_stops_early() -> None:
+    changed_files = iter(
+        [
+            "operators/sample-operator/0.1.0/1.txt",
+            "operators/other-operator/0.1.0/1.txt",
+            "operators/sample-operator/0.1.0/2.txt",
+        ]
+    )
+    with pytest.raises(RuntimeError):
+        operatorcert.verify_changed_files_location(
+            changed_files, "sample-operator", "0.1.0"
+        )
+    # the changes after the wrong one aren't consumed
+    assert list(changed_files) == ["operators/sample-operator/0.1.0/2.txt"]
+
+
+def test_verify_changed_files_location_summary_only(caplog: Any) -> None:
+    changed_files = [f"operators/sample-operator/0.1.0/{i}.txt" for i in range(100)]
+    with caplog.at_level("INFO"):
+        operatorcert.verify_changed_files_location(
+            changed_files, "sample-operator", "0.1.0", summary_only=True
+        )
+    assert len(caplog.records) == 2
+    assert caplog.records[-1].message == "All 100 changes are in the expected paths"
+
+
 @pytest.mark.parametrize(
     "pr_title, is_valid, name, version",
     [
@@ -236,61 +541,158 @@ def test_parse_pr_title(pr_title: str, is_valid: bool, name: str, version: str):
             operatorcert.parse_pr_title(pr_title)
 
 
-@patch("requests.get")
-def test_verify_pr_uniqueness(mock_get: MagicMock):
-    base_pr_url = "https://github.com/user/repo/pulls/1"
-    pr_rsp = [
-        # At first call get return:
-        [
-            {"title": "operator first (1.2.3)", "html_url": base_pr_url},
-            {
-                "title": "operator second (1.2.3)",
-                "html_url": base_pr_url.replace("1", "2"),
-            },
-            {
-                "title": "operator third (1.2.3)",
-                "html_url": base_pr_url.replace("1", "3"),
-            },
-            {
-                "title": "title not conforming regex- should not throw error",
-                "html_url": base_pr_url.replace("1", "4"),
-            },
-        ],
-        # At second call return:
-        [
-            {
-                "title": "operator fourth (1.2.3)",
-                "html_url": base_pr_url.replace("1", "5"),
-            }
+def pulls_handler(
+    server: Any, pages: Dict[str, List[List[Dict[str, str]]]], barrier: Any = None
+) -> Any:
+    """
+    Stand-in Github handler listing pages of pull requests of repositories
+    """
+
+    def handler(request: Any) -> Any:
+        url = urlparse(request[1])
+        repo = url.path.removeprefix("/repos/").removesuffix("/pulls")
+        query = parse_qs(url.query)
+        assert query["state"] == ["open"] and query["per_page"] == ["100"]
+        page = int(query.get("page", ["1"])[0])
+        if barrier and page == 1:
+            barrier.wait(timeout=5)
+        headers = {}
+        if page < len(pages[repo]):
+            next_url = f"{server.url}repos/{repo}/pulls?state=open&per_page=100"
+            headers["Link"] = f'<{next_url}&page={page + 1}>; rel="next"'
+        return 200, headers, pages[repo][page - 1]
+
+    return handler
+
+
+def pr(title: str, number: int) -> Dict[str, str]:
+    return {"title": title, "html_url": f"https://github.com/org/repo/pulls/{number}"}
+
+
+def test_verify_pr_uniqueness(stand_in_server: Any, monkeypatch: Any) -> None:
+    monkeypatch.setenv("GITHUB_TOKEN", "123")
+    sessions = []
+
+    def get_session() -> Any:
+        sessions.append(github._get_session())
+        return sessions[-1]
+
+    monkeypatch.setattr(github, "get_session", get_session)
+    base_pr_url = "https://github.com/org/repo/pulls/1"
+    pages = {
+        "org1/repo_a": [
+            [
+                pr("operator first (1.2.3)", 1),
+                pr("operator second (1.2.3)", 2),
+                pr("title not conforming regex- should not throw error", 3),
+            ],
+            [pr("operator third (1.2.3)", 4)],
         ],
+        "org2/repo_b": [[pr("operator fourth (1.2.3)", 5)]],
+    }
+    stand_in_server.handler = pulls_handler(stand_in_server, pages)
+    repositories = ["org1/repo_a", "org2/repo_b"]
+
+    operatorcert.verify_pr_uniqueness(
+        repositories, base_pr_url, "first", stand_in_server.url
+    )
+    paths = sorted(request[1] for request in stand_in_server.requests)
+    assert paths == [
+        "/repos/org1/repo_a/pulls?state=open&per_page=100",
+        "/repos/org1/repo_a/pulls?state=open&per_page=100&page=2",
+        "/repos/org2/repo_b/pulls?state=open&per_page=100",
     ]
+    # every repository is listed with a single authenticated session
+    assert len(sessions) == 1
+    assert all(
+        request[2]["Authorization"] == "Bearer 123"
+        for request in stand_in_server.requests
+    )
 
-    mock_rsp = MagicMock()
-    mock_rsp.json.side_effect = pr_rsp
+    # duplicates beyond the first page are found
+    pages["org1/repo_a"][1].append(pr("operator first (1.2.4)", 6))
+    with pytest.raises(RuntimeError):
+        operatorcert.verify_pr_uniqueness(
+            repositories, base_pr_url, "first", stand_in_server.url
+        )
 
-    mock_get.return_value = mock_rsp
 
-    available_repositories = ["org1/repo_a", "org2/repo_b"]
-    base_pr_bundle_name = "first"
-    operatorcert.verify_pr_uniqueness(
-        available_repositories, base_pr_url, base_pr_bundle_name
-    )
+def test_verify_pr_uniqueness_stops_early(stand_in_server: Any) -> None:
+    pages = {
+        "org1/repo_a": [[pr("operator first (1.2.4)", 2)], [pr("foo", 3)]],
+        "org2/repo_b": [[pr("bar", 4)], [pr("baz", 5)]],
+    }
+    # both repositories are listed at the same time
+    barrier = threading.Barrier(2)
+    handler = pulls_handler(stand_in_server, pages, barrier)
+
+    def slow_handler(request: Any) -> Any:
+        response = handler(request)
+        if "repo_b" in request[1]:
+            # the duplicate in repo_a is found before repo_b responds
+            time.sleep(0.5)
+        return response
 
-    # For second call return PR title with the same operator name, but other version
-    pr_rsp[1].append(
-        {"title": "operator first (1.2.4)", "html_url": base_pr_url.replace("1", "5")}
+    stand_in_server.handler = slow_handler
+
+    with pytest.raises(RuntimeError):
+        operatorcert.verify_pr_uniqueness(
+            ["org1/repo_a", "org2/repo_b"],
+            "https://github.com/org/repo/pulls/1",
+            "first",
+            stand_in_server.url,
+        )
+    # no other pages are listed once the duplicate is found
+    assert len(stand_in_server.requests) == 2
+
+
+def test_verify_pr_uniqueness_search(stand_in_server: Any) -> None:
+    recorded = json.loads(
+        (Path(__file__).parent / "data" / "github_search_pulls.json").read_text()
     )
-    mock_rsp.json.side_effect = pr_rsp
 
-    assert mock_get.call_args_list == [
-        call("https://api.github.com/repos/org1/repo_a/pulls"),
-        call("https://api.github.com/repos/org2/repo_b/pulls"),
+    def handler(request: Any) -> Any:
+        url = urlparse(request[1])
+        query = parse_qs(url.query)
+        assert url.path == "/search/issues"
+        assert query["q"] == [recorded["query"]]
+        page = int(query.get("page", ["1"])[0])
+        headers = {}
+        if page < len(recorded["pages"]):
+            headers["Link"] = (
+                f'<{stand_in_server.url}{request[1][1:]}&page=2>; rel="next"'
+            )
+        return 200, headers, recorded["pages"][page - 1]
+
+    stand_in_server.handler = handler
+    repositories = [
+        "redhat-openshift-ecosystem/certified-operators",
+        "redhat-openshift-ecosystem/redhat-marketplace",
     ]
+    base_pr_url = (
+        "https://github.com/redhat-openshift-ecosystem/certified-operators/pull/412"
+    )
 
     with pytest.raises(RuntimeError):
         operatorcert.verify_pr_uniqueness(
-            available_repositories, base_pr_url, base_pr_bundle_name
+            repositories,
+            base_pr_url,
+            "test-operator",
+            stand_in_server.url,
+            backend="search",
         )
+    assert len(stand_in_server.requests) == 2
+
+    # similar bundle names found by the search aren't duplicates
+    recorded["pages"] = recorded["pages"][:1]
+    recorded["pages"][0]["incomplete_results"] = True
+    operatorcert.verify_pr_uniqueness(
+        repositories,
+        base_pr_url,
+        "test-operator",
+        stand_in_server.url,
+        backend="search",
+    )
 
 
 def test_validate_user():
@@ -347,5 +749,48 @@ def test_download_test_results(mock_get: MagicMock):
         result_id = operatorcert.download_test_results(args)
     # Assert
     assert result_id == "1234"
-    mock_get.assert_called_with(test_results_url)
+    mock_get.assert_called_with(
+        test_results_url,
+        include=["data._id", "data.passed", "data.results", "data.test_library"],
+    )
     mock_open.assert_called_with("test_results.json", "w")
+
+
+def test_operator_bundle(bundle: Bundle) -> None:
+    operator_bundle = operatorcert.OperatorBundle(bundle["root"])
+    with patch.object(
+        operatorcert.OperatorBundle,
+        "_load_yaml",
+        wraps=operatorcert.OperatorBundle._load_yaml,
+    ) as mock_load, patch(
+        "operatorcert.extract_paths", wraps=operatorcert.extract_paths
+    ) as mock_extract:
+        assert operator_bundle.package == "foo-operator"
+        assert operator_bundle.max_ocp_version == "4.7"
+        assert operator_bundle.csv_annotations == {
+            "olm.properties": '[{"type": "olm.maxOpenShiftVersion", "value": "4.7"}]'
+        }
+        assert operator_bundle.related_images == []
+        assert operator_bundle.annotations["com.redhat.openshift.versions"] == "4.6-4.8"
+        # every file is parsed only once, only the needed CSV fields are built
+        mock_load.assert_called_once_with(bundle["annotations"])
+        mock_extract.assert_called_once_with(
+            bundle["csv"], ["metadata.annotations", "spec.relatedImages"]
+        )
+
+    with bundle["csv"].open("w") as fh:
+        yaml.safe_dump({"spec": {"relatedImages": [{"name": "foo"}]}}, fh)
+    operator_bundle = operatorcert.OperatorBundle(bundle["root"], "foo-operator")
+    assert operator_bundle.related_images == [{"name": "foo"}]
+    assert operator_bundle.max_ocp_version is None
+
+    # fields are taken from the CSV when it's already parsed
+    operator_bundle = operatorcert.OperatorBundle(bundle["root"], "foo-operator")
+    with patch("operatorcert.extract_paths") as mock_extract:
+        assert operator_bundle.csv == {"spec": {"relatedImages": [{"name": "foo"}]}}
+        assert operator_bundle.related_images == [{"name": "foo"}]
+        assert operator_bundle.csv_annotations == {}
+        mock_extract.assert_not_called()
+    assert operatorcert.get_csv_content(bundle["root"], "foo-operator") == {
+        "spec": {"relatedImages": [{"name": "foo"}]}
+    }
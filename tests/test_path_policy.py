@@ -0,0 +1,91 @@
+import pytest
+
+from operatorcert import path_policy
+from operatorcert.path_policy import ALLOWED, DENIED, UNMATCHED
+
+
+@pytest.mark.parametrize(
+    "path, verdict",
+    [
+        ("operators/foo/1.0/manifests/foo.csv.yaml", ALLOWED),
+        ("operators/foo/1.0/metadata/annotations.yaml", ALLOWED),
+        ("operators/foo/ci.yaml", ALLOWED),
+        # directory boundaries
+        ("operators/foo/1.0", UNMATCHED),
+        ("operators/foo/1.0.1/manifests/foo.csv.yaml", UNMATCHED),
+        ("operators/foo-bar/1.0/manifests/foo.csv.yaml", UNMATCHED),
+        ("operators/foo/ci.yaml.bak", UNMATCHED),
+        ("operators/foo/0.9/manifests/foo.csv.yaml", UNMATCHED),
+        ("README.md", UNMATCHED),
+    ],
+)
+def test_bundle_policy(path: str, verdict: str) -> None:
+    policy = path_policy.bundle_policy("foo", "1.0")
+    assert policy.classify(path) == verdict
+
+
+@pytest.mark.parametrize(
+    "path, verdict",
+    [
+        ("docs/README.md", ALLOWED),
+        ("docs/guide/index.md", ALLOWED),
+        ("docs/guide/image.png", UNMATCHED),
+        ("operators/foo/tests/scorecard/config.yaml", ALLOWED),
+        ("operators/foo/1.0/tests/scorecard/config.yaml", ALLOWED),
+        ("operators/foo/tests/scorecard/config.json", UNMATCHED),
+        ("docs/secret.md", DENIED),
+        ("docs/private/index.md", DENIED),
+        ("docs/private", ALLOWED),
+    ],
+)
+def test_path_policy(path: str, verdict: str) -> None:
+    policy = path_policy.PathPolicy(
+        allowed=["docs/**/*.md", "operators/*/**/scorecard/*.yaml", "docs/*"],
+        denied=["docs/secret.md", "docs/private/**"],
+    )
+    assert policy.classify(path) == verdict
+    assert policy.allowed == [
+        "docs/**/*.md",
+        "operators/*/**/scorecard/*.yaml",
+        "docs/*",
+    ]
+
+
+def test_path_policy_shared_prefixes() -> None:
+    policy = path_policy.PathPolicy(
+        allowed=["operators/*/1.0/**", "operators/*/ci.yaml", "operators/**"],
+        denied=["operators/*/2.0/**"],
+    )
+    assert policy.classify("operators/foo/1.0/x") == ALLOWED
+    assert policy.classify("operators/foo/ci.yaml") == ALLOWED
+    assert policy.classify("operators/foo/2.0/x") == DENIED
+    assert policy.classify("operators") == UNMATCHED
+
+
+def test_path_policy_invalid_verdict() -> None:
+    with pytest.raises(ValueError):
+        path_policy.PathPolicy().add("operators/**", "maybe")
+
+
+@pytest.mark.parametrize(
+    "bundle_version, path, verdict",
+    [
+        ("*", "operators/foo/1.0/manifests/foo.csv.yaml", UNMATCHED),
+        ("*", "operators/foo/*/manifests/foo.csv.yaml", ALLOWED),
+        ("1.[0-9]", "operators/foo/1.5/manifests/foo.csv.yaml", UNMATCHED),
+        ("1.[0-9]", "operators/foo/1.[0-9]/manifests/foo.csv.yaml", ALLOWED),
+        ("1.?", "operators/foo/1.5/manifests/foo.csv.yaml", UNMATCHED),
+        ("**", "operators/foo/1.0/manifests/foo.csv.yaml", UNMATCHED),
+    ],
+)
+def test_bundle_policy_wildcards(bundle_version: str, path: str, verdict: str) -> None:
+    # the version from the PR title is matched literally
+    policy = path_policy.bundle_policy("foo", bundle_version)
+    assert policy.classify(path) == verdict
+
+
+def test_bundle_policy_wildcard_name() -> None:
+    policy = path_policy.bundle_policy("*", "1.0")
+    assert policy.classify("operators/foo/1.0/manifests/foo.csv.yaml") == UNMATCHED
+    assert policy.classify("operators/foo/ci.yaml") == UNMATCHED
+    assert policy.classify("operators/*/ci.yaml") == ALLOWED
@@ -0,0 +1,198 @@
+import random
+import statistics
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from operatorcert import polling
+from operatorcert.entrypoints import index
+
+
+def timestamp(value: float) -> str:
+    return (
+        datetime.fromtimestamp(value, timezone.utc).isoformat().replace("+00:00", "Z")
+    )
+
+
+def build(id: int, state: str, *updated: float) -> Dict[str, Any]:
+    return {
+        "id": id,
+        "state": state,
+        "state_history": [{"updated": timestamp(u)} for u in reversed(updated)],
+    }
+
+
+class SimulatedClock:
+    """
+    Clock advanced only by sleeping
+    """
+
+    def __init__(self) -> None:
+        self.now = 1600000000.0
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        assert seconds >= 0
+        self.now += seconds
+
+
+class FakeIIB:
+    """
+    Stand-in IIB API serving batches of builds finishing at given times
+    """
+
+    def __init__(self, clock: SimulatedClock) -> None:
+        self.clock = clock
+        self.batches: Dict[int, List[Tuple[int, float, float]]] = {}
+
+    def submit(self, durations: List[float]) -> int:
+        batch_id = len(self.batches) + 1
+        self.batches[batch_id] = [
+            (batch_id * 100 + i, self.clock.now, self.clock.now + duration)
+            for i, duration in enumerate(durations)
+        ]
+        return batch_id
+
+    def finished_at(self, build_id: int) -> float:
+        return self.batches[build_id // 100][build_id % 100][2]
+
+    def __call__(self, request: Any) -> Any:
+        batch_id = int(parse_qs(urlsplit(request[1]).query)["batch"][0])
+        items = []
+        for build_id, submitted, finished in self.batches[batch_id]:
+            if finished <= self.clock.now:
+                items.append(build(build_id, "complete", submitted, finished))
+            else:
+                items.append(build(build_id, "in_progress", submitted))
+        return 200, {}, {"items": items}
+
+
+def history(count: int = 20) -> List[Dict[str, Any]]:
+    """
+    Earlier builds with the same durations as the simulated ones
+    """
+    rand = random.Random(0)
+    return [build(i, "complete", 0, rand.gauss(600, 60)) for i in range(count)]
+
+
+def simulate(
+    stand_in_server: Any, scheduler: polling.PollScheduler, batches: int = 10
+) -> Tuple[float, int]:
+    """
+    Wait for batches of builds with realistic durations using the scheduler
+
+    Returns:
+        Tuple[float, int]: Mean detection latency (seconds) and request count
+    """
+    clock = SimulatedClock()
+    iib = FakeIIB(clock)
+    stand_in_server.handler = iib
+    rand = random.Random(42)
+    latencies = []
+
+    for _ in range(batches):
+        batch_id = iib.submit([rand.gauss(600, 60) for _ in range(4)])
+        for result in index.iter_build_results(
+            stand_in_server.url, batch_id, scheduler=scheduler, clock=clock
+        ):
+            latencies.append(clock.now - iib.finished_at(result["id"]))
+        # next batch is submitted a while later
+        clock.sleep(3600)
+
+    return statistics.mean(latencies), len(stand_in_server.requests)
+
+
+def test_simulated_schedulers(stand_in_server: Any) -> None:
+    schedulers = {
+        "fixed": polling.PollScheduler(delay=20),
+        "exponential": polling.ExponentialScheduler(max_delay=120),
+        "adaptive": polling.AdaptiveScheduler(builds=history(), max_delay=120),
+    }
+    results = {}
+    for name, scheduler in schedulers.items():
+        stand_in_server.requests.clear()
+        results[name] = simulate(stand_in_server, scheduler)
+    fixed_latency, fixed_requests = results["fixed"]
+    exponential_latency, exponential_requests = results["exponential"]
+    latency, requests = results["adaptive"]
+
+    # builds are detected within the longest delay between polls
+    assert 0 < fixed_latency <= 20
+    assert 0 < exponential_latency <= 120
+    # backing off saves requests at the cost of latency
+    assert exponential_requests < fixed_requests
+    assert exponential_latency > fixed_latency
+    # builds are detected sooner with far fewer requests
+    assert latency < fixed_latency
+    assert requests < fixed_requests * 0.6
+
+
+def test_get_build_duration() -> None:
+    assert polling.get_build_duration(build(1, "complete", 10, 70)) == 60
+    assert polling.get_build_duration(build(1, "failed", 10, 40)) == 30
+    assert polling.get_build_duration(build(1, "in_progress", 10)) is None
+    assert polling.get_build_duration({"id": 1, "state": "complete"}) is None
+    assert (
+        polling.get_build_duration(
+            {
+                "id": 1,
+                "state": "complete",
+                "state_history": [{}, {"updated": timestamp(0)}],
+            }
+        )
+        is None
+    )
+    assert polling.get_build_start({"state_history": [{"updated": None}]}) is None
+
+
+def test_exponential_scheduler() -> None:
+    scheduler = polling.ExponentialScheduler(initial=5, max_delay=30)
+    assert [scheduler.next_delay([], 0) for _ in range(5)] == [5, 10, 20, 30, 30]
+    scheduler.start()
+    assert scheduler.next_delay([], 0) == 5
+
+
+def test_adaptive_scheduler() -> None:
+    scheduler = polling.AdaptiveScheduler(min_delay=5, window=3, polls=10)
+    pending = [build(10, "in_progress", 1000)]
+
+    # no history
+    assert scheduler.expected_duration is None
+    assert scheduler.next_delay(pending, 1000) == 5
+    assert scheduler.next_delay(pending, 1005) == 10
+
+    scheduler.observe(build(1, "complete", 0, 500))
+    scheduler.observe(build(1, "complete", 0, 500))
+    scheduler.observe(build(2, "in_progress", 0))
+    assert scheduler.expected_duration == (500, 500)
+
+    scheduler.observe(build(3, "complete", 0, 100))
+    scheduler.observe(build(4, "complete", 0, 300))
+    scheduler.observe(build(5, "complete", 0, 400))
+    # only the latest builds are used
+    assert sorted(scheduler._durations) == [3, 4, 5]
+    fastest, slowest = scheduler.expected_duration
+    assert fastest < 300 < slowest
+
+    # wait until the fastest build would finish
+    assert scheduler.next_delay(pending, 1000 + fastest - 60) == 60
+    # poll often while the builds are expected to finish
+    interval = (slowest - fastest) / 10
+    assert scheduler.next_delay(pending, 1000 + fastest + 1) == interval
+    # build is late
+    assert scheduler.next_delay(pending, 1000 + slowest + 200) == 100
+    assert scheduler.next_delay(pending, 1000 + slowest + 1000) == 120
+    assert scheduler.next_delay(pending, 1000 + slowest + 1) == interval
+    # the earliest expected build is polled first
+    assert (
+        scheduler.next_delay(
+            [build(11, "in_progress", 2000), *pending], 1000 + fastest - 20
+        )
+        == 20
+    )
+
+    # build without history
+    scheduler.start()
+    assert scheduler.next_delay([{"id": 12, "state": "in_progress"}], 1000) == 5
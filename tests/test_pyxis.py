@@ -1,9 +1,28 @@
-from typing import Any
+import base64
+import json
+import time
+from typing import Any, Generator
 from unittest.mock import MagicMock, patch
 
 import pytest
-from operatorcert import pyxis
+from operatorcert import pyxis, retry
+from operatorcert.streaming import JSONFileBody
 from requests import HTTPError, Response
+from urllib.parse import parse_qs, urlparse
+
+
+@pytest.fixture(autouse=True)
+def clients() -> Generator[None, None, None]:
+    yield
+    pyxis.close_clients()
+
+
+@pytest.fixture
+def mock_session() -> Generator[MagicMock, None, None]:
+    client = pyxis.PyxisClient(api_key="123")
+    client._session = MagicMock()
+    with patch("operatorcert.pyxis.get_client", return_value=client):
+        yield client._session
 
 
 def test_is_internal(monkeypatch: Any) -> None:
@@ -15,145 +34,297 @@ def test_is_internal(monkeypatch: Any) -> None:
     assert pyxis.is_internal()
 
 
-def test_get_session_api_key(monkeypatch: Any) -> None:
+def test_get_client_api_key(monkeypatch: Any) -> None:
     monkeypatch.setenv("PYXIS_API_KEY", "123")
-    session = pyxis._get_session()
+    session = pyxis.get_client("https://foo.com/v1/bar").session
 
     assert session.headers["X-API-KEY"] == "123"
+    assert session.headers["Connection"] == "keep-alive"
 
 
-def test_get_session_cert(monkeypatch: Any) -> None:
+def test_get_client_cert(monkeypatch: Any) -> None:
     monkeypatch.setenv("PYXIS_CERT_PATH", "/path/to/cert.pem")
     monkeypatch.setenv("PYXIS_KEY_PATH", "/path/to/key.key")
-    session = pyxis._get_session()
+    session = pyxis.get_client("https://foo.com/v1/bar").session
 
     assert session.cert == ("/path/to/cert.pem", "/path/to/key.key")
 
 
-def test_get_session_no_auth(monkeypatch: Any) -> None:
+def test_get_client_no_auth(monkeypatch: Any) -> None:
     with pytest.raises(Exception):
-        pyxis._get_session()
+        pyxis.get_client("https://foo.com/v1/bar")
+
+
+def test_get_client_shared(monkeypatch: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    monkeypatch.setenv("PYXIS_POOL_MAXSIZE", "3")
+    monkeypatch.setenv("PYXIS_KEEP_ALIVE", "false")
+    client = pyxis.get_client("https://foo.com/v1/bar")
+
+    assert pyxis.get_client("https://foo.com/v1/baz") is client
+    assert pyxis.get_client("https://bar.com/v1/baz") is not client
+    assert client.pool_maxsize == 3
+    assert client.session.headers["Connection"] == "close"
+    assert client.session.get_adapter("https://foo.com")._pool_maxsize == 3
+
+    monkeypatch.setenv("PYXIS_API_KEY", "456")
+    assert pyxis.get_client("https://foo.com/v1/bar") is not client
+
+
+def test_client_close() -> None:
+    client = pyxis.PyxisClient(api_key="123")
+    session = client.session
+    assert client.session is session
+
+    client.close()
+    assert client.session is not session
+    client.close()
+    client.close()
+
+
+def test_client_reuses_connections(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    stand_in_server.handler = lambda request: (200, {}, {"key": "val"})
+
+    for _ in range(5):
+        assert pyxis.get(stand_in_server.url + "v1/foo").json() == {"key": "val"}
+        assert pyxis.post(stand_in_server.url + "v1/bar", {}) == {"key": "val"}
+
+    assert len(stand_in_server.requests) == 10
+    assert stand_in_server.connections == 1
+    assert all(r[2]["X-API-KEY"] == "123" for r in stand_in_server.requests)
+
+
+def test_post_file_body(monkeypatch: Any, stand_in_server: Any, tmp_path: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    monkeypatch.setattr(retry.RetryPolicy, "backoff", lambda self, retry: 0)
+    artifact = tmp_path / "artifact.log"
+    artifact.write_bytes(b"log" * 1000)
+    statuses = [429]
+    stand_in_server.handler = lambda request: (
+        statuses.pop() if statuses else 200,
+        {},
+        json.loads(request[3]),
+    )
+
+    body = JSONFileBody({"filename": "artifact.log"}, "content", str(artifact))
+    resp = pyxis.post(stand_in_server.url + "v1/artifacts", body)
+
+    assert base64.b64decode(resp["content"]) == b"log" * 1000
+    assert resp["filename"] == "artifact.log"
+    # retried request sends the whole body again
+    assert len(stand_in_server.requests) == 2
+    for _, _, headers, content in stand_in_server.requests:
+        assert headers["Content-Length"] == str(len(body)) == str(len(content))
+        assert headers["Content-Type"] == "application/json"
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_post(mock_session: MagicMock) -> None:
-    mock_session.return_value.post.return_value.json.return_value = {"key": "val"}
+    mock_session.request.return_value.json.return_value = {"key": "val"}
     resp = pyxis.post("https://foo.com/v1/bar", {})
 
     assert resp == {"key": "val"}
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_patch(mock_session: MagicMock) -> None:
-    mock_session.return_value.patch.return_value.json.return_value = {"key": "val"}
+    mock_session.request.return_value.json.return_value = {"key": "val"}
     resp = pyxis.patch("https://foo.com/v1/bar", {})
 
     assert resp == {"key": "val"}
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_patch_error(mock_session: MagicMock) -> None:
     response = Response()
     response.status_code = 400
-    mock_session.return_value.patch.return_value.raise_for_status.side_effect = (
-        HTTPError(response=response)
+    mock_session.request.return_value.raise_for_status.side_effect = HTTPError(
+        response=response
     )
     with pytest.raises(HTTPError):
         pyxis.patch("https://foo.com/v1/bar", {})
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_put(mock_session: MagicMock) -> None:
-    mock_session.return_value.put.return_value.json.return_value = {"key": "val"}
+    mock_session.request.return_value.json.return_value = {"key": "val"}
     resp = pyxis.put("https://foo.com/v1/bar", {})
 
     assert resp == {"key": "val"}
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_put_error(mock_session: MagicMock) -> None:
     response = Response()
     response.status_code = 400
-    mock_session.return_value.put.return_value.raise_for_status.side_effect = HTTPError(
+    mock_session.request.return_value.raise_for_status.side_effect = HTTPError(
         response=response
     )
     with pytest.raises(HTTPError):
         pyxis.put("https://foo.com/v1/bar", {})
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_get(mock_session: MagicMock) -> None:
-    mock_session.return_value.get.return_value = {"key": "val"}
+    mock_session.get.return_value = {"key": "val"}
     resp = pyxis.get("https://foo.com/v1/bar")
 
     assert resp == {"key": "val"}
+    mock_session.get.assert_called_once_with("https://foo.com/v1/bar", params={})
+
+    pyxis.get("https://foo.com/v1/bar", include=["data._id", "data.name"])
+    mock_session.get.assert_called_with(
+        "https://foo.com/v1/bar", params={"include": "data._id,data.name"}
+    )
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_post_error(mock_session: MagicMock) -> None:
     response = Response()
     response.status_code = 400
-    mock_session.return_value.post.return_value.raise_for_status.side_effect = (
-        HTTPError(response=response)
+    mock_session.request.return_value.raise_for_status.side_effect = HTTPError(
+        response=response
     )
     with pytest.raises(HTTPError):
         pyxis.post("https://foo.com/v1/bar", {})
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_get_project(mock_session: MagicMock) -> None:
-    mock_session.return_value.get.return_value.json.return_value = {"key": "val"}
-    resp = pyxis.get_project("https://foo.com/v1", "123")
+    mock_session.get.return_value.json.return_value = {"key": "val"}
+    resp = pyxis.get_project("https://foo.com/v1/", "123", include=["org_id"])
 
     assert resp == {"key": "val"}
+    mock_session.get.assert_called_once_with(
+        "https://foo.com/v1/v1/projects/certification/id/123",
+        params={"include": "org_id"},
+    )
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_get_project_error(mock_session: MagicMock) -> None:
     response = Response()
     response.status_code = 400
-    mock_session.return_value.get.return_value.raise_for_status.side_effect = HTTPError(
+    mock_session.get.return_value.raise_for_status.side_effect = HTTPError(
         response=response
     )
     with pytest.raises(HTTPError):
         pyxis.get_project("https://foo.com/v1", "123")
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_get_vendor_by_org_id(mock_session: MagicMock) -> None:
-    mock_session.return_value.get.return_value.json.return_value = {"key": "val"}
-    resp = pyxis.get_vendor_by_org_id("https://foo.com/v1", "123")
+    mock_session.get.return_value.json.return_value = {"key": "val"}
+    resp = pyxis.get_vendor_by_org_id("https://foo.com/v1/", "123", include=["label"])
 
     assert resp == {"key": "val"}
+    mock_session.get.assert_called_once_with(
+        "https://foo.com/v1/v1/vendors/org-id/123", params={"include": "label"}
+    )
 
 
-@patch("operatorcert.pyxis._get_session")
 def test_get_vendor_by_org_id_error(mock_session: MagicMock) -> None:
     response = Response()
     response.status_code = 400
-    mock_session.return_value.get.return_value.raise_for_status.side_effect = HTTPError(
+    mock_session.get.return_value.raise_for_status.side_effect = HTTPError(
         response=response
     )
     with pytest.raises(HTTPError):
         pyxis.get_vendor_by_org_id("https://foo.com/v1", "123")
 
 
-@patch("operatorcert.pyxis._get_session")
-def test_get_repository_by_isv_pid(mock_session: MagicMock) -> None:
-    mock_session.return_value.get.return_value.json.return_value = {
-        "data": [{"key": "val"}]
+def test_get_repository_by_isv_pid(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    data = [{"_id": "1"}]
+    stand_in_server.handler = lambda request: (
+        200,
+        {},
+        {"data": data, "total": len(data)},
+    )
+    url = stand_in_server.url
+
+    assert pyxis.get_repository_by_isv_pid(url, "123", ["data._id"]) == {"_id": "1"}
+    query = parse_qs(urlparse(stand_in_server.requests[0][1]).query)
+    assert query == {
+        "filter": ["isv_pid==123"],
+        "page_size": ["2"],
+        "page": ["0"],
+        "include": ["data._id"],
     }
-    resp = pyxis.get_repository_by_isv_pid("https://foo.com/v1", "123")
 
-    assert resp == {"key": "val"}
+    # only the first page is requested when there are more repositories
+    data = [{"_id": str(i)} for i in range(5)]
+    stand_in_server.requests.clear()
+    assert pyxis.get_repository_by_isv_pid(url, "123") == {"_id": "0"}
+    assert len(stand_in_server.requests) == 1
 
+    data = []
+    assert pyxis.get_repository_by_isv_pid(url, "123") is None
 
-@patch("operatorcert.pyxis._get_session")
-def test_get_repository_by_isv_pid_error(mock_session: MagicMock) -> None:
-    response = Response()
-    response.status_code = 400
-    mock_session.return_value.get.return_value.raise_for_status.side_effect = HTTPError(
-        response=response
+
+def test_iter_pages(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    records = [{"_id": i} for i in range(25)]
+
+    def handler(request: Any) -> Any:
+        query = parse_qs(urlparse(request[1]).query)
+        page, page_size = int(query["page"][0]), int(query["page_size"][0])
+        data = records[page * page_size : (page + 1) * page_size]
+        return 200, {}, {"data": data, "page": page, "total": len(records)}
+
+    stand_in_server.handler = handler
+    url = stand_in_server.url + "v1/operators/indices"
+
+    pages = pyxis.iter_pages(
+        url,
+        filter="organization==foo",
+        include=["data._id"],
+        page_size=10,
+        params={"sort_by": "_id"},
+    )
+    assert list(pages) == records
+
+    queries = [parse_qs(urlparse(r[1]).query) for r in stand_in_server.requests]
+    assert [q["page"] for q in queries] == [["0"], ["1"], ["2"]]
+    assert queries[0]["filter"] == ["organization==foo"]
+    assert queries[0]["include"] == ["total,data._id"]
+    assert queries[0]["sort_by"] == ["_id"]
+
+    # the last page is recognized without total count
+    records = records[:20]
+    stand_in_server.requests.clear()
+    handler_with_total = stand_in_server.handler
+    stand_in_server.handler = lambda request: (
+        200,
+        {},
+        {"data": handler_with_total(request)[2]["data"]},
     )
+    assert list(pyxis.iter_pages(url, page_size=10)) == records
+    assert len(stand_in_server.requests) == 3
+
+
+def test_iter_pages_prefetch(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    stand_in_server.handler = lambda request: (
+        200,
+        {},
+        {"data": [{"_id": 1}, {"_id": 2}], "total": 10},
+    )
+
+    pages = pyxis.iter_pages(stand_in_server.url + "v1/foo", page_size=2)
+    assert next(pages) == {"_id": 1}
+    # the second page is fetched while the first one is consumed
+    for _ in range(50):
+        if len(stand_in_server.requests) == 2:
+            break
+        time.sleep(0.01)
+    assert len(stand_in_server.requests) == 2
+    pages.close()
+
+
+def test_iter_pages_error(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    stand_in_server.handler = lambda request: (400, {}, {"detail": "error"})
+
     with pytest.raises(HTTPError):
-        pyxis.get_repository_by_isv_pid("https://foo.com/v1", "123")
+        list(pyxis.iter_pages(stand_in_server.url + "v1/foo"))
+
+
+def test_iter_pages_no_auth(stand_in_server: Any) -> None:
+    stand_in_server.handler = lambda request: (200, {}, {"data": [], "total": 0})
+
+    assert list(pyxis.iter_pages(stand_in_server.url, auth_required=False)) == []
+    assert "X-API-KEY" not in stand_in_server.requests[0][2]
+    with pytest.raises(Exception):
+        list(pyxis.iter_pages(stand_in_server.url))
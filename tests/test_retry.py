@@ -0,0 +1,222 @@
+import time
+from email.utils import formatdate
+from typing import Any, Generator, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from operatorcert import github, hydra, iib, pyxis, retry
+
+
+@pytest.fixture(autouse=True)
+def budget() -> Generator[None, None, None]:
+    yield
+    retry.BUDGET.reset()
+    pyxis.close_clients()
+
+
+@pytest.fixture
+def sleeps() -> List[float]:
+    return []
+
+
+@pytest.fixture
+def session(sleeps: List[float]) -> requests.Session:
+    policy = retry.RetryPolicy(budget=retry.RetryBudget(10))
+    return retry.mount(requests.Session(), policy=policy, sleep=sleeps.append)
+
+
+def faults(*statuses: Any) -> Any:
+    """
+    Stand-in handler failing with given statuses (and headers) before succeeding
+    """
+    responses = list(statuses)
+
+    def handler(request: Any) -> Any:
+        if responses:
+            status = responses.pop(0)
+            headers = {}
+            if isinstance(status, tuple):
+                status, headers = status
+            return status, headers, {"error": status}
+        return 200, {}, {"key": "val"}
+
+    return handler
+
+
+def test_retry_transient_failures(
+    session: requests.Session, sleeps: List[float], stand_in_server: Any
+) -> None:
+    stand_in_server.handler = faults(502, 503, 500, 504)
+
+    resp = session.get(stand_in_server.url + "foo")
+
+    assert resp.json() == {"key": "val"}
+    assert len(stand_in_server.requests) == 5
+    # full jitter exponential backoff
+    assert len(sleeps) == 4
+    for i, delay in enumerate(sleeps):
+        assert 0 <= delay <= 2**i
+
+
+def test_retry_gives_up(
+    session: requests.Session, sleeps: List[float], stand_in_server: Any
+) -> None:
+    stand_in_server.handler = faults(*[502] * 10)
+
+    resp = session.get(stand_in_server.url + "foo")
+
+    assert resp.status_code == 502
+    assert len(stand_in_server.requests) == 6
+    assert len(sleeps) == 5
+
+
+def test_retry_not_transient(session: requests.Session, stand_in_server: Any) -> None:
+    stand_in_server.handler = faults(404)
+
+    assert session.get(stand_in_server.url + "foo").status_code == 404
+    assert len(stand_in_server.requests) == 1
+
+
+def test_retry_after(
+    session: requests.Session, sleeps: List[float], stand_in_server: Any
+) -> None:
+    stand_in_server.handler = faults(
+        (429, {"Retry-After": "7"}),
+        (503, {"Retry-After": formatdate(time.time() + 60, usegmt=True)}),
+        (503, {"Retry-After": "invalid"}),
+    )
+
+    assert session.get(stand_in_server.url + "foo").status_code == 200
+    assert sleeps[0] == 7
+    assert 50 < sleeps[1] <= 60
+    assert 0 <= sleeps[2] <= 4
+
+
+def test_retry_after_too_long(
+    session: requests.Session, sleeps: List[float], stand_in_server: Any
+) -> None:
+    stand_in_server.handler = faults((503, {"Retry-After": "3600"}))
+
+    assert session.get(stand_in_server.url + "foo").status_code == 503
+    assert sleeps == []
+
+
+def test_retry_github_rate_limit(
+    session: requests.Session, sleeps: List[float], stand_in_server: Any
+) -> None:
+    reset = str(int(time.time()) + 30)
+    stand_in_server.handler = faults(
+        (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset}),
+        (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "invalid"}),
+    )
+
+    assert session.post(stand_in_server.url + "foo", json={}).status_code == 200
+    assert 20 < sleeps[0] <= 30
+    assert 0 <= sleeps[1] <= 2
+
+    # 403 without exhausted rate limit is a permanent failure
+    stand_in_server.handler = faults((403, {"X-RateLimit-Remaining": "10"}))
+    assert session.get(stand_in_server.url + "foo").status_code == 403
+
+
+def test_retry_post(session: requests.Session, stand_in_server: Any) -> None:
+    # POST isn't retried unless it's known it wasn't processed by the server
+    stand_in_server.handler = faults(502)
+    assert session.post(stand_in_server.url + "foo", json={}).status_code == 502
+
+    stand_in_server.handler = faults(429)
+    assert session.post(stand_in_server.url + "foo", json={}).status_code == 200
+
+    stand_in_server.handler = faults(502)
+    resp = session.post(
+        stand_in_server.url + "foo",
+        json={},
+        headers={retry.IDEMPOTENCY_KEY_HEADER: "123"},
+    )
+    assert resp.status_code == 200
+
+    stand_in_server.handler = faults(502)
+    assert session.put(stand_in_server.url + "foo", json={}).status_code == 200
+
+    methods = [r[0] for r in stand_in_server.requests]
+    assert methods == ["POST", "POST", "POST", "POST", "POST", "PUT", "PUT"]
+
+
+def test_retry_budget(sleeps: List[float], stand_in_server: Any) -> None:
+    budget = retry.RetryBudget(3)
+    policy = retry.RetryPolicy(budget=budget)
+    session = retry.mount(requests.Session(), policy=policy, sleep=sleeps.append)
+    stand_in_server.handler = faults(*[502] * 10)
+
+    assert session.get(stand_in_server.url + "foo").status_code == 502
+    assert len(stand_in_server.requests) == 4
+    host = stand_in_server.url.split("/")[2]
+    assert budget.remaining(host) == 0
+
+    # budget is exhausted for the host
+    assert session.get(stand_in_server.url + "foo").status_code == 502
+    assert len(stand_in_server.requests) == 5
+
+    budget.reset()
+    assert budget.remaining(host) == 3
+
+
+def test_retry_connection_error(sleeps: List[float]) -> None:
+    policy = retry.RetryPolicy(budget=retry.RetryBudget(10))
+    session = retry.mount(requests.Session(), policy=policy, sleep=sleeps.append)
+
+    # nothing listens on the port - connection is refused before sending anything
+    with pytest.raises(requests.ConnectionError):
+        session.post("http://127.0.0.1:1/foo", json={})
+    assert len(sleeps) == 5
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_retry_read_error(mock_send: MagicMock, sleeps: List[float]) -> None:
+    policy = retry.RetryPolicy(budget=retry.RetryBudget(10))
+    session = retry.mount(requests.Session(), policy=policy, sleep=sleeps.append)
+    mock_send.side_effect = requests.ConnectionError("Connection reset by peer")
+
+    # request might have been processed - POST is not retried
+    with pytest.raises(requests.ConnectionError):
+        session.post("http://foo.com/foo", json={})
+    assert sleeps == []
+
+    with pytest.raises(requests.ConnectionError):
+        session.get("http://foo.com/foo")
+    assert len(sleeps) == 5
+
+    response = requests.Response()
+    response.status_code = 200
+    mock_send.side_effect = [requests.ReadTimeout("timeout"), response]
+    assert session.get("http://foo.com/foo") is response
+    assert len(sleeps) == 6
+
+    # connection timeout - request wasn't sent, so even POST is retried
+    mock_send.side_effect = [requests.ConnectTimeout("timeout"), response]
+    assert session.post("http://foo.com/foo", json={}) is response
+    assert len(sleeps) == 7
+
+
+def test_clients_retry(monkeypatch: Any, stand_in_server: Any) -> None:
+    monkeypatch.setenv("PYXIS_API_KEY", "123")
+    monkeypatch.setenv("HYDRA_USERNAME", "user")
+    monkeypatch.setenv("HYDRA_PASSWORD", "password")
+    monkeypatch.setenv("GITHUB_TOKEN", "123")
+    monkeypatch.setattr(retry.RetryPolicy, "backoff", lambda self, retry: 0)
+    url = stand_in_server.url
+
+    stand_in_server.handler = faults(502)
+    assert pyxis.get_project(url, "123") == {"key": "val"}
+
+    stand_in_server.handler = faults(503)
+    assert hydra.get(url + "foo") == {"key": "val"}
+
+    stand_in_server.handler = faults(429)
+    assert github.post(url + "foo", {}) == {"key": "val"}
+
+    stand_in_server.handler = faults(504)
+    assert iib.get_builds(url, 1) == {"key": "val"}
+
+    assert len(stand_in_server.requests) == 8
@@ -0,0 +1,132 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+import yaml
+
+from operatorcert import scan
+
+
+def add_bundle(
+    repo: Path,
+    operator: str,
+    version: str,
+    annotations: Optional[Dict[str, Any]] = None,
+    csv: Optional[Dict[str, Any]] = None,
+) -> Path:
+    bundle_path = repo / "operators" / operator / version
+    (bundle_path / "metadata").mkdir(parents=True)
+    (bundle_path / "manifests").mkdir()
+    if annotations is None:
+        annotations = {
+            "operators.operatorframework.io.bundle.package.v1": operator,
+            "com.redhat.openshift.versions": "v4.7",
+        }
+    with (bundle_path / "metadata" / "annotations.yaml").open("w") as fh:
+        yaml.safe_dump({"annotations": annotations}, fh)
+    if csv is None:
+        csv = {
+            "metadata": {
+                "annotations": {
+                    "olm.properties": '[{"type": "olm.maxOpenShiftVersion", "value": 4.8}]'
+                }
+            },
+            "spec": {"relatedImages": [{"name": "foo", "image": f"quay.io/{version}"}]},
+        }
+    csv_path = bundle_path / "manifests" / f"{operator}.clusterserviceversion.yaml"
+    with csv_path.open("w") as fh:
+        yaml.safe_dump(csv, fh)
+    return bundle_path
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    add_bundle(tmp_path, "foo", "1.0.0")
+    add_bundle(tmp_path, "foo", "1.1.0")
+    add_bundle(tmp_path, "bar", "0.1.0", annotations={})
+    (tmp_path / "operators" / "foo" / "ci.yaml").write_text("reviewers: []\n")
+    (tmp_path / "operators" / "foo" / "empty").mkdir()
+    return tmp_path
+
+
+def test_iter_bundle_paths(repo: Path) -> None:
+    assert [str(path.relative_to(repo)) for path in scan.iter_bundle_paths(repo)] == [
+        "operators/bar/0.1.0",
+        "operators/foo/1.0.0",
+        "operators/foo/1.1.0",
+    ]
+
+
+def test_scan_bundle(repo: Path) -> None:
+    bundle_path = repo / "operators" / "foo" / "1.0.0"
+    record = scan.scan_bundle(bundle_path, repo)
+    files = record.pop("files")
+    assert record == {
+        "path": "operators/foo/1.0.0",
+        "operator": "foo",
+        "version": "1.0.0",
+        "errors": [],
+        "annotations": {
+            "operators.operatorframework.io.bundle.package.v1": "foo",
+            "com.redhat.openshift.versions": "v4.7",
+        },
+        "ocp_versions": "v4.7",
+        "package": "foo",
+        "max_ocp_version": "4.8",
+        "related_images": [{"name": "foo", "image": "quay.io/1.0.0"}],
+    }
+    assert sorted(files) == [
+        "manifests/foo.clusterserviceversion.yaml",
+        "metadata/annotations.yaml",
+    ]
+
+    record = scan.scan_bundle(repo / "operators" / "bar" / "0.1.0")
+    assert record["path"] == "0.1.0"
+    assert record["annotations"] == {}
+    assert record["errors"] == [
+        "ValueError: 'operators.operatorframework.io.bundle.package.v1' "
+        "annotation not defined"
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scan(repo: Path, workers: int) -> None:
+    records = list(scan.scan(repo, workers=workers))
+    assert [record["path"] for record in records] == [
+        "operators/bar/0.1.0",
+        "operators/foo/1.0.0",
+        "operators/foo/1.1.0",
+    ]
+    assert records[2]["related_images"] == [{"name": "foo", "image": "quay.io/1.1.0"}]
+
+    # only the changed bundles are scanned again
+    previous = {record["path"]: record for record in records}
+    previous["operators/foo/1.0.0"]["package"] = "cached"
+    previous["operators/foo/1.1.0"]["package"] = "cached"
+    csv_path = repo / "operators/foo/1.1.0/manifests/foo.clusterserviceversion.yaml"
+    csv_path.write_text("spec: {}\n")
+    os.utime(csv_path, ns=(0, 0))
+
+    records = list(scan.scan(repo, previous, workers=workers))
+    assert [record["package"] for record in records[1:]] == ["cached", "foo"]
+    assert records[2]["related_images"] == []
+
+
+def test_write_records(repo: Path, tmp_path: Path) -> None:
+    output = tmp_path / "bundles.jsonl"
+    assert scan.load_records(output) == {}
+
+    total, failed = scan.write_records(output, scan.scan(repo, workers=1))
+    assert (total, failed) == (3, 1)
+    lines = output.read_text().splitlines()
+    assert [json.loads(line)["path"] for line in lines] == [
+        "operators/bar/0.1.0",
+        "operators/foo/1.0.0",
+        "operators/foo/1.1.0",
+    ]
+
+    output.write_text(output.read_text() + "\n")
+    records = scan.load_records(output)
+    assert list(records) == [json.loads(line)["path"] for line in lines]
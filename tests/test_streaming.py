@@ -0,0 +1,154 @@
+import base64
+import gzip
+import json
+import os
+import tracemalloc
+from typing import Any, Iterator
+from unittest.mock import patch
+
+import pytest
+import zstandard
+from operatorcert import streaming
+
+
+@pytest.fixture
+def artifact(tmp_path: Any) -> str:
+    path = tmp_path / "artifact.log"
+    path.write_bytes(os.urandom(1000))
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 4, 100, 999, 1000, 1001, 4096])
+def test_iter_base64(artifact: str, chunk_size: int) -> None:
+    with open(artifact, "rb") as fh:
+        expected = base64.b64encode(fh.read())
+    assert b"".join(streaming.iter_base64(artifact, chunk_size)) == expected
+
+
+def test_iter_base64_short_reads(artifact: str) -> None:
+    read = open(artifact, "rb").read
+    original = open
+
+    class ShortReads:
+        def __init__(self, *args: Any) -> None:
+            self.fh = original(*args)
+
+        def __enter__(self) -> Any:
+            return self
+
+        def __exit__(self, *args: Any) -> None:
+            self.fh.close()
+
+        def read(self, size: int) -> bytes:
+            # pipes and sockets may return fewer bytes than requested
+            return self.fh.read(max(1, size - 2))
+
+    with patch("builtins.open", ShortReads):
+        chunks = list(streaming.iter_base64(artifact, 30))
+    assert b"".join(chunks) == base64.b64encode(read())
+    # only the last block is padded
+    assert all(b"=" not in chunk for chunk in chunks[:-1])
+
+
+def test_json_file_body(artifact: str) -> None:
+    body = streaming.JSONFileBody(
+        {"filename": "artifact.log", "size": 1}, "content", artifact
+    )
+    with open(artifact, "rb") as fh:
+        content = base64.b64encode(fh.read()).decode("utf-8")
+
+    encoded = b"".join(body)
+    assert json.loads(encoded) == {
+        "content": content,
+        "filename": "artifact.log",
+        "size": 1,
+    }
+    assert len(body) == len(encoded)
+    # the body can be sent repeatedly
+    assert b"".join(body) == encoded
+
+    body = streaming.JSONFileBody({}, "content", artifact)
+    assert json.loads(b"".join(body)) == {"content": content}
+    assert len(body) == len(b"".join(body))
+
+    with pytest.raises(ValueError):
+        streaming.JSONFileBody({"content": "foo"}, "content", artifact)
+
+
+def test_json_file_body_changed_file(tmp_path: Any) -> None:
+    path = tmp_path / "preflight.log"
+    path.write_bytes(b"foo bar")
+    body = streaming.JSONFileBody({}, "content", str(path))
+
+    # the file grows after the body is created
+    with open(path, "ab") as fh:
+        fh.write(b" baz")
+    encoded = b"".join(body)
+    assert len(body) == len(encoded)
+    assert json.loads(encoded) == {"content": base64.b64encode(b"foo bar").decode()}
+
+    # the file is truncated
+    path.write_bytes(b"foo")
+    with pytest.raises(IOError):
+        b"".join(body)
+
+
+def test_json_file_body_memory(tmp_path: Any) -> None:
+    path = tmp_path / "must-gather.tar"
+    with open(path, "wb") as fh:
+        for _ in range(32):
+            fh.write(os.urandom(1024 * 1024))
+
+    body = streaming.JSONFileBody({"filename": "must-gather.tar"}, "content", str(path))
+    tracemalloc.start()
+    try:
+        size = sum(len(chunk) for chunk in body)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert size == len(body)
+    # memory is bounded by the chunk size, not the 32MB file
+    assert peak < 8 * streaming.DEFAULT_CHUNK_SIZE
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+@pytest.mark.parametrize("encoding", streaming.COMPRESSIONS)
+def test_compressed_body(artifact: str, encoding: str) -> None:
+    body = streaming.JSONFileBody({"filename": "artifact.log"}, "content", artifact)
+    compressed = streaming.CompressedBody(body, encoding)
+
+    data = b"".join(compressed)
+    assert decompress(data, encoding) == b"".join(body)
+    # the body can be sent repeatedly
+    assert b"".join(compressed) == data
+    assert compressed.headers == {
+        "Content-Type": "application/json",
+        "Content-Encoding": encoding,
+    }
+
+    logs = streaming.CompressedBody([b"INFO foo\n" * 1000], encoding, level=1)
+    assert len(b"".join(logs)) < 9000 / 10
+    assert logs.headers == {"Content-Encoding": encoding}
+
+
+def test_compressed_body_unsupported() -> None:
+    with pytest.raises(ValueError):
+        streaming.CompressedBody([b"foo"], "br")
+
+
+def test_streaming_body() -> None:
+    with pytest.raises(TypeError):
+        streaming.StreamingBody()
+
+    class Body(streaming.StreamingBody):
+        def __iter__(self) -> Iterator[bytes]:
+            yield b"foo"
+
+    assert Body().headers == {}
+    assert b"".join(Body()) == b"foo"
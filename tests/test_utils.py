@@ -1,9 +1,12 @@
+import hashlib
 from pathlib import Path
+from typing import Any, Dict, List
 from unittest import mock
 from unittest.mock import call, MagicMock
 
 import pytest
 import os
+import yaml
 
 from operatorcert import utils
 from operatorcert.utils import store_results
@@ -69,3 +72,161 @@ def test_set_client_keytab() -> None:
         mock_isfile.return_value = True
         utils.set_client_keytab("test")
         assert os.environ["KRB5_CLIENT_KTNAME"] == "FILE:test"
+
+
+def test_get_file_digest(tmp_path: Path) -> None:
+    path = tmp_path / "artifact.log"
+    path.write_bytes(b"foo" * 1000)
+
+    expected = hashlib.sha256(b"foo" * 1000).hexdigest()
+    assert utils.get_file_digest(str(path)) == expected
+    assert utils.get_file_digest(str(path), chunk_size=7) == expected
+
+
+CSV_YAML = """\
+apiVersion: operators.coreos.com/v1alpha1
+kind: ClusterServiceVersion
+metadata:
+  name: &name foo-operator.v1.0.0
+  annotations:
+    alm-examples: |-
+      [{"apiVersion": "foo.example.com/v1", "kind": "Foo", "spec": {"size": 3}}]
+    createdAt: 2021-10-10T10:10:10Z
+    olm.properties: '[{"type": "olm.maxOpenShiftVersion", "value": 4.8}]'
+    description: >
+      Folded
+      description ✓
+spec:
+  version: 1.0.0
+  replicas: 0x10
+  minKubeVersion: 1.20
+  maturity: ~
+  preview: yes
+  ratio: .5e3
+  keywords: [foo, "bar", 'baz']
+  icon:
+  - base64data: iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk
+    mediatype: image/png
+  links:
+  - &link {name: Docs, url: "https://foo.example.com"}
+  - *link
+  labels:
+    <<: {app: *name}
+    tier: backend
+"""
+
+
+def test_load_yaml(tmp_path: Path, monkeypatch: Any) -> None:
+    path = tmp_path / "foo.clusterserviceversion.yaml"
+    path.write_text(CSV_YAML, encoding="utf-8")
+    expected = yaml.load(CSV_YAML, Loader=yaml.SafeLoader)
+
+    # the fast loader builds exactly the same document as the pure Python one
+    content = utils.load_yaml(path)
+    assert content == expected
+    assert [type(v) for v in content["spec"].values()] == [
+        type(v) for v in expected["spec"].values()
+    ]
+    assert content["spec"]["labels"] == {
+        "app": "foo-operator.v1.0.0",
+        "tier": "backend",
+    }
+
+    monkeypatch.setattr(utils, "YAML_LOADER", yaml.SafeLoader)
+    assert utils.load_yaml(path) == expected
+
+
+@pytest.mark.parametrize(
+    "paths",
+    [
+        ["metadata.annotations", "spec.relatedImages"],
+        ["metadata.name", "spec.icon", "spec.links", "spec.labels"],
+        [("metadata", "annotations", "olm.properties"), "spec.keywords"],
+        ["metadata", "metadata.annotations.createdAt", "spec.version"],
+        ["spec.missing", "spec.version.missing", "missing"],
+    ],
+)
+def test_extract_paths(tmp_path: Path, paths: List[Any]) -> None:
+    path = tmp_path / "foo.clusterserviceversion.yaml"
+    path.write_text(CSV_YAML, encoding="utf-8")
+    assert utils.extract_paths(path, paths) == lookup(CSV_YAML, paths)
+
+
+def lookup(content: str, paths: List[Any]) -> Dict[Any, Any]:
+    """
+    Look up the paths in the fully loaded document
+    """
+    document = yaml.safe_load(content)
+    expected = {}
+    for key in paths:
+        value = document
+        for part in key.split(".") if isinstance(key, str) else key:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            expected[key] = value
+    return expected
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        # merged mapping on the way to the value
+        "base: &base\n"
+        "  metadata: {annotations: {a: 1}}\n"
+        "  spec: {relatedImages: [foo]}\n"
+        "csv:\n"
+        "  <<: *base\n"
+        "  spec: {relatedImages: [bar]}\n",
+        # list of merged mappings
+        "a: &a {metadata: {annotations: {a: 1}}}\n"
+        "b: &b {spec: {relatedImages: [foo]}}\n"
+        "csv: {<<: [*a, *b]}\n",
+        # merge key in an anchored mapping
+        "csv: &csv\n"
+        "  <<: {metadata: {annotations: {a: 1}}}\n"
+        "  spec: {relatedImages: [foo]}\n",
+        # merge key in the requested value
+        "csv:\n" "  metadata:\n" "    annotations: {<<: {a: 1}, b: 2}\n",
+    ],
+)
+def test_extract_paths_merge_keys(tmp_path: Path, content: str) -> None:
+    path = tmp_path / "foo.yaml"
+    path.write_text(content)
+    paths = ["csv.metadata.annotations", "csv.spec.relatedImages", "csv.missing"]
+
+    assert utils.extract_paths(path, paths) == lookup(content, paths)
+
+
+def test_extract_paths_anchors(tmp_path: Path) -> None:
+    path = tmp_path / "foo.yaml"
+    path.write_text(
+        "skipped: [&list [1, 2], {&key k: v}, *list]\n"
+        "defaults: &defaults\n"
+        "  image: foo\n"
+        "  tags: [latest]\n"
+        "? [complex, key]\n"
+        ": value\n"
+        "containers:\n"
+        "  &name first: {<<: *defaults, name: *name}\n"
+        "  second: {list: *list, key: *key}\n"
+        "  third: !!str 3\n"
+    )
+
+    assert utils.extract_paths(
+        path,
+        ["defaults.image", "containers.first", "containers.second", "containers.third"],
+    ) == {
+        "defaults.image": "foo",
+        "containers.first": {"image": "foo", "tags": ["latest"], "name": "first"},
+        "containers.second": {"list": [1, 2], "key": "k"},
+        "containers.third": "3",
+    }
+
+    path.write_text("foo: {bar: *missing}\n")
+    with pytest.raises(yaml.composer.ComposerError):
+        utils.extract_paths(path, ["foo.bar"])
+
+    path.write_text("")
+    assert utils.extract_paths(path, ["foo"]) == {}